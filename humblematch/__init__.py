@@ -1 +1,9 @@
 from wrap_obj import *
+from matcher import *
+from tracer import *
+from batch import *
+from stream import *
+from columns import *
+from profiler import *
+from explain import *
+from signature import *
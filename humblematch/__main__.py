@@ -0,0 +1,5 @@
+import sys
+
+from humblematch.cli import main
+
+sys.exit(main())
@@ -0,0 +1,58 @@
+'''
+Reordering the checks of a compiled pattern from outcomes seen so far, used
+by compile(pattern, adaptive=True).
+
+A dict pattern matches only if all of its keys match, so the key which fails
+most often is best checked first. An OR(...) matches if any alternative
+does, so the alternative which matches most often is best tried first.
+Either way, the order only changes how soon the answer is known, not the
+answer, and values saved with save_as are merged in declaration order.
+
+>>> order = AdaptiveOrder(["a", "b", "c"], period=4)
+>>> for _ in range(4):
+...     order.counts[2] += 1
+...     order.tick()
+>>> [item for (_, item) in order.order]
+['c', 'a', 'b']
+'''
+
+__all__ = ["AdaptiveOrder"]
+
+ADAPT_PERIOD = 256
+
+
+class AdaptiveOrder(object):
+
+    '''
+    Internal class. Order in which the checks of one pattern node are tried.
+    order -> list of (index, item), index being the position of item
+             in declaration order
+    Matchers add 1 to counts[index] when item decides the result, and call
+    tick once for each match. Every period ticks, order is sorted by counts,
+    highest first, and counts are halved so that old outcomes weigh less.
+
+    Counters are updated without a lock. When matched from many threads some
+    updates may be lost, which only affects the order.
+    '''
+
+    __slots__ = ("order", "counts", "calls", "period")
+
+    def __init__(self, items, period=ADAPT_PERIOD):
+        super(AdaptiveOrder, self).__init__()
+        self.order = list(enumerate(items))
+        self.counts = [0] * len(self.order)
+        self.calls = 0
+        self.period = period
+
+    def tick(self):
+        self.calls += 1
+        if self.calls >= self.period:
+            self.reorder()
+
+    def reorder(self):
+        counts = self.counts
+        # sorted is stable, so ties keep their current order. New lists are
+        # assigned, so matchers iterating the old ones arent affected
+        self.order = sorted(self.order, key=lambda (index, _): -counts[index])
+        self.counts = [count // 2 for count in counts]
+        self.calls = 0
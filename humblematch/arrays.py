@@ -0,0 +1,420 @@
+'''
+Matching repeat patterns with arrays without looking at each element.
+
+All elements of a NumPy array are instances of its dtype.type, so a pattern like
+w([float]).times(0, inf) is checked from dtype and shape alone, and values
+like w([OR(0, 1)]).times(n) with one vectorized comparison. Values saved
+with save_as inside the repeat are saved as views of the array, instead of
+lists of its elements.
+
+>>> import numpy
+>>> from wrap_obj import w, inf, OR
+>>> w([float]).times(0, inf) == numpy.zeros(10 ** 6)
+True
+>>> w([OR(0, 1)]).times(0, inf) == numpy.array([0, 1, 2])
+False
+>>> (w([int, float]).times(0, inf) == numpy.zeros(6), w([float, float]).times(3) == numpy.zeros(6))
+(False, True)
+>>> (w([float, w(float).save_as("y")]).times(0, inf) == numpy.arange(6.0))["y"]
+array([1., 3., 5.])
+
+Rows of 2d arrays are matched with list patterns in the same way, e.g.
+w([[float, float]]).times(0, inf) with an array of shape (n, 2).
+
+Other containers which can only hold one type of element are answered
+from their type too - array.array (from its typecode), bytearray and xrange
+(only ints) and str or unicode (only strings of one character). Values are
+checked by scanning them in C with translate or array.count.
+
+>>> from array import array
+>>> w([float]).times(0, inf) == array("d", [0.5] * 10 ** 6)
+True
+>>> w([OR(0, 255)]).times(0, inf) == bytearray(10 ** 6)
+True
+>>> w([w(int).save_as("a"), int]).times(0, inf) == xrange(4)
+{'a': [0, 2]}
+
+Patterns which cant be checked this way (object arrays, dicts, functions,
+save_as on rows, ...) are matched element by element as usual.
+NumPy is optional, without it NumPy arrays are never seen here.
+'''
+from abc import ABCMeta
+from array import array as ArrayType
+from collections import Mapping, Iterable
+import types
+
+import wrap_obj
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = []
+
+NUMBER_VALUE_TYPES = (int, float)
+# values which are compared with elements of arrays, by kind of dtype
+VALUE_TYPES_OF_KIND = dict([(kind, NUMBER_VALUE_TYPES) for kind in "biufc"], S=(str,), U=(unicode,))
+
+# type of elements of array.array, by typecode
+TYPECODE_ELEMENT_TYPES = dict([(typecode, int) for typecode in "bBhHil"] +
+                              [(typecode, long) for typecode in "IL"] +
+                              [(typecode, float) for typecode in "fd"], c=str, u=unicode)
+# type of elements of other containers, which cant hold anything else
+CONTAINER_ELEMENT_TYPES = {bytearray: int, xrange: int, str: str, unicode: unicode}
+
+# types matched by match_array
+ARRAY_TYPES = (ArrayType,) + tuple(CONTAINER_ELEMENT_TYPES) + ((numpy.ndarray,) if numpy is not None else ())
+
+
+def is_array(other):
+    '''
+    Internal function. Returns whether other is of ARRAY_TYPES
+    '''
+    return isinstance(other, ARRAY_TYPES)
+
+
+def is_ndarray(other):
+    '''
+    Internal function. Returns whether other is a NumPy array
+    '''
+    return (numpy is not None) and isinstance(other, numpy.ndarray)
+
+
+def match_array(multiobj, other):
+    '''
+    Internal function. Returns multiobj == other for other of ARRAY_TYPES,
+    or None if it cant be done from the type of its elements
+    '''
+    if is_ndarray(other):
+        return match_ndarray(multiobj, other)
+    return match_container(multiobj, other)
+
+
+def match_ndarray(multiobj, other):
+    '''
+    Internal function. Like match_array, for NumPy array other
+    '''
+    if other.ndim == 0 or other.dtype.kind == "O" or multiobj.DO_TYPECHECK:
+        return None
+    data = list(multiobj.checked_data())
+    if not data:
+        return None
+    if not multiobj.length_bounds.allows(len(other)):
+        return False
+
+    dict_saved_values = {}
+    unit_len = len(data)
+    for (ele_index, ele_data) in enumerate(data):
+        # one element of each repeat, as a strided view
+        matched = elements_match(ele_data, other[ele_index::unit_len], 1, dict_saved_values)
+        if not matched:
+            return matched
+
+    if multiobj.save_key is not None:
+        dict_saved_values[multiobj.save_key] = other
+    return (dict_saved_values or True)
+
+
+def elements_match(ele_data, array, axis, dict_saved_values=None):
+    '''
+    Internal function. Returns whether each element of array matches
+    ele_data, where elements are indexed by the first axis axes of array,
+    or None if it cant be said. Values are saved in dict_saved_values when
+    it is given.
+    '''
+    if 0 in array.shape[:axis]:
+        # nothing to match, like zero repeats
+        return True
+
+    while isinstance(ele_data, wrap_obj.WrapObj):
+        if ele_data.DO_TYPECHECK or ele_data.treat_as_object:
+            return None
+        if ele_data.save_key is not None:
+            if (dict_saved_values is None or array.ndim != axis or
+                    ele_data.save_key in dict_saved_values):
+                return None
+            dict_saved_values[ele_data.save_key] = array
+        ele_data = ele_data.data
+
+    if array.ndim == axis:
+        return scalars_match(ele_data, array)
+    if (isinstance(ele_data, (wrap_obj.WrapMultiObj, types.StringTypes, Mapping)) or
+            not isinstance(ele_data, Iterable)):
+        return None
+    return lists_match(list(ele_data), array, axis)
+
+
+def lists_match(list_data, array, axis):
+    '''
+    Internal function. Returns whether lists along axis of array all match
+    list pattern list_data, or None if it cant be said
+    '''
+    multiobj_indexes = [ele_index for (ele_index, ele_data) in enumerate(list_data)
+                        if isinstance(ele_data, wrap_obj.WrapMultiObj)]
+    other_len = array.shape[axis]
+    before_axis = (slice(None),) * axis
+
+    if not multiobj_indexes:
+        if other_len != len(list_data):
+            return False
+        list_part = [(ele_data, array[before_axis + (ele_index,)], axis)
+                     for (ele_index, ele_data) in enumerate(list_data)]
+    elif len(multiobj_indexes) == 1:
+        multiobj_index = multiobj_indexes[0]
+        multiobj = list_data[multiobj_index]
+        unit_data = list(multiobj.checked_data())
+        end_multi = other_len - (len(list_data) - multiobj_index - 1)
+        if multiobj.save_key is not None or not unit_data:
+            return None
+        if not wrap_obj.list_length_bounds(list_data).allows(other_len):
+            return False
+        list_part = [(ele_data, array[before_axis + (ele_index,)], axis)
+                     for (ele_index, ele_data) in enumerate(list_data[:multiobj_index])]
+        list_part += [(ele_data, array[before_axis + (end_multi + ele_index,)], axis)
+                      for (ele_index, ele_data) in enumerate(list_data[multiobj_index + 1:])]
+        middle = array[before_axis + (slice(multiobj_index, end_multi),)]
+        list_part += [(ele_data, middle[before_axis + (slice(ele_index, None, len(unit_data)),)], axis + 1)
+                      for (ele_index, ele_data) in enumerate(unit_data)]
+    else:
+        return None
+
+    for (ele_data, part, part_axis) in list_part:
+        matched = elements_match(ele_data, part, part_axis)
+        if not matched:
+            return matched
+    return True
+
+
+def scalars_match(value_or_type, array):
+    '''
+    Internal function. Returns whether all elements of array match leaf
+    value_or_type, like check_as_value_and_type, or None if it cant be said
+    '''
+    mask = scalars_mask(value_or_type, array)
+    if mask is None:
+        return None
+    if isinstance(mask, bool):
+        return mask or array.size == 0
+    return bool(mask.all())
+
+
+def scalars_mask(value_or_type, array):
+    '''
+    Internal function. Returns which elements of array match leaf
+    value_or_type - True or False when its the same for all of them, else
+    a boolean array. None if it cant be said.
+    '''
+    if isinstance(value_or_type, wrap_obj.MetaAny):
+        return True
+    if isinstance(value_or_type, wrap_obj.MetaMultiInstanceMatcher):
+        return or_mask(value_or_type, array)
+    if isinstance(value_or_type, type):
+        return subclass_match(array.dtype.type, value_or_type)
+    return values_mask([value_or_type], array)
+
+
+def or_mask(multi_instance_matcher, array):
+    '''
+    Internal function. Like scalars_mask, for OR(...)
+    '''
+    list_value = []
+    for each_value in multi_instance_matcher.list_match_type:
+        if isinstance(each_value, type):
+            matched = subclass_match(array.dtype.type, each_value)
+            if matched is None:
+                return None
+            if matched:
+                return True
+        else:
+            list_value.append(each_value)
+    if not list_value:
+        return False
+    return values_mask(list_value, array)
+
+
+def values_mask(list_value, array):
+    '''
+    Internal function. Like scalars_mask, for elements equal to any of
+    list_value
+    '''
+    kind = array.dtype.kind
+    list_equal_value = []
+    for each_value in list_value:
+        if isinstance(each_value, VALUE_TYPES_OF_KIND.get(kind, ())):
+            list_equal_value.append(each_value)
+        elif kind in "SU" and isinstance(each_value, types.StringTypes):
+            # str and unicode can be equal, but NumPy doesnt compare them
+            # with elements of the other kind
+            return None
+        elif not (each_value is None or isinstance(each_value, NUMBER_VALUE_TYPES + types.StringTypes)):
+            # could have its own __eq__
+            return None
+        elif kind not in VALUE_TYPES_OF_KIND:
+            return None
+        # else its never equal to elements of this kind
+    if not list_equal_value:
+        return False
+    if len(list_equal_value) == 1:
+        return (array == list_equal_value[0])
+    return numpy.isin(array, list_equal_value)
+
+
+def subclass_match(scalar_type, each_type):
+    '''
+    Internal function. Returns isinstance(element, each_type) for elements
+    of type scalar_type, or None for classes whose isinstance cant be
+    answered by issubclass
+    '''
+    if isinstance(each_type, wrap_obj.MetaAny):
+        return True
+    # other metaclasses (like of OR(...)) may have their own isinstance
+    if type(each_type) is type or isinstance(each_type, ABCMeta):
+        return issubclass(scalar_type, each_type)
+    return None
+
+
+def match_container(multiobj, other):
+    '''
+    Internal function. Like match_array, for other whose elements are
+    all of one type, like bytearray
+    '''
+    if isinstance(other, ArrayType):
+        element_type = TYPECODE_ELEMENT_TYPES.get(other.typecode)
+    else:
+        element_type = CONTAINER_ELEMENT_TYPES.get(type(other))
+    if element_type is None or multiobj.DO_TYPECHECK:
+        return None
+    data = list(multiobj.checked_data())
+    if not data:
+        return None
+    if not multiobj.length_bounds.allows(len(other)):
+        return False
+
+    dict_saved_values = {}
+    unit_len = len(data)
+    for (ele_index, ele_data) in enumerate(data):
+        matched = container_elements_match(ele_data, other, element_type, ele_index, unit_len, dict_saved_values)
+        if not matched:
+            return matched
+
+    if multiobj.save_key is not None:
+        dict_saved_values[multiobj.save_key] = other
+    return (dict_saved_values or True)
+
+
+def container_elements_match(ele_data, other, element_type, start, step, dict_saved_values):
+    '''
+    Internal function. Returns whether elements other[start::step], all of
+    element_type, match ele_data, or None if it cant be said
+    '''
+    save_key = None
+    while isinstance(ele_data, wrap_obj.WrapObj):
+        if ele_data.DO_TYPECHECK or ele_data.treat_as_object or (ele_data.save_key is not None and
+                                                                 save_key is not None):
+            return None
+        save_key = ele_data.save_key if ele_data.save_key is not None else save_key
+        ele_data = ele_data.data
+    if isinstance(ele_data, types.StringTypes):
+        # WrapObj.match compares strings without saving them
+        save_key = None
+    if save_key in dict_saved_values:
+        return None
+
+    if isinstance(ele_data, wrap_obj.MetaAny):
+        matched = True
+        list_value = []
+    elif isinstance(ele_data, wrap_obj.MetaMultiInstanceMatcher):
+        matched = False
+        list_value = []
+        for each_value in ele_data.list_match_type:
+            if not isinstance(each_value, type):
+                list_value.append(each_value)
+            elif not matched:
+                matched = subclass_match(element_type, each_value)
+                if matched is None:
+                    return None
+    elif isinstance(ele_data, type):
+        matched = subclass_match(element_type, ele_data)
+        list_value = []
+        if matched is None:
+            return None
+    elif (isinstance(ele_data, (wrap_obj.WrapMultiObj, Mapping)) or
+            (isinstance(ele_data, Iterable) and not isinstance(ele_data, types.StringTypes))):
+        # list and dict patterns could match elements which are strings
+        return None
+    else:
+        matched = False
+        list_value = [ele_data]
+
+    if len(other) <= start:
+        # no elements here, like zero repeats
+        return True
+    part = every_nth(other, start, step)
+    if not matched:
+        matched = values_match(list_value, part, element_type)
+    if matched and save_key is not None:
+        dict_saved_values[save_key] = list(part)
+    return matched
+
+
+def every_nth(other, start, step):
+    '''
+    Internal function. Returns other[start::step], also for xrange
+    '''
+    if start == 0 and step == 1:
+        return other
+    if isinstance(other, xrange):
+        stride = (other[1] - other[0]) if len(other) > 1 else 1
+        count = (len(other) - start + step - 1) // step
+        first = other[start]
+        return xrange(first, first + count * stride * step, stride * step)
+    return other[start::step]
+
+
+def values_match(list_value, part, element_type):
+    '''
+    Internal function. Returns whether all elements of part, all of
+    element_type, are equal to any of list_value, or None if it cant be said
+    '''
+    if element_type in (str, unicode):
+        set_char = set()
+        for each_value in list_value:
+            if isinstance(each_value, types.StringTypes):
+                # str and unicode are only equal when ascii
+                if len(each_value) == 1 and (type(each_value) is element_type or ord(each_value) < 128):
+                    set_char.add(element_type(each_value))
+            elif not (each_value is None or isinstance(each_value, NUMBER_VALUE_TYPES + (long,))):
+                return None
+        return (not delete_chars(part, set_char)) if set_char else False
+
+    set_number = set()
+    for each_value in list_value:
+        if isinstance(each_value, NUMBER_VALUE_TYPES + (long,)):
+            set_number.add(each_value)
+        elif not (each_value is None or isinstance(each_value, types.StringTypes)):
+            return None
+    if not set_number:
+        return False
+
+    if isinstance(part, xrange):
+        # elements are all different
+        return len(part) <= len(set_number) and all(each_element in set_number for each_element in part)
+    if isinstance(part, bytearray):
+        list_byte = [int(each_value) for each_value in set_number
+                     if (not isinstance(each_value, float) or each_value.is_integer()) and 0 <= each_value < 256]
+        return not part.translate(None, bytes(bytearray(list_byte)))
+    # equal values like 1 and 1.0 are only once in set_number
+    return sum(part.count(each_value) for each_value in set_number) == len(part)
+
+
+def delete_chars(part, set_char):
+    '''
+    Internal function. Returns string part (or array.array of characters)
+    without any of set_char
+    '''
+    if isinstance(part, ArrayType):
+        part = part.tostring() if part.typecode == "c" else part.tounicode()
+    if isinstance(part, str):
+        return part.translate(None, "".join(set_char))
+    return part.translate(dict.fromkeys(ord(each_char) for each_char in set_char))
@@ -0,0 +1,116 @@
+'''
+Matching one pattern with many objects.
+
+The pattern is compiled once and the objects are matched in chunks, so the
+per object cost is only the compiled matcher call. With workers, chunks are
+matched in a pool of threads or processes, while the next chunks are still
+being read from the iterable.
+
+>>> from wrap_obj import w
+>>> match_many(w([int, w(str).save_as("s")]), [[1, "a"], [1, 2], [3, "b"]])
+[{'s': 'a'}, False, {'s': 'b'}]
+>>> match_many(w([int, str]), [[1, "a"], [1, 2], [3, "b"]], failed_only=True)
+[1]
+'''
+from functools import partial
+from itertools import islice, chain
+from multiprocessing.pool import Pool, ThreadPool
+import cPickle
+
+__all__ = ["match_many"]
+
+DEFAULT_CHUNKSIZE = 256
+
+# matcher of this process, when it is a worker started by match_many
+worker_match = None
+
+
+def match_many(pattern, iterable, workers=None, chunksize=DEFAULT_CHUNKSIZE, executor="thread", failed_only=False):
+    '''
+    Returns list with the result of matching pattern with each object of
+    iterable, in order. Each result is the same as compile(pattern)(object),
+    i.e. like pattern == object, but False instead of None.
+
+    pattern -> anything which can be passed to compile, or a Matcher
+    workers -> number of threads or processes matching chunks. For threads,
+               None or 1 matches in this thread. For processes, None
+               starts one for each cpu
+    chunksize -> number of objects sent to a worker at once
+    executor -> "thread" or "process". Processes arent limited by the GIL,
+                but pattern and objects (and results) must be picklable.
+                "columns" matches a dict pattern with a list of dicts key
+                by key, in this thread (see match_rows)
+    failed_only -> if True, returns only the indexes of objects which
+                   didnt match
+    '''
+    from matcher import Matcher
+
+    if not isinstance(pattern, Matcher):
+        pattern = Matcher(pattern)
+    if not (isinstance(chunksize, (int, long)) and chunksize > 0):
+        raise ValueError("chunksize={chunksize} should be a positive integer".format(chunksize=chunksize))
+    if not (workers is None or (isinstance(workers, (int, long)) and workers > 0)):
+        raise ValueError("workers={workers} should be a positive integer".format(workers=workers))
+
+    if executor == "columns":
+        from columns import match_rows
+        return match_rows(pattern.pattern, iterable, failed_only)
+
+    iter_chunk = iter_chunks(iterable, chunksize)
+    if executor == "process":
+        # matcher is sent once to each worker, which compiles it again
+        pickled_matcher = cPickle.dumps(pattern, cPickle.HIGHEST_PROTOCOL)
+        pool = Pool(workers, initializer=start_worker, initargs=(pickled_matcher,))
+        match_function = partial(match_chunk_in_worker, failed_only)
+    elif executor == "thread":
+        if workers is None or workers == 1:
+            return list(chain.from_iterable(match_chunk(pattern, failed_only, chunk_start)
+                                            for chunk_start in iter_chunk))
+        pool = ThreadPool(workers)
+        match_function = partial(match_chunk, pattern, failed_only)
+    else:
+        raise ValueError("executor={executor} should be thread, process or columns".format(executor=executor))
+
+    try:
+        return list(chain.from_iterable(pool.imap(match_function, iter_chunk)))
+    finally:
+        pool.terminate()
+
+
+def iter_chunks(iterable, chunksize):
+    '''
+    Internal function. Yields (start index, chunk) for lists of chunksize
+    objects from iterable, the last one may be shorter
+    '''
+    iterator = iter(iterable)
+    start_index = 0
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield (start_index, chunk)
+        start_index += len(chunk)
+
+
+def match_chunk(match, failed_only, chunk_start):
+    '''
+    Internal function. Returns list of match(other) for each other in chunk,
+    or indexes of the ones not matching if failed_only
+    '''
+    (start_index, chunk) = chunk_start
+    if failed_only:
+        return [start_index + index for (index, other) in enumerate(chunk) if not match(other)]
+    return [match(other) for other in chunk]
+
+
+def start_worker(pickled_matcher):
+    '''
+    Internal function. Unpickles (and so compiles) the matcher in a new
+    worker process
+    '''
+    global worker_match
+    worker_match = cPickle.loads(pickled_matcher)
+
+
+def match_chunk_in_worker(failed_only, chunk_start):
+    return match_chunk(worker_match, failed_only, chunk_start)
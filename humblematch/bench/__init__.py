@@ -0,0 +1,6 @@
+'''
+Benchmarks for humblematch. The suite of all pattern shapes is run with
+python -m humblematch.bench (see suite.py). Benchmarks of single features
+are run each as a module, for eg.
+python -m humblematch.bench.bench_sequence
+'''
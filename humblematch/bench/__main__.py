@@ -0,0 +1,5 @@
+import sys
+
+from humblematch.bench.suite import main
+
+sys.exit(main())
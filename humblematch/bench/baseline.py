@@ -0,0 +1,116 @@
+'''
+Overhead of patterns compared with the hand-written isinstance and len
+checks they replace, like w([int, int]) == [x, y] for
+isinstance(x, int) and isinstance(y, int).
+
+Each pair is timed on the same inputs, some matching and some not, and the
+ratio of the time of the pattern to the time of the hand-written check is
+reported, for w(pattern) == other and for compile(pattern).
+test/test_baseline.py fails if a ratio goes over a ceiling, which is set
+with the environment variables HUMBLEMATCH_MAX_OVERHEAD_W and
+HUMBLEMATCH_MAX_OVERHEAD_COMPILED.
+
+    python -m humblematch.bench.baseline
+'''
+from __future__ import print_function
+from collections import namedtuple
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, inf, compile
+
+NUMBER = 2000
+REPEAT = 3
+
+
+class BaselinePair(namedtuple("BaselinePair", ["name", "pattern", "check", "list_other"])):
+
+    '''
+    A pattern and the hand-written function checking the same.
+    list_other -> inputs both are called with, giving the same result
+    '''
+
+    __slots__ = ()
+
+
+def check_point_args(other):
+    return isinstance(other, list) and len(other) == 2 and isinstance(other[0], int) and isinstance(other[1], int)
+
+
+def check_point_list(other):
+    return (isinstance(other, list) and len(other) == 2 and other[1] is None and
+            isinstance(other[0], list) and len(other[0]) == 2 and
+            isinstance(other[0][0], int) and isinstance(other[0][1], int))
+
+
+def check_diff_result(other):
+    return (isinstance(other, list) and len(other) == 2 and
+            (isinstance(other[0], list) or other[0] is None) and (isinstance(other[1], list) or other[1] is None))
+
+
+def check_float_lists(other):
+    return (isinstance(other, list) and len(other) == 2 and
+            all(isinstance(sub_list, list) and all(isinstance(ele, float) for ele in sub_list)
+                for sub_list in other))
+
+
+def check_record(other):
+    return (isinstance(other, dict) and "id" in other and "name" in other and "tags" in other and
+            isinstance(other["id"], int) and isinstance(other["name"], str) and
+            isinstance(other["tags"], list) and all(isinstance(tag, str) for tag in other["tags"]))
+
+
+def check_scalar(other):
+    return isinstance(other, int)
+
+
+LIST_PAIR = [
+    BaselinePair("scalar", int, check_scalar, [5, "5"]),
+    BaselinePair("point_args", [int, int], check_point_args, [[1, 2], [1, "2"], [1, 2, 3]]),
+    BaselinePair("point_list", [[int, int], None], check_point_list, [[[1, 2], None], [[1, 2], 3], [1, None]]),
+    BaselinePair("diff_result", [OR(list, None), OR(list, None)], check_diff_result,
+                 [[[1], None], [None, [2, 3]], [[1], 5]]),
+    BaselinePair("float_lists", [[w([float]).times(0, inf)], [w([float]).times(0, inf)]], check_float_lists,
+                 [[[0.5] * 10, [1.5] * 10], [[0.5] * 10, [1.5] * 9 + [1]]]),
+    BaselinePair("record", {"id": int, "name": str, "tags": [w([str]).times(0, inf)]}, check_record,
+                 [{"id": 1, "name": "a", "tags": ["x", "y"]}, {"id": 1, "name": "a", "tags": [1]},
+                  {"id": "1", "name": "a", "tags": []}]),
+]
+
+
+def time_calls(func, list_other, number=NUMBER, repeat=REPEAT):
+    '''
+    Returns best seconds for number calls of func with each of list_other
+    '''
+    def call_all():
+        for other in list_other:
+            func(other)
+    return min(Timer(call_all).repeat(repeat, number))
+
+
+def overhead_ratio(pair, mode, number=NUMBER, repeat=REPEAT):
+    '''
+    Returns time of pattern of pair over time of its hand-written check.
+    mode -> "w" for w(pattern) == other, "compiled" for compile(pattern)
+    '''
+    if mode == "w":
+        pattern = w(pair.pattern)
+        match = lambda other: pattern == other
+    elif mode == "compiled":
+        match = compile(pair.pattern)
+    else:
+        raise ValueError("mode={mode} should be w or compiled".format(mode=mode))
+    for other in pair.list_other:
+        assert(bool(match(other)) == pair.check(other)), (pair.name, other)
+    return time_calls(match, pair.list_other, number, repeat) / time_calls(pair.check, pair.list_other, number, repeat)
+
+
+def run(number=NUMBER, out=sys.stdout):
+    print("{0:>14} {1:>12} {2:>12}".format("case", "w (x)", "compiled (x)"), file=out)
+    for pair in LIST_PAIR:
+        print("{0:>14} {1:>12.1f} {2:>12.1f}".format(
+            pair.name, overhead_ratio(pair, "w", number), overhead_ratio(pair, "compiled", number)), file=out)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,52 @@
+'''
+Calls of a function checking its arguments with @accepts, compared with
+checking them in the function with w([...]) == [x, y] (as in the Tutorial)
+and with a compiled matcher, and with no checks at all.
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, compile, accepts
+
+NUMBER = 100000
+
+
+def move_w(x, y=None):
+    if not (w([int, OR(int, None)]) == [x, y]):
+        raise TypeError("Pass proper arguments")
+    return x
+
+
+is_move_args = compile([int, OR(int, None)])
+
+
+def move_compiled(x, y=None):
+    if not is_move_args([x, y]):
+        raise TypeError("Pass proper arguments")
+    return x
+
+
+@accepts(x=int, y=OR(int, None))
+def move_accepts(x, y=None):
+    return x
+
+
+def move(x, y=None):
+    return x
+
+
+def run(number=NUMBER, out=sys.stdout):
+    print("{0:>10} {1:>14} {2:>14}".format("check", "per call (us)", "over none (us)"), file=out)
+    list_check = [("w", move_w), ("compiled", move_compiled), ("accepts", move_accepts), ("none", move)]
+    list_seconds = []
+    for (name, func) in list_check:
+        seconds = min(Timer(lambda: (func(1, 2), func(3), func(4, y=None))).repeat(3, number)) / (3 * number)
+        list_seconds.append((name, seconds))
+    none_seconds = list_seconds[-1][1]
+    for (name, seconds) in list_seconds:
+        print("{0:>10} {1:>14.3f} {2:>14.3f}".format(name, seconds * 1e6, (seconds - none_seconds) * 1e6), file=out)
+
+
+if __name__ == "__main__":
+    run()
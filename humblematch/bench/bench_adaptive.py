@@ -0,0 +1,49 @@
+'''
+Compiled matchers with and without adaptive=True, on skewed data.
+
+dict_last_key_fails -> records where the checks of the first keys are
+                       costly and the last key is the one which usually fails
+or_last_wins -> OR of abstract types where the last alternative
+                usually matches
+'''
+from __future__ import print_function
+from collections import Sequence, Set, Mapping
+from numbers import Number
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, inf, compile
+
+NUMBER = 200
+
+DICT_PATTERN = {
+    "names": [w([str]).times(0, inf)],
+    "points": [w([OR(int, float)]).times(0, inf)],
+    "result": "ok",
+}
+# without reordering, keys are checked in dict order
+assert(list(DICT_PATTERN)[-1] == "result")
+DICT_RECORDS = [{"names": ["a", "b", "c"] * 5, "points": range(20),
+                 "result": ("ok" if index % 20 == 0 else "error")}
+                for index in range(1000)]
+
+OR_PATTERN = OR(Sequence, Set, Mapping, Number)
+OR_RECORDS = [("s" if index % 20 == 0 else index) for index in range(1000)]
+
+
+def run(number=NUMBER, out=sys.stdout):
+    print("{0:>20} {1:>14} {2:>14} {3:>8}".format("case", "plain (us)", "adaptive (us)", "speedup"), file=out)
+    for (name, pattern, list_other) in (("dict_last_key_fails", DICT_PATTERN, DICT_RECORDS),
+                                        ("or_last_wins", OR_PATTERN, OR_RECORDS)):
+        list_seconds = []
+        for adaptive in (False, True):
+            m = compile(pattern, adaptive=adaptive)
+            assert(map(m, list_other) == map(compile(pattern), list_other))
+            seconds = min(Timer(lambda: map(m, list_other)).repeat(3, number))
+            list_seconds.append(seconds / number / len(list_other) * 1e6)
+        print("{0:>20} {1:>14.3f} {2:>14.3f} {3:>8.2f}".format(name, list_seconds[0], list_seconds[1],
+                                                             list_seconds[0] / list_seconds[1]), file=out)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,62 @@
+'''
+Matching repeat patterns with NumPy arrays of 10M elements, which is done
+from dtype and shape (and vectorized comparisons for values), compared with
+matching element by element.
+
+Element by element is timed on the first ELEMENT_COUNT elements only, and
+scaled up to the length of the array.
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, inf, compile, arrays
+
+ARRAY_LEN = 10 ** 7
+ELEMENT_COUNT = 10 ** 5
+
+LIST_CASE = [
+    ("float_dtype", w([float]).times(0, inf), "float"),
+    ("int_times_n", w([int]).times(ARRAY_LEN), "int"),
+    ("value", w([0]).times(0, inf), "int"),
+    ("or_values", w([OR(0, 1)]).times(0, inf), "int"),
+    ("rows", w([[float, float]]).times(0, inf), "rows"),
+]
+
+
+def make_array(kind, array_len):
+    import numpy
+    if kind == "float":
+        return numpy.zeros(array_len)
+    elif kind == "int":
+        return numpy.zeros(array_len, dtype=int)
+    return numpy.zeros((array_len // 2, 2))
+
+
+def run(array_len=ARRAY_LEN, element_count=ELEMENT_COUNT, out=sys.stdout):
+    if arrays.numpy is None:
+        print("NumPy isnt installed", file=out)
+        return
+    print("{0:>12} {1:>10} {2:>14} {3:>14} {4:>10}".format(
+        "case", "w (ms)", "compiled (ms)", "elements (s)", "speedup"), file=out)
+    for (name, multiobj, kind) in LIST_CASE:
+        array = make_array(kind, array_len)
+        matcher = compile([multiobj])
+        assert(multiobj == array)
+        vectorized = min(Timer(lambda: multiobj == array).repeat(3, 1))
+        compiled = min(Timer(lambda: matcher(array)).repeat(3, 1))
+
+        # without NumPy, arrays are matched element by element
+        part = array[:element_count]
+        part_multiobj = w(multiobj.data).times(0, inf)
+        (arrays.numpy, numpy) = (None, arrays.numpy)
+        try:
+            elements = min(Timer(lambda: part_multiobj == part).repeat(1, 1)) * (float(array.size) / part.size)
+        finally:
+            arrays.numpy = numpy
+        print("{0:>12} {1:>10.3f} {2:>14.3f} {3:>14.1f} {4:>10.0f}".format(
+            name, vectorized * 1e3, compiled * 1e3, elements, elements / vectorized), file=out)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,48 @@
+'''
+Matching a batch of records with a for loop over w(...) == record, compared
+to match_many in this thread, a pool of threads and a pool of processes.
+'''
+from __future__ import print_function
+from timeit import default_timer
+import sys
+
+from humblematch import w, inf, OR, match_many
+
+PATTERN = w({"id": int,
+             "name": OR(str, unicode),
+             "tags": [w([str]).times(0, inf)],
+             "point": [OR(int, float), OR(int, float)]})
+
+RECORD_COUNT = 100000
+
+
+def make_records(record_count):
+    return [{"id": index, "name": "n", "tags": ["a", "b"], "point": [index, 2.5]} for index in range(record_count)]
+
+
+def for_loop(list_record):
+    return [(PATTERN == record) or False for record in list_record]
+
+
+def match_many_workers(workers, executor="thread"):
+    def run_match_many(list_record):
+        return match_many(PATTERN, list_record, workers=workers, executor=executor)
+    run_match_many.__name__ = "{0} workers={1}".format(executor, workers)
+    return run_match_many
+
+
+def run(record_count=RECORD_COUNT, out=sys.stdout):
+    list_record = make_records(record_count)
+    print("{0:>24} {1:>16}".format("case", "per record (us)"), file=out)
+    for func in (for_loop, match_many_workers(None), match_many_workers(4),
+                 match_many_workers(2, "process"), match_many_workers(4, "process")):
+        list_seconds = []
+        for _ in range(3):
+            start = default_timer()
+            func(list_record)
+            list_seconds.append(default_timer() - start)
+        print("{0:>24} {1:>16.3f}".format(func.__name__, min(list_seconds) / record_count * 1e6), file=out)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,38 @@
+'''
+match_columns on 1M rows kept as a NumPy structured array, and as a dict of
+lists, compared with matching a list of dicts (one for each row) with a
+compiled pattern.
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, inf, compile, match_columns, arrays
+
+ROW_COUNT = 10 ** 6
+
+PATTERN = w([{"ts": float, "id": int, "tag": OR(str, None)}]).times(0, inf)
+
+
+def run(row_count=ROW_COUNT, out=sys.stdout):
+    list_row = [{"ts": row_index * 0.5, "id": row_index, "tag": "t{0}".format(row_index % 7)}
+                for row_index in range(row_count)]
+    dict_column = dict((key, [row[key] for row in list_row]) for key in ("ts", "id", "tag"))
+    matcher = compile([PATTERN])
+
+    list_case = [("list of dicts, compiled", lambda: matcher(list_row)),
+                 ("dict of lists", lambda: match_columns(PATTERN, dict_column))]
+    if arrays.numpy is not None:
+        structured = arrays.numpy.array([(row["ts"], row["id"], row["tag"]) for row in list_row],
+                                        dtype=[("ts", float), ("id", int), ("tag", "S3")])
+        list_case.append(("structured array", lambda: match_columns(PATTERN, structured)))
+
+    print("{0:>24} {1:>12}".format("case", "ms"), file=out)
+    for (name, func) in list_case:
+        assert(func())
+        seconds = min(Timer(func).repeat(3, 1))
+        print("{0:>24} {1:>12.3f}".format(name, seconds * 1e3), file=out)
+
+
+if __name__ == "__main__":
+    run()
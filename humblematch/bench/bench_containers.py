@@ -0,0 +1,49 @@
+'''
+Matching repeat patterns with xrange, array.array, bytearray and str, which
+is done from the type of their elements (and by scanning them in C for
+values), compared with matching element by element.
+
+Element by element is timed on the first ELEMENT_COUNT elements only, and
+scaled up to the length of the container.
+'''
+from __future__ import print_function
+from array import array
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, inf, arrays
+
+ELEMENT_COUNT = 10 ** 5
+
+LIST_CASE = [
+    ("xrange_int", w([int]).times(0, inf), lambda: xrange(10 ** 8)),
+    ("array_float", w([float]).times(0, inf), lambda: array("d", [0.5]) * 10 ** 7),
+    ("array_value", w([OR(0.5, 1.5)]).times(0, inf), lambda: array("d", [0.5]) * 10 ** 7),
+    ("bytearray_int", w([int]).times(0, inf), lambda: bytearray(10 ** 7)),
+    ("bytearray_value", w([OR(0, 1)]).times(0, inf), lambda: bytearray(10 ** 7)),
+    ("str_char", w([OR("a", "b")]).times(0, inf), lambda: "ab" * (5 * 10 ** 6)),
+]
+
+
+def run(element_count=ELEMENT_COUNT, out=sys.stdout):
+    print("{0:>16} {1:>12} {2:>10} {3:>14} {4:>10}".format(
+        "case", "length", "w (ms)", "elements (s)", "speedup"), file=out)
+    for (name, multiobj, make_other) in LIST_CASE:
+        other = make_other()
+        assert(multiobj == other)
+        seconds = min(Timer(lambda: multiobj == other).repeat(3, 1))
+
+        # without it, containers are matched element by element
+        part = other[:element_count] if not isinstance(other, xrange) else xrange(element_count)
+        part_multiobj = w(multiobj.data).times(0, inf)
+        (arrays.ARRAY_TYPES, array_types) = ((), arrays.ARRAY_TYPES)
+        try:
+            elements = min(Timer(lambda: part_multiobj == part).repeat(1, 1)) * (float(len(other)) / len(part))
+        finally:
+            arrays.ARRAY_TYPES = array_types
+        print("{0:>16} {1:>12} {2:>10.3f} {3:>14.1f} {4:>10.0f}".format(
+            name, len(other), seconds * 1e3, elements, elements / seconds), file=out)
+
+
+if __name__ == "__main__":
+    run()
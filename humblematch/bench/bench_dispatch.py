@@ -0,0 +1,37 @@
+'''
+w(pattern) == other, with the kind of values (string, list-ish, mapping or
+other) looked up by type, compared with finding it from isinstance checks
+against ABCs every time.
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import w, OR, inf, wrap_obj, dispatch
+
+NUMBER = 20000
+
+LIST_CASE = [
+    ("scalar", w(int), 5),
+    ("flat dict", w({"id": int, "name": str, "score": float}), {"id": 1, "name": "a", "score": 0.5}),
+    ("nested", w({"user": {"id": int, "tags": [str, str]}, "items": [w([{"n": OR(int, None)}]).times(0, inf)]}),
+     {"user": {"id": 1, "tags": ["a", "b"]}, "items": [{"n": 1}, {"n": None}, {"n": 3}]}),
+]
+
+
+def run(number=NUMBER, out=sys.stdout):
+    print("{0:>12} {1:>14} {2:>14} {3:>8}".format("case", "cached (us)", "isinstance (us)", "speedup"), file=out)
+    for (name, pattern, other) in LIST_CASE:
+        assert(pattern == other)
+        cached = min(Timer(lambda: pattern == other).repeat(3, number)) / number
+        wrap_obj.kind_of = dispatch.find_kind
+        try:
+            uncached = min(Timer(lambda: pattern == other).repeat(3, number)) / number
+        finally:
+            wrap_obj.kind_of = dispatch.kind_of
+        print("{0:>12} {1:>14.3f} {2:>14.3f} {3:>8.2f}".format(
+            name, cached * 1e6, uncached * 1e6, uncached / cached), file=out)
+
+
+if __name__ == "__main__":
+    run()
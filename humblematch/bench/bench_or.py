@@ -0,0 +1,50 @@
+'''
+Cost of building OR(...) patterns inside a loop, compared to building them
+once. As OR(...) classes are cached, both should take about the same time.
+
+Also cost of isinstance with an enum-like OR of many values, which should not
+grow with the number of values.
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import w, OR
+
+NUMBER = 20000
+
+OTHER = [5, None, "get"]
+
+
+def build_every_time():
+    return w([OR(int, float), OR(int, None), OR("get", "post")]) == OTHER
+
+PATTERN = w([OR(int, float), OR(int, None), OR("get", "post")])
+
+
+def build_once():
+    return PATTERN == OTHER
+
+
+LIST_VALUE_COUNT = [5, 50, 500]
+
+
+def run(number=NUMBER, out=sys.stdout):
+    print("{0:>20} {1:>14}".format("case", "per call (us)"), file=out)
+    for func in (build_once, build_every_time):
+        seconds = min(Timer(func).repeat(3, number))
+        print("{0:>20} {1:>14.3f}".format(func.__name__, seconds / number * 1e6), file=out)
+
+    print("", file=out)
+    print("{0:>8} {1:>12} {2:>14}".format("values", "instance", "per call (us)"), file=out)
+    for value_count in LIST_VALUE_COUNT:
+        list_value = ["VALUE_{0}".format(value_index) for value_index in range(value_count)]
+        matcher = OR(list_value + [int])
+        for instance in (list_value[-1], "MISSING", 5, 2.5):
+            seconds = min(Timer(lambda: isinstance(instance, matcher)).repeat(3, number))
+            print("{0:>8} {1:>12} {2:>14.3f}".format(value_count, instance[:12] if isinstance(instance, str) else instance,
+                                                    seconds / number * 1e6), file=out)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,79 @@
+'''
+Calls of a function with 24 overloads, picked by @overload, compared with
+trying the pattern of each in turn (like an if/elif chain of
+w([...]) == [op, value]) with compiled matchers, and with w(...).
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import w, compile, overload
+
+NUMBER = 5000
+
+LIST_OP = ["get", "set", "add", "remove", "move", "copy", "find", "sort"]
+LIST_TYPE = [int, float, str]
+LIST_VALUE = [1, 1.5, "a"]
+
+
+def make_impl(impl_index):
+    def handle(op, value):
+        return impl_index
+    return handle
+
+
+def make_overloaded():
+    handle = None
+    for (op_index, op) in enumerate(LIST_OP):
+        for (type_index, value_type) in enumerate(LIST_TYPE):
+            impl = make_impl(op_index * len(LIST_TYPE) + type_index)
+            if handle is None:
+                handle = overload(op=op, value=value_type)(impl)
+            else:
+                handle.register(op=op, value=value_type)(impl)
+    return handle
+
+
+def make_in_turn(make_match):
+    list_match = [(make_match([op, value_type]), op_index * len(LIST_TYPE) + type_index)
+                  for (op_index, op) in enumerate(LIST_OP) for (type_index, value_type) in enumerate(LIST_TYPE)]
+
+    def handle(op, value):
+        for (match, impl_index) in list_match:
+            if match([op, value]):
+                return impl_index
+        raise TypeError("Pass proper arguments")
+    return handle
+
+
+def make_w_match(pattern):
+    pattern = w(pattern)
+    return lambda other: pattern == other
+
+
+def run(number=NUMBER, out=sys.stdout):
+    list_handle = [("overload", make_overloaded()), ("compiled", make_in_turn(compile)),
+                   ("w", make_in_turn(make_w_match))]
+    list_call = [("first", (LIST_OP[0], LIST_VALUE[0])), ("last", (LIST_OP[-1], LIST_VALUE[-1])),
+                 ("all", None)]
+    all_args = [(op, value) for op in LIST_OP for value in LIST_VALUE]
+    print("{0:>6} {1:>14} {2:>14} {3:>14} {4:>10}".format(
+        "call", "overload (us)", "compiled (us)", "w (us)", "speedup"), file=out)
+    for (call_name, args) in list_call:
+        list_args = all_args if args is None else [args]
+        list_seconds = []
+        for (_, handle) in list_handle:
+            assert([handle(*args) for args in all_args] == range(len(all_args)))
+
+            def call_all():
+                for args in list_args:
+                    handle(*args)
+            call_number = max(1, number // len(list_args))
+            list_seconds.append(min(Timer(call_all).repeat(3, call_number)) / (call_number * len(list_args)))
+        print("{0:>6} {1:>14.3f} {2:>14.3f} {3:>14.3f} {4:>10.1f}".format(
+            call_name, list_seconds[0] * 1e6, list_seconds[1] * 1e6, list_seconds[2] * 1e6,
+            list_seconds[1] / list_seconds[0]), file=out)
+
+
+if __name__ == "__main__":
+    run()
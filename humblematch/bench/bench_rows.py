@@ -0,0 +1,32 @@
+'''
+match_rows (match_many with executor="columns") on 1M rows of a list of
+dicts, compared with a compiled pattern matching each row, and match_many.
+'''
+from __future__ import print_function
+from timeit import Timer
+import sys
+
+from humblematch import OR, compile, match_many, match_rows
+
+ROW_COUNT = 10 ** 6
+
+PATTERN = {"a": int, "b": OR(str, None)}
+
+
+def run(row_count=ROW_COUNT, out=sys.stdout):
+    list_row = [{"a": row_index, "b": (None if row_index % 3 else "x")} for row_index in range(row_count)]
+    matcher = compile(PATTERN)
+
+    list_case = [("compiled, each row", lambda: [matcher(row) for row in list_row]),
+                 ("match_many", lambda: match_many(PATTERN, list_row)),
+                 ("match_rows", lambda: match_rows(PATTERN, list_row))]
+    expected = list_case[1][1]()
+    print("{0:>20} {1:>12}".format("case", "ms"), file=out)
+    for (name, func) in list_case:
+        assert(func() == expected)
+        seconds = min(Timer(func).repeat(3, 1))
+        print("{0:>20} {1:>12.3f}".format(name, seconds * 1e3), file=out)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,42 @@
+'''
+Worst case of list patterns with more than one WrapMultiObj.
+
+Pattern is some number of [int] repeats followed by a [str] repeat. Every
+split of the ints between the repeats is a candidate, and a str at the start
+means all of them fail, but only after the whole list is looked at. Trying
+splits one by one takes exponential time in number of repeats;
+humblematch.sequence should take time linear in the list length (for a fixed
+pattern), so time per element should stay flat as the list grows.
+'''
+from __future__ import print_function
+from timeit import default_timer
+import sys
+
+from humblematch import w, inf, compile
+
+LIST_LENGTH = [100, 1000, 10000, 100000]
+LIST_REPEAT_COUNT = [2, 4, 8]
+
+
+def time_once(func, *args):
+    start = default_timer()
+    func(*args)
+    return default_timer() - start
+
+
+def run(list_length=LIST_LENGTH, list_repeat_count=LIST_REPEAT_COUNT, out=sys.stdout):
+    print("{0:>8} {1:>8} {2:>10} {3:>12} {4:>12}".format(
+        "repeats", "length", "result", "total (s)", "per elem (us)"), file=out)
+
+    for repeat_count in list_repeat_count:
+        matcher = compile([w([int]).times(0, inf)] * repeat_count + [w([str]).times(1, inf)])
+        for length in list_length:
+            for (other, result) in ((["a"] + [0] * (length - 2) + ["a"], "fail"),
+                                    ([0] * (length - 1) + ["a"], "match")):
+                seconds = time_once(matcher, other)
+                print("{0:>8} {1:>8} {2:>10} {3:>12.4f} {4:>12.3f}".format(
+                    repeat_count, length, result, seconds, seconds / length * 1e6), file=out)
+
+
+if __name__ == "__main__":
+    run()
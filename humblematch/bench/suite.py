@@ -0,0 +1,330 @@
+'''
+Benchmark suite covering the shapes of patterns, runnable as
+
+    python -m humblematch.bench --output before.json
+    python -m humblematch.bench --output after.json
+    python -m humblematch.bench compare before.json after.json --threshold 0.1
+
+Each case is timed with w(pattern) == other and with compile(pattern), as
+"<case>/w" and "<case>/compiled". Results are written as JSON, with seconds
+per call (the best of a few runs) for each case. compare exits with 1 if any
+case got slower than the threshold allows.
+'''
+from __future__ import print_function
+from argparse import ArgumentParser
+from collections import namedtuple
+from timeit import default_timer
+import json
+import platform
+import sys
+
+from humblematch import w, OR, inf, compile
+
+__all__ = ["run_suite", "compare_results", "main"]
+
+RESULT_VERSION = 1
+# each case is called at least this long in one run
+MIN_RUN_SECONDS = 0.1
+REPEAT = 3
+DEFAULT_THRESHOLD = 0.1
+# w(...) == other is slow for long lists, so cases longer than this are
+# only timed compiled
+MAX_W_ELEMENTS = 10 ** 5
+LIST_TIMES_ELEMENTS = [10 ** 3, 10 ** 5, 10 ** 7]
+
+
+class BenchCase(namedtuple("BenchCase", ["name", "make"])):
+
+    '''
+    Internal class. A timed case.
+    name -> like "<shape>/w" or "<shape>/compiled"
+    make -> function returning the function to time, called once before
+            timing so that building the input isnt timed
+    '''
+
+    __slots__ = ()
+
+
+class Point(object):
+
+    '''
+    Point of the Tutorial, taking Point(x, y) or Point([x, y])
+    '''
+
+    def __init__(self, x, y=None):
+        if w([int, int]) == [x, y]:
+            self.x = x
+            self.y = y
+        elif w([[int, int], None]) == [x, y]:
+            x, y = x
+            self.x = x
+            self.y = y
+        else:
+            raise TypeError("Pass proper arguments")
+
+
+def diff_list(list_1, list_2):
+    '''
+    diff_list of the Tutorial
+    '''
+    try:
+        assert(w([list, list]) == [list_1, list_2])
+    except AssertionError:
+        raise TypeError("Both arguments must be list or a list-ish iterable")
+
+    exclusive_list_1 = [ele for ele in list_1 if ele not in list_2]
+    exclusive_list_2 = [ele for ele in list_2 if ele not in list_1]
+    return [exclusive_list_1 or None, exclusive_list_2 or None]
+
+
+class Record(object):
+    pass
+
+
+def make_record(attribute_count):
+    record = Record()
+    for attribute_index in range(attribute_count):
+        setattr(record, "a{0}".format(attribute_index), attribute_index)
+    return record
+
+
+def nested_list(depth, leaf):
+    for _ in range(depth):
+        leaf = [leaf]
+    return leaf
+
+
+def nested_dict(depth, leaf):
+    for _ in range(depth):
+        leaf = {"child": leaf, "id": 1}
+    return leaf
+
+
+def nested_dict_pattern(depth, leaf):
+    for _ in range(depth):
+        leaf = {"child": leaf, "id": int}
+    return leaf
+
+
+def list_shape():
+    '''
+    Returns list of (shape name, function returning (pattern, other)),
+    pattern matching other
+    '''
+    list_shape = [
+        ("scalar_type", lambda: (int, 5)),
+        ("scalar_value", lambda: ("get", "get")),
+        ("or_values_1000", lambda: (OR(*range(1000)), 999)),
+        ("or_types_50", lambda: (OR(*[type("T{0}".format(index), (object,), {}) for index in range(49)] + [str]),
+                                 "a")),
+        ("or_unhashable_100", lambda: (OR(*[[index] for index in range(100)]), [99])),
+        ("nested_list_100", lambda: (nested_list(100, int), nested_list(100, 1))),
+        ("nested_dict_50", lambda: (nested_dict_pattern(50, str), nested_dict(50, "a"))),
+        ("wide_dict_1000", lambda: (dict(("k{0}".format(index), int) for index in range(1000)),
+                                    dict(("k{0}".format(index), index) for index in range(1000)))),
+        ("as_obj_50", lambda: (w(dict(("a{0}".format(index), int) for index in range(50))).as_obj(),
+                               make_record(50))),
+        ("save_as_dict_10", lambda: (dict(("k{0}".format(index), w(int).save_as("k{0}".format(index)))
+                                          for index in range(10)),
+                                     dict(("k{0}".format(index), index) for index in range(10)))),
+        ("save_as_times_10000", lambda: ([w([w(int).save_as("x")]).times(0, inf)], range(10 ** 4))),
+    ]
+    for element_count in LIST_TIMES_ELEMENTS:
+        list_shape.append(("times_{0}".format(element_count),
+                           (lambda element_count: lambda: ([w([int]).times(0, inf)], range(element_count)))(
+                               element_count)))
+    list_shape.append(("times_pair_100000", lambda: ([w([int, str]).times(0, inf)], [1, "a"] * (10 ** 5 / 2))))
+    return list_shape
+
+
+def make_w(make_pattern_other):
+    (pattern, other) = make_pattern_other()
+    pattern = w(pattern)
+    assert(pattern == other)
+    return lambda: pattern == other
+
+
+def make_compiled(make_pattern_other):
+    (pattern, other) = make_pattern_other()
+    matcher = compile(pattern)
+    assert(matcher(other))
+    return lambda: matcher(other)
+
+
+def make_point():
+    Point(1, 2)
+    return lambda: (Point(1, 2), Point([1, 2]))
+
+
+def make_diff_list():
+    list_1 = [float(index) for index in range(0, 20, 2)]
+    list_2 = [float(index) for index in range(0, 20, 3)]
+    # Test 1 and Test 2 of the Tutorial
+    pattern_1 = w([OR(list, None), OR(list, None)])
+    pattern_2 = w([[w([float]).times(0, inf)], [w([float]).times(0, inf)]])
+    assert(diff_list(list_1, list_2) == pattern_1)
+    assert(diff_list(list_1, list_2) == pattern_2)
+    return lambda: (diff_list(list_1, list_2) == pattern_1) and (diff_list(list_1, list_2) == pattern_2)
+
+
+def list_case():
+    '''
+    Returns list of all BenchCase
+    '''
+    list_bench_case = []
+    for (shape_name, make_pattern_other) in list_shape():
+        if not shape_name.startswith("times_") or int(shape_name.rpartition("_")[2]) <= MAX_W_ELEMENTS:
+            list_bench_case.append(BenchCase(shape_name + "/w", (lambda make: lambda: make_w(make))(
+                make_pattern_other)))
+        list_bench_case.append(BenchCase(shape_name + "/compiled", (lambda make: lambda: make_compiled(make))(
+            make_pattern_other)))
+    list_bench_case.append(BenchCase("tutorial_point/w", make_point))
+    list_bench_case.append(BenchCase("tutorial_diff_list/w", make_diff_list))
+    return list_bench_case
+
+
+def time_func(func, min_run_seconds=MIN_RUN_SECONDS, repeat=REPEAT):
+    '''
+    Returns (best seconds per call, calls in each run). Calls are
+    increased tenfold until a run takes min_run_seconds.
+    '''
+    number = 1
+    while True:
+        start = default_timer()
+        for _ in xrange(number):
+            func()
+        seconds = default_timer() - start
+        if seconds >= min_run_seconds or number >= 10 ** 7:
+            break
+        number *= 10
+
+    list_seconds = [seconds]
+    for _ in range(repeat - 1):
+        start = default_timer()
+        for _ in xrange(number):
+            func()
+        list_seconds.append(default_timer() - start)
+    return (min(list_seconds) / number, number)
+
+
+def run_suite(name_filter=None, min_run_seconds=MIN_RUN_SECONDS, repeat=REPEAT, out=sys.stdout):
+    '''
+    Times cases whose name contains name_filter (all if None), printing
+    each to out. Returns the results as a JSON-able dict.
+    '''
+    dict_result = {}
+    print("{0:>32} {1:>14} {2:>10}".format("case", "per call (us)", "calls"), file=out)
+    for bench_case in list_case():
+        if name_filter is not None and name_filter not in bench_case.name:
+            continue
+        (seconds, number) = time_func(bench_case.make(), min_run_seconds, repeat)
+        dict_result[bench_case.name] = {"seconds": seconds, "number": number, "repeat": repeat}
+        print("{0:>32} {1:>14.3f} {2:>10}".format(bench_case.name, seconds * 1e6, number), file=out)
+
+    return {
+        "version": RESULT_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": dict_result,
+    }
+
+
+CompareRow = namedtuple("CompareRow", ["name", "old_seconds", "new_seconds", "ratio", "status"])
+
+
+def compare_results(old_result, new_result, threshold=DEFAULT_THRESHOLD):
+    '''
+    Returns list of CompareRow for each case in either result. ratio is
+    new/old seconds, status "slower" or "faster" if ratio differs from 1 by
+    more than threshold (0.1 is 10%), else "same", or "missing" if a case is
+    only in one of them.
+    '''
+    if not (threshold >= 0):
+        raise ValueError("threshold={threshold} should be at least 0".format(threshold=threshold))
+    old_dict = old_result["results"]
+    new_dict = new_result["results"]
+    list_row = []
+    for name in sorted(set(old_dict) | set(new_dict)):
+        if name not in old_dict or name not in new_dict:
+            old_seconds = old_dict[name]["seconds"] if name in old_dict else None
+            new_seconds = new_dict[name]["seconds"] if name in new_dict else None
+            list_row.append(CompareRow(name, old_seconds, new_seconds, None, "missing"))
+            continue
+        (old_seconds, new_seconds) = (old_dict[name]["seconds"], new_dict[name]["seconds"])
+        ratio = new_seconds / old_seconds if old_seconds else inf
+        if ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "same"
+        list_row.append(CompareRow(name, old_seconds, new_seconds, ratio, status))
+    return list_row
+
+
+def print_compare(list_row, out=sys.stdout):
+    print("{0:>32} {1:>12} {2:>12} {3:>8} {4:>8}".format("case", "old (us)", "new (us)", "ratio", ""), file=out)
+    for row in list_row:
+        if row.status == "missing":
+            print("{0:>32} {1:>12} {2:>12} {3:>8} {4:>8}".format(
+                row.name, format_us(row.old_seconds), format_us(row.new_seconds), "", "missing"), file=out)
+        else:
+            print("{0:>32} {1:>12} {2:>12} {3:>8.2f} {4:>8}".format(
+                row.name, format_us(row.old_seconds), format_us(row.new_seconds), row.ratio, row.status), file=out)
+
+
+def format_us(seconds):
+    return "-" if seconds is None else "{0:.3f}".format(seconds * 1e6)
+
+
+def make_parser():
+    parser = ArgumentParser(prog="python -m humblematch.bench")
+    list_subparser = parser.add_subparsers(dest="command")
+
+    run_parser = list_subparser.add_parser("run", help="time the cases (the default)")
+    run_parser.add_argument("--output", "-o", metavar="FILE", help="write results as JSON to FILE")
+    run_parser.add_argument("-k", dest="name_filter", metavar="SUBSTRING",
+                            help="only time cases whose name contains SUBSTRING")
+    run_parser.add_argument("--min-time", type=float, default=MIN_RUN_SECONDS,
+                            help="seconds each run takes at least (default: %(default)s)")
+    run_parser.add_argument("--repeat", type=int, default=REPEAT,
+                            help="number of runs, the best is kept (default: %(default)s)")
+
+    compare_parser = list_subparser.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("old", metavar="OLD")
+    compare_parser.add_argument("new", metavar="NEW")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="allowed slowdown, 0.1 is 10%% (default: %(default)s)")
+    return parser
+
+
+def main(argv=None, out=sys.stdout):
+    '''
+    Runs command line in argv, returns exit status. For compare, it is 1 if
+    any case got slower.
+    '''
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv[0] not in ("run", "compare", "-h", "--help"):
+        argv = ["run"] + list(argv)
+    args = make_parser().parse_args(argv)
+
+    if args.command == "run":
+        result = run_suite(args.name_filter, args.min_time, args.repeat, out)
+        if args.output is not None:
+            with open(args.output, "w") as result_file:
+                json.dump(result, result_file, indent=2, sort_keys=True)
+        return 0
+
+    try:
+        with open(args.old) as old_file:
+            old_result = json.load(old_file)
+        with open(args.new) as new_file:
+            new_result = json.load(new_file)
+        list_row = compare_results(old_result, new_result, args.threshold)
+    except (IOError, ValueError, KeyError) as e:
+        print("error: {error}".format(error=e), file=sys.stderr)
+        return 2
+    print_compare(list_row, out)
+    return (1 if any(row.status == "slower" for row in list_row) else 0)
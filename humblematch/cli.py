@@ -0,0 +1,234 @@
+'''
+Command line interface, run as python -m humblematch.
+
+    python -m humblematch validate --pattern mymod:PATTERN data/*.ndjson
+
+validate matches every record of NDJSON files (one JSON value per line) or
+JSON files (one array of records) with a pattern, and prints how many
+failed and where. The parent process only reads files, in large blocks
+ending at a line break. Parsing and matching is done by worker processes.
+'''
+from __future__ import print_function
+from argparse import ArgumentParser
+from importlib import import_module
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+from timeit import default_timer
+import json
+import sys
+
+__all__ = ["main"]
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_SHOW_FAILURES = 10
+
+# matcher of this process, when it is a worker started by validate
+worker_match = None
+
+
+def load_pattern(pattern_spec):
+    '''
+    Returns matcher for pattern_spec like "package.module:NAME", where
+    NAME is a pattern (compiled if it isnt a Matcher already)
+    '''
+    from matcher import Matcher
+
+    (module_name, _, attribute_name) = pattern_spec.partition(":")
+    if not (module_name and attribute_name):
+        raise ValueError("pattern={pattern_spec} should be like module:NAME".format(pattern_spec=pattern_spec))
+    pattern = import_module(module_name)
+    for name in attribute_name.split("."):
+        pattern = getattr(pattern, name)
+    if isinstance(pattern, Matcher):
+        return pattern
+    return Matcher(pattern)
+
+
+def file_format(path, format_name):
+    '''
+    Internal function. Returns "ndjson" or "json" for file at path
+    '''
+    if format_name != "auto":
+        return format_name
+    if path.endswith(".json"):
+        return "json"
+    return "ndjson"
+
+
+def iter_tasks(list_path, format_name, block_size):
+    '''
+    Internal function. Yields (path, format, first line number, text) for
+    blocks of NDJSON files, ending at a line break, and for whole JSON files
+    '''
+    for path in list_path:
+        if file_format(path, format_name) == "json":
+            # an array cant be split without parsing it
+            yield (path, "json", 1, None)
+            continue
+        line_number = 1
+        with open(path, "rb") as data_file:
+            while True:
+                block = data_file.read(block_size)
+                if not block:
+                    break
+                # complete the last line
+                block += data_file.readline()
+                yield (path, "ndjson", line_number, block)
+                line_number += block.count("\n")
+
+
+def iter_records(path, format_name, line_number, block):
+    '''
+    Internal function. Yields (line or record number, record) for each
+    record in a task, numbered from 1. Record is ValueError if it isnt
+    valid JSON.
+    '''
+    if format_name == "json":
+        try:
+            with open(path, "rb") as data_file:
+                list_record = json.load(data_file)
+        except ValueError as e:
+            yield (0, e)
+            return
+        if not isinstance(list_record, list):
+            yield (0, ValueError("{path} should have an array of records".format(path=path)))
+            return
+        for (record_index, record) in enumerate(list_record, 1):
+            yield (record_index, record)
+        return
+
+    for (line_index, line) in enumerate(block.splitlines()):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = e
+        yield (line_number + line_index, record)
+
+
+def validate_task(task, show_failures):
+    '''
+    Internal function. Returns (path, number of records, number of
+    failures, first show_failures (line number, reason)) of a task
+    '''
+    (path, format_name, line_number, block) = task
+    record_count = 0
+    failure_count = 0
+    list_failure = []
+    for (record_line, record) in iter_records(path, format_name, line_number, block):
+        record_count += 1
+        if isinstance(record, ValueError):
+            reason = "invalid JSON: {error}".format(error=record)
+        elif worker_match(record):
+            continue
+        else:
+            reason = "doesnt match"
+        failure_count += 1
+        if len(list_failure) < show_failures:
+            list_failure.append((record_line, reason))
+    return (path, format_name, record_count, failure_count, list_failure)
+
+
+def start_worker(pattern_spec):
+    '''
+    Internal function. Loads the pattern in a new worker process
+    '''
+    global worker_match
+    worker_match = load_pattern(pattern_spec)
+
+
+class TaskValidator(object):
+
+    '''
+    Internal class. Callable validating a task in a worker
+    '''
+
+    def __init__(self, show_failures):
+        super(TaskValidator, self).__init__()
+        self.show_failures = show_failures
+
+    def __call__(self, task):
+        return validate_task(task, self.show_failures)
+
+
+def validate(pattern_spec, list_path, workers=None, format_name="auto", block_size=DEFAULT_BLOCK_SIZE,
+             show_failures=DEFAULT_SHOW_FAILURES, out=sys.stdout):
+    '''
+    Validates records of files in list_path with pattern, printing summary
+    and first show_failures failures to out. Returns number of failures.
+    workers -> number of worker processes, None starts one for each cpu
+               and 1 validates in this process
+    '''
+    workers = workers or cpu_count()
+    iter_task = iter_tasks(list_path, format_name, block_size)
+    validate_one = TaskValidator(show_failures)
+
+    start = default_timer()
+    if workers == 1:
+        start_worker(pattern_spec)
+        pool = None
+        iter_result = (validate_one(task) for task in iter_task)
+    else:
+        # load it here too, so that a wrong pattern_spec fails early
+        load_pattern(pattern_spec)
+        pool = Pool(workers, initializer=start_worker, initargs=(pattern_spec,))
+        iter_result = pool.imap(validate_one, iter_task)
+
+    record_count = 0
+    failure_count = 0
+    list_failure = []
+    try:
+        for (path, format_name, task_record_count, task_failure_count, task_list_failure) in iter_result:
+            record_count += task_record_count
+            failure_count += task_failure_count
+            for (record_line, reason) in islice(task_list_failure, show_failures - len(list_failure)):
+                location = "line" if format_name == "ndjson" else "record"
+                list_failure.append("{path} {location} {record_line}: {reason}".format(
+                    path=path, location=location, record_line=record_line, reason=reason))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    seconds = default_timer() - start
+
+    print("{record_count} records, {failure_count} failed, {seconds:.2f}s, {throughput:.0f} records/s".format(
+        record_count=record_count, failure_count=failure_count, seconds=seconds,
+        throughput=(record_count / seconds if seconds else 0)), file=out)
+    for failure in list_failure:
+        print(failure, file=out)
+    return failure_count
+
+
+def make_parser():
+    parser = ArgumentParser(prog="python -m humblematch")
+    list_subparser = parser.add_subparsers(dest="command")
+
+    validate_parser = list_subparser.add_parser("validate", help="validate records of NDJSON or JSON files")
+    validate_parser.add_argument("--pattern", required=True, metavar="MODULE:NAME",
+                                 help="pattern to match records with, like mymod:PATTERN")
+    validate_parser.add_argument("files", nargs="+", metavar="FILE")
+    validate_parser.add_argument("--workers", "-j", type=int, default=None,
+                                 help="number of worker processes (default: one for each cpu)")
+    validate_parser.add_argument("--format", choices=["auto", "ndjson", "json"], default="auto",
+                                 help="auto treats *.json as JSON array and others as NDJSON")
+    validate_parser.add_argument("--show-failures", "-k", type=int, default=DEFAULT_SHOW_FAILURES,
+                                 help="number of failures to print (default: %(default)s)")
+    validate_parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE,
+                                 help="bytes of NDJSON sent to a worker at once (default: %(default)s)")
+    return parser
+
+
+def main(argv=None, out=sys.stdout):
+    '''
+    Runs command line in argv, returns exit status. It is 1 if any record
+    failed validation.
+    '''
+    args = make_parser().parse_args(argv)
+    if args.command == "validate":
+        try:
+            failure_count = validate(args.pattern, args.files, args.workers, args.format, args.block_size,
+                                     args.show_failures, out)
+        except (ImportError, AttributeError, ValueError, IOError) as e:
+            print("error: {error}".format(error=e), file=sys.stderr)
+            return 2
+        return (1 if failure_count else 0)
@@ -0,0 +1,468 @@
+from collections import Mapping, Iterable
+from warnings import warn
+import __builtin__
+import linecache
+import types
+
+from wrap_obj import WrapObj, WrapMultiObj, list_length_bounds, slice_list
+from sequence import Repeat, SequenceMatcher
+import arrays
+
+__all__ = ["generate_source", "compile_source"]
+
+# types whose repr can be put directly in the generated source
+LITERAL_TYPES = (int, long, bool, types.NoneType) + types.StringTypes
+
+# generated code is moved to a helper function when it gets nested deeper
+# than this, to stay under the indentation and nested block limits of python
+MAX_INDENT = 40
+MAX_LOOPS = 15
+
+
+def generate_source(pattern):
+    '''
+    Generates python source of a function, which matches like
+    w(pattern) == other. Returns (source, namespace), where namespace holds
+    the types and values used by the source, which could not be inlined.
+
+    >>> source, namespace = generate_source([int, "a"])
+    >>> print(source)  # doctest: +NORMALIZE_WHITESPACE
+    def match(x0):
+        if isinstance(x0, Iterable) and (not isinstance(x0, Mapping)):
+            if len(x0) != 2:
+                return False
+            x1 = x0[0]
+            if not isinstance(x1, int):
+                return False
+            x2 = x0[1]
+            if not ('a' == x2):
+                return False
+        else:
+            if not (x0 == c0):
+                return False
+        return True
+    <BLANKLINE>
+    '''
+    generator = SourceGenerator()
+    generator.emit_function("match", pattern)
+    return (generator.get_source(), generator.namespace)
+
+
+def compile_source(pattern):
+    '''
+    Generates the source of pattern and executes it.
+    Returns (match_function, source).
+
+    >>> (match, source) = compile_source({"a": WrapObj(int).save_as("a")})
+    >>> match({"a": 5})
+    {'a': 5}
+    >>> match({"b": 5})
+    False
+    '''
+    (source, namespace) = generate_source(pattern)
+    filename = "<humblematch {id}>".format(id=id(namespace))
+    code = compile(source, filename, "exec")
+    # let tracebacks and debuggers show the generated lines
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec code in namespace
+    return (namespace["match"], source)
+
+
+class SourceGenerator(object):
+
+    '''
+    Internal class. Writes the source for a pattern.
+
+    Names used in the generated source -
+    xN for the part of other being matched,
+    sN for the dict of saved values, cN for constants and iN, nN, rN, kN, vN
+    for loop counters and temporaries.
+    '''
+
+    def __init__(self):
+        super(SourceGenerator, self).__init__()
+        self.namespace = {"Iterable": Iterable, "Mapping": Mapping,
+                          "Repeat": Repeat, "SequenceMatcher": SequenceMatcher,
+                          "slice_list": slice_list}
+        self.list_function_lines = []
+        self.lines = []
+        self.indent = 0
+        self.loops = 0
+        self.used_saved_names = set()
+        self.name_counts = {}
+        self.constant_names = {}
+
+    def get_source(self):
+        return "\n".join(line for line in self.list_function_lines if line is not None).rstrip() + "\n"
+
+    def new_name(self, prefix):
+        count = self.name_counts.get(prefix, 0)
+        self.name_counts[prefix] = count + 1
+        return "{prefix}{count}".format(prefix=prefix, count=count)
+
+    def literal(self, value):
+        '''
+        Returns source for value, either its repr or name of a constant
+        '''
+        if type(value) in LITERAL_TYPES:
+            return repr(value)
+
+        # builtin types like int are used by their name
+        if isinstance(value, type) and getattr(__builtin__, value.__name__, None) is value:
+            return value.__name__
+
+        # float repr is exact in python 2.7, but not for inf and nan
+        if type(value) is float and (value - value == 0):
+            return repr(value)
+
+        try:
+            return self.constant_names[id(value)][0]
+        except KeyError:
+            name = "c{count}".format(count=len(self.constant_names))
+            # value is kept too, so that its id isnt reused while generating
+            self.constant_names[id(value)] = (name, value)
+            self.namespace[name] = value
+            return name
+
+    def emit(self, line):
+        self.lines.append("    " * self.indent + line)
+        return len(self.lines) - 1
+
+    def emit_saved_dict(self, saved_name):
+        '''
+        Emits creation of a dict for saved values. It is removed again by
+        remove_unused_saved_dict if nothing ends up saved into it.
+        '''
+        return self.emit("{s} = {{}}".format(s=saved_name))
+
+    def remove_unused_saved_dict(self, saved_name, line_index):
+        if saved_name not in self.used_saved_names:
+            self.lines[line_index] = None
+            return False
+        return True
+
+    def emit_function(self, function_name, data):
+        '''
+        Emits def function_name(x0), which returns like WrapObj(data) == x0
+        '''
+        (outer_lines, outer_indent, outer_loops) = (self.lines, self.indent, self.loops)
+        (self.lines, self.indent, self.loops) = ([], 0, 0)
+
+        other_name = self.new_name("x")
+        saved_name = self.new_name("s")
+        self.emit("def {function_name}({x}):".format(function_name=function_name, x=other_name))
+        self.indent += 1
+        line_index = self.emit_saved_dict(saved_name)
+        self.emit_node(data, other_name, saved_name)
+        if self.remove_unused_saved_dict(saved_name, line_index):
+            self.emit("return ({s} or True)".format(s=saved_name))
+        else:
+            self.emit("return True")
+        self.emit("")
+
+        self.list_function_lines.extend(self.lines)
+        (self.lines, self.indent, self.loops) = (outer_lines, outer_indent, outer_loops)
+
+    def emit_node(self, data, other_name, saved_name):
+        '''
+        Emits code which returns False, unless WrapObj(data) == other.
+        Saved values go to dict named saved_name.
+        '''
+        if self.indent > MAX_INDENT or self.loops > MAX_LOOPS:
+            self.emit_helper_call(data, other_name, saved_name)
+        else:
+            self.emit_wrap(data, False, False, None, other_name, saved_name)
+
+    def emit_helper_call(self, data, other_name, saved_name):
+        function_name = self.new_name("match")
+        self.emit_function(function_name, data)
+        self.emit_call(function_name, other_name, saved_name)
+
+    def emit_call(self, function_name, other_name, saved_name):
+        '''
+        Emits call to a function returning like WrapObj.__eq__
+        '''
+        result_name = self.new_name("r")
+        self.emit("{r} = {function_name}({x})".format(r=result_name, function_name=function_name, x=other_name))
+        self.emit("if not {r}:".format(r=result_name))
+        self.emit("    return False")
+        self.emit("if {r} is not True:".format(r=result_name))
+        self.emit("    {s}.update({r})".format(s=saved_name, r=result_name))
+        self.used_saved_names.add(saved_name)
+
+    def emit_wrap(self, data, do_typecheck, treat_as_object, save_key, other_name, saved_name):
+        '''
+        Emits WrapObj.__eq__ of a WrapObj with given state
+        '''
+        if do_typecheck:
+            self.emit("if {c} != type({x}):".format(c=self.literal(type(data)), x=other_name))
+            self.emit("    return False")
+            self.emit_wrap(data, False, treat_as_object, save_key, other_name, saved_name)
+
+        elif isinstance(data, WrapObj):
+            self.emit_wrap(data.data, data.DO_TYPECHECK, data.treat_as_object, data.save_key,
+                           other_name, saved_name)
+
+        elif isinstance(data, WrapMultiObj):
+            list_name = self.new_name("x")
+            self.emit("{y} = [{x}]".format(y=list_name, x=other_name))
+            self.emit_multi(data, list_name, saved_name)
+
+        elif isinstance(data, types.StringTypes):
+            self.emit("if not ({c} == {x}):".format(c=self.literal(data), x=other_name))
+            self.emit("    return False")
+
+        elif treat_as_object:
+            if not isinstance(data, Mapping):
+                raise TypeError("data={data} should be of type Mapping "
+                                "(e.g. dict)".format(data=data))
+            self.emit_dict_or_obj(data, object, other_name, saved_name)
+
+        elif isinstance(data, Iterable) and (not isinstance(data, Mapping)):
+            self.emit("if isinstance({x}, Iterable) and (not isinstance({x}, Mapping)):".format(x=other_name))
+            self.indent += 1
+            self.emit_list(data, other_name, saved_name)
+            self.indent -= 1
+            self.emit("else:")
+            self.indent += 1
+            self.emit_value(data, save_key, other_name, saved_name)
+            self.indent -= 1
+
+        elif isinstance(data, Mapping):
+            self.emit("if isinstance({x}, Mapping):".format(x=other_name))
+            self.indent += 1
+            self.emit_dict_or_obj(data, dict, other_name, saved_name)
+            self.indent -= 1
+            self.emit("else:")
+            self.indent += 1
+            self.emit_value(data, save_key, other_name, saved_name)
+            self.indent -= 1
+
+        else:
+            self.emit_value(data, save_key, other_name, saved_name)
+
+    def emit_value(self, value_or_type, save_key, other_name, saved_name):
+        '''
+        Emits check_as_value_and_type and save_as of a leaf
+        '''
+        if isinstance(value_or_type, type):
+            self.emit("if not isinstance({x}, {c}):".format(x=other_name, c=self.literal(value_or_type)))
+        else:
+            self.emit("if not ({x} == {c}):".format(x=other_name, c=self.literal(value_or_type)))
+        self.emit("    return False")
+
+        if save_key is not None:
+            self.emit("{s}[{key}] = {x}".format(s=saved_name, key=self.literal(save_key), x=other_name))
+            self.used_saved_names.add(saved_name)
+
+    def emit_list(self, data, other_name, saved_name):
+        '''
+        Emits WrapObj.match_list, in the same way as matcher.compile_list
+        '''
+        data = [data[ele_index] for ele_index in range(len(data))]
+        multiobj_indexes = [ele_index for (ele_index, ele_data) in enumerate(data)
+                            if isinstance(ele_data, WrapMultiObj)]
+
+        if not multiobj_indexes:
+            self.emit("if len({x}) != {length}:".format(x=other_name, length=len(data)))
+            self.emit("    return False")
+            for (ele_index, ele_data) in enumerate(data):
+                self.emit_element(ele_data, "{x}[{index}]".format(x=other_name, index=ele_index), saved_name)
+            return
+        elif len(multiobj_indexes) > 1:
+            self.emit_sequence(data, other_name, saved_name)
+            return
+
+        multiobj_index = multiobj_indexes[0]
+        list_backwards = list(reversed(data[multiobj_index + 1:]))
+        self.emit_length_check(list_length_bounds(data), other_name)
+
+        for ele_index in range(multiobj_index):
+            self.emit_element(data[ele_index], "{x}[{index}]".format(x=other_name, index=ele_index), saved_name)
+        for (ele_index, ele_data) in enumerate(list_backwards):
+            self.emit_element(ele_data, "{x}[{index}]".format(x=other_name, index=-1 - ele_index), saved_name)
+
+        slice_name = self.new_name("x")
+        end = -len(list_backwards) or None
+        # xrange cant be sliced
+        self.emit("if type({x}) is xrange:".format(x=other_name))
+        self.emit("    {y} = slice_list({x}, {start}, {end})".format(y=slice_name, x=other_name,
+                                                                     start=multiobj_index, end=end))
+        self.emit("else:")
+        self.emit("    {y} = {x}[{start}:{end}]".format(y=slice_name, x=other_name, start=multiobj_index,
+                                                        end=("" if end is None else end)))
+        self.emit_multi(data[multiobj_index], slice_name, saved_name)
+
+    def emit_sequence(self, data, other_name, saved_name):
+        '''
+        Emits list with more than one WrapMultiObj, which is matched by
+        a sequence.SequenceMatcher made from helper functions
+        '''
+        list_segment_source = []
+        for ele_data in data:
+            if isinstance(ele_data, WrapMultiObj):
+                list_unit_name = []
+                for unit_data in ele_data.checked_data():
+                    list_unit_name.append(self.new_name("match"))
+                    self.emit_function(list_unit_name[-1], unit_data)
+                (range_low, range_high) = ele_data.repeat_allowed_range
+                list_segment_source.append("Repeat([{units}], {low}, {high}, {key})".format(
+                    units=", ".join(list_unit_name), low=self.literal(range_low),
+                    high=self.literal(range_high), key=self.literal(ele_data.save_key)))
+            else:
+                list_segment_source.append(self.new_name("match"))
+                self.emit_function(list_segment_source[-1], ele_data)
+
+        self.emit_length_check(list_length_bounds(data), other_name)
+        sequence_name = self.new_name("sequence")
+        self.list_function_lines.append("{name} = SequenceMatcher([{segments}])".format(
+            name=sequence_name, segments=", ".join(list_segment_source)))
+        self.list_function_lines.append("")
+        self.emit_call(sequence_name, other_name, saved_name)
+
+    def emit_length_check(self, bounds, other_name):
+        '''
+        Emits returning False when length of other_name is out of bounds
+        '''
+        list_condition = []
+        if bounds.min_len == bounds.max_len:
+            list_condition.append("{n} != {min_len}")
+        else:
+            if bounds.min_len > 0:
+                list_condition.append("{n} < {min_len}")
+            if bounds.max_len != float("inf"):
+                list_condition.append("{n} > {max_len}")
+        if bounds.modulus > 1:
+            list_condition.append("{n} % {modulus} != {remainder}")
+        if not list_condition:
+            return
+
+        length_name = self.new_name("n")
+        self.emit("{n} = len({x})".format(n=length_name, x=other_name))
+        self.emit("if {condition}:".format(condition=" or ".join(list_condition).format(
+            n=length_name, min_len=bounds.min_len, max_len=bounds.max_len,
+            modulus=bounds.modulus, remainder=bounds.remainder)))
+        self.emit("    return False")
+
+    def emit_element(self, ele_data, ele_source, saved_name):
+        ele_name = self.new_name("x")
+        self.emit("{y} = {source}".format(y=ele_name, source=ele_source))
+        self.emit_node(ele_data, ele_name, saved_name)
+
+    def emit_multi(self, multiobj, other_name, saved_name):
+        '''
+        Emits WrapMultiObj.__eq__, in the same way as matcher.compile_multi
+        '''
+        data = list(multiobj.checked_data())
+        (range_low, range_high) = multiobj.repeat_allowed_range
+        data_len = len(data)
+        x = other_name
+
+        self.emit("if not (isinstance({x}, Iterable) and (not isinstance({x}, Mapping))):".format(x=x))
+        self.emit("    return False")
+        if data_len == 1:
+            count_source = "len({x})".format(x=x)
+        else:
+            count_source = self.new_name("n")
+            remainder_name = self.new_name("r")
+            self.emit("({n}, {r}) = divmod(len({x}), {length})".format(n=count_source, r=remainder_name,
+                                                                      x=x, length=data_len))
+            self.emit("if {r}:".format(r=remainder_name))
+            self.emit("    return False")
+        if range_low > 0:
+            self.emit("if {n} < {low}:".format(n=count_source, low=self.literal(range_low)))
+            self.emit("    return False")
+        if range_high != float("inf"):
+            self.emit("if {n} >= {high}:".format(n=count_source, high=self.literal(range_high)))
+            self.emit("    return False")
+
+        multi_saved_name = self.new_name("s")
+        multi_line_index = self.emit_saved_dict(multi_saved_name)
+
+        # same as matcher.compile_multi, arrays are checked from the type
+        # of their elements when the pattern allows it
+        self.namespace.update(ARRAY_TYPES=arrays.ARRAY_TYPES, match_array=arrays.match_array)
+        result_name = self.new_name("r")
+        self.emit("{r} = match_array({m}, {x}) if isinstance({x}, ARRAY_TYPES) else None".format(
+            r=result_name, m=self.literal(multiobj), x=x))
+        self.emit("if {r} is not None:".format(r=result_name))
+        self.emit("    if not {r}:".format(r=result_name))
+        self.emit("        return False")
+        update_line_index = self.emit("    if {r} is not True: {s}.update({r})".format(
+            r=result_name, s=multi_saved_name))
+        self.emit("else:")
+        self.indent += 1
+
+        self.loops += 1
+        if data_len == 1:
+            ele_name = self.new_name("x")
+            self.emit("for {y} in {x}:".format(y=ele_name, x=x))
+            self.indent += 1
+            self.emit_repeated_element(data[0], ele_name, multi_saved_name)
+            self.indent -= 1
+        else:
+            index_name = self.new_name("i")
+            self.emit("for {i} in xrange(0, len({x}), {length}):".format(i=index_name, x=x, length=data_len))
+            self.indent += 1
+            for (ele_index, ele_data) in enumerate(data):
+                ele_name = self.new_name("x")
+                self.emit("{y} = {x}[{i} + {index}]".format(y=ele_name, x=x, i=index_name, index=ele_index))
+                self.emit_repeated_element(ele_data, ele_name, multi_saved_name)
+            self.indent -= 1
+        self.loops -= 1
+        self.indent -= 1
+
+        if multiobj.save_key is not None:
+            self.emit("{s}[{key}] = {x}".format(s=multi_saved_name, key=self.literal(multiobj.save_key), x=x))
+            self.used_saved_names.add(multi_saved_name)
+        if multi_saved_name not in self.used_saved_names:
+            # nothing can be saved, so match_array never returns a dict
+            self.lines[update_line_index] = None
+
+        if self.remove_unused_saved_dict(multi_saved_name, multi_line_index):
+            self.emit("{s}.update({m})".format(s=saved_name, m=multi_saved_name))
+            self.used_saved_names.add(saved_name)
+
+    def emit_repeated_element(self, ele_data, ele_name, multi_saved_name):
+        '''
+        Emits one element of WrapMultiObj, whose saved values are collected
+        in lists for each repeat
+        '''
+        ele_saved_name = self.new_name("s")
+        line_index = self.emit_saved_dict(ele_saved_name)
+        self.emit_node(ele_data, ele_name, ele_saved_name)
+        if self.remove_unused_saved_dict(ele_saved_name, line_index):
+            (key_name, value_name, prev_name) = (self.new_name("k"), self.new_name("v"), self.new_name("p"))
+            self.emit("for ({k}, {v}) in {e}.iteritems():".format(k=key_name, v=value_name, e=ele_saved_name))
+            self.emit("    {p} = {m}.get({k})".format(p=prev_name, m=multi_saved_name, k=key_name))
+            self.emit("    if isinstance({p}, list):".format(p=prev_name))
+            self.emit("        {p}.append({v})".format(p=prev_name, v=value_name))
+            self.emit("    else:")
+            self.emit("        {m}[{k}] = [{v}]".format(m=multi_saved_name, k=key_name, v=value_name))
+            self.used_saved_names.add(multi_saved_name)
+
+    def emit_dict_or_obj(self, data, dict_or_obj, other_name, saved_name):
+        '''
+        Emits WrapObj.match_dict_or_obj
+        '''
+        assert(dict_or_obj in (dict, object))
+        if not data:
+            # every dict (or object) matches, but a block cant be empty
+            self.emit("pass")
+        for (data_key, data_value) in data.iteritems():
+            if isinstance(data_key, type):
+                warn(("{data_key} is a class used as a key, but it "
+                      "wont match keys which are instances of this type"
+                      "").format(data_key=data_key))
+
+            value_name = self.new_name("x")
+            self.emit("try:")
+            if dict_or_obj is dict:
+                self.emit("    {y} = {x}[{key}]".format(y=value_name, x=other_name, key=self.literal(data_key)))
+                self.emit("except KeyError:")
+            else:
+                self.emit("    {y} = {x}.__getattribute__({key})".format(y=value_name, x=other_name,
+                                                                         key=self.literal(data_key)))
+                self.emit("except AttributeError:")
+            self.emit("    return False")
+            self.emit_node(data_value, value_name, saved_name)
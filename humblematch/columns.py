@@ -0,0 +1,276 @@
+'''
+Matching patterns for rows with data kept as columns - a NumPy structured
+array, or a dict of columns (NumPy arrays or lists) - without building a
+dict for each row. And matching lists of dicts column by column.
+
+The pattern is a dict pattern for one row, or .times of it. Row i matches
+if the dict pattern matches {key: column[i] for each key}, and each key is
+checked against its whole column at once. NumPy columns are checked from
+their dtype, or with one vectorized comparison for values (see arrays.py).
+Other columns, and patterns which cant be checked that way, are matched
+element by element.
+
+>>> from wrap_obj import w, inf
+>>> result = match_columns(w([{"id": int, "tag": str}]).times(0, inf),
+...                        {"id": [1, 2, 3], "tag": ["a", None, "c"]})
+>>> bool(result)
+False
+>>> result.failed_rows
+[1]
+
+match_rows gives the same as match_many for a list of dicts, by taking out
+each column with itemgetter and checking it in one loop. For columns of
+types, only the type of each distinct value is checked.
+>>> match_rows({"id": int, "tag": w(str).save_as("tag")}, [{"id": 1, "tag": "a"}, {"id": "2", "tag": "b"}])
+[{'tag': 'a'}, False]
+'''
+from abc import ABCMeta
+from collections import Mapping, namedtuple
+from operator import itemgetter
+
+from wrap_obj import WrapObj, WrapMultiObj, MetaAny, MetaMultiInstanceMatcher
+from matcher import compile_node
+import arrays
+
+__all__ = ["match_columns", "ColumnsResult", "match_rows"]
+
+
+class ColumnsResult(namedtuple("ColumnsResult", ["row_count", "failed_rows", "count_allowed", "saved"])):
+
+    '''
+    Result of match_columns, true if all rows matched.
+    row_count -> number of rows
+    failed_rows -> sorted list of indexes of rows which didnt match
+    count_allowed -> False if row_count isnt allowed by .times of pattern
+    saved -> dict of saved values when all rows matched, else None. Values
+             saved in the row pattern are columns (like lists of saved
+             values of each repeat), NumPy columns as arrays.
+    '''
+
+    __slots__ = ()
+
+    def __nonzero__(self):
+        return self.count_allowed and not self.failed_rows
+
+
+def match_columns(pattern, columns):
+    '''
+    Matches rows of columns with pattern, see ColumnsResult.
+    pattern -> dict pattern for one row (or WrapObj of it), or WrapMultiObj
+               repeating only that
+    columns -> NumPy structured array, or Mapping of key to column, where
+               all columns have the same length. Missing columns fail
+               every row.
+    '''
+    (row_data, multiobj) = split_pattern(pattern)
+    (row_count, get_column) = column_getter(columns)
+
+    dict_saved_values = {}
+    failed_rows = set()
+    for (data_key, data_value) in row_data.iteritems():
+        column = get_column(data_key)
+        if column is None:
+            failed_rows.update(xrange(row_count))
+            break
+        failed_rows.update(match_column(data_value, column, dict_saved_values))
+
+    count_allowed = True
+    if multiobj is not None:
+        count_allowed = multiobj.length_bounds.allows(row_count)
+        if multiobj.save_key is not None:
+            dict_saved_values[multiobj.save_key] = columns
+
+    saved = None
+    if count_allowed and not failed_rows:
+        saved = dict_saved_values
+    return ColumnsResult(row_count, sorted(failed_rows), count_allowed, saved)
+
+
+def split_pattern(pattern):
+    '''
+    Internal function. Returns (dict pattern of a row, WrapMultiObj or None),
+    raises TypeError if pattern isnt one
+    '''
+    multiobj = None
+    if isinstance(pattern, WrapMultiObj):
+        multiobj = pattern
+        unit_data = list(multiobj.checked_data())
+        if len(unit_data) != 1:
+            raise TypeError("{pattern} should repeat a single dict pattern to match columns"
+                            "".format(pattern=pattern))
+        pattern = unit_data[0]
+
+    row_data = pattern
+    while isinstance(row_data, WrapObj):
+        if row_data.DO_TYPECHECK or row_data.treat_as_object or (row_data.save_key is not None):
+            raise TypeError("{pattern} cant match columns, as it needs whole rows".format(pattern=pattern))
+        row_data = row_data.data
+    if not isinstance(row_data, Mapping):
+        raise TypeError("pattern={pattern} should be a dict pattern to match columns".format(pattern=pattern))
+    return (row_data, multiobj)
+
+
+def column_getter(columns):
+    '''
+    Internal function. Returns (number of rows, function returning the
+    column of a key or None)
+    '''
+    if arrays.is_ndarray(columns) and columns.dtype.names is not None:
+        names = frozenset(columns.dtype.names)
+        return (len(columns), lambda data_key: (columns[data_key] if data_key in names else None))
+
+    if not isinstance(columns, Mapping):
+        raise TypeError("columns={columns} should be a NumPy structured array or a Mapping "
+                        "of columns".format(columns=type(columns)))
+    set_len = set(len(column) for column in columns.itervalues())
+    if len(set_len) > 1:
+        raise ValueError("columns should have the same length, not {lengths}".format(lengths=sorted(set_len)))
+    row_count = set_len.pop() if set_len else 0
+    return (row_count, columns.get)
+
+
+def match_column(data, column, dict_saved_values):
+    '''
+    Internal function. Returns indexes of elements of column not matching
+    data. Saves in dict_saved_values, like .times of a dict pattern would.
+    '''
+    if arrays.is_ndarray(column) and column.ndim == 1 and column.dtype.kind != "O":
+        value_data = data
+        save_key = None
+        if isinstance(value_data, WrapObj) and not (value_data.DO_TYPECHECK or value_data.treat_as_object):
+            (value_data, save_key) = (value_data.data, value_data.save_key)
+        if not isinstance(value_data, WrapObj):
+            mask = arrays.scalars_mask(value_data, column)
+            if mask is not None:
+                if save_key is not None and len(column):
+                    dict_saved_values[save_key] = column
+                if mask is True:
+                    return []
+                elif mask is False:
+                    return xrange(len(column))
+                return arrays.numpy.flatnonzero(~mask).tolist()
+
+    (match_value, can_save) = compile_node(data)
+    failed_rows = []
+    for (row_index, value) in enumerate(column):
+        match_dict_or_True = match_value(value)
+        if not match_dict_or_True:
+            failed_rows.append(row_index)
+        elif can_save and isinstance(match_dict_or_True, dict):
+            # saved values of each row are collected in a list
+            for match_key in match_dict_or_True:
+                dict_saved_values.setdefault(match_key, []).append(match_dict_or_True[match_key])
+    return failed_rows
+
+
+class Missing(object):
+
+    '''
+    Internal class. Stands for values of keys missing in a row
+    '''
+
+MISSING = Missing()
+
+
+def match_rows(pattern, list_row, failed_only=False):
+    '''
+    Returns the same as match_many(pattern, list_row, failed_only=...),
+    checking a dict pattern column by column. Other patterns, or rows which
+    arent all Mappings, are matched row by row.
+    '''
+    list_row = list(list_row)
+    try:
+        (row_data, multiobj) = split_pattern(pattern)
+    except TypeError:
+        multiobj = row_data = None
+    if (row_data is None or multiobj is not None or
+            not all(issubclass(row_type, Mapping) for row_type in set(map(type, list_row)))):
+        from batch import match_many
+        return match_many(pattern, list_row, failed_only=failed_only)
+
+    row_count = len(list_row)
+    row_failed = bytearray(row_count)
+    # saved values of each row, when the pattern can save
+    list_saved = None
+    for (data_key, data_value) in row_data.iteritems():
+        (match_value, can_save) = compile_node(data_value)
+        if can_save and list_saved is None:
+            list_saved = [{} for _ in xrange(row_count)]
+        column = row_column(list_row, data_key)
+        match_row_column(data_value, match_value, can_save, column, row_failed, list_saved)
+
+    if failed_only:
+        return [row_index for (row_index, failed) in enumerate(row_failed) if failed]
+    if list_saved is None:
+        return [not failed for failed in row_failed]
+    return [False if failed else (saved or True) for (failed, saved) in zip(row_failed, list_saved)]
+
+
+def row_column(list_row, data_key):
+    '''
+    Internal function. Returns list of value of data_key in each row, or
+    MISSING for rows without it
+    '''
+    try:
+        return map(itemgetter(data_key), list_row)
+    except KeyError:
+        pass
+    column = []
+    for row in list_row:
+        try:
+            column.append(row[data_key])
+        except KeyError:
+            column.append(MISSING)
+    return column
+
+
+def match_row_column(data_value, match_value, can_save, column, row_failed, list_saved):
+    '''
+    Internal function. Sets row_failed[index] for elements of column not
+    matching data_value, adds saved values of the others to list_saved
+    '''
+    if can_save:
+        for (row_index, value) in enumerate(column):
+            match_dict_or_True = (value is not MISSING) and match_value(value)
+            if not match_dict_or_True:
+                row_failed[row_index] = 1
+            elif match_dict_or_True is not True:
+                list_saved[row_index].update(match_dict_or_True)
+        return
+
+    list_type = match_types_of(data_value)
+    if list_type is not None:
+        # values whose type is a subclass always match, only others are
+        # matched one by one
+        set_matched_type = set(value_type for value_type in set(map(type, column))
+                               if value_type is not Missing and issubclass(value_type, list_type))
+        list_index = [row_index for (row_index, value) in enumerate(column) if type(value) not in set_matched_type]
+    else:
+        list_index = xrange(len(column))
+    for row_index in list_index:
+        value = column[row_index]
+        if value is MISSING or not match_value(value):
+            row_failed[row_index] = 1
+
+
+def match_types_of(data_value):
+    '''
+    Internal function. Returns tuple of classes, such that data_value
+    matches any instance of them, or None
+    '''
+    while isinstance(data_value, WrapObj):
+        if data_value.DO_TYPECHECK or data_value.treat_as_object or (data_value.save_key is not None):
+            return None
+        data_value = data_value.data
+    if isinstance(data_value, MetaAny):
+        return (object,)
+    if isinstance(data_value, MetaMultiInstanceMatcher):
+        list_type = data_value.match_types
+    elif isinstance(data_value, type):
+        list_type = (data_value,)
+    else:
+        return None
+    # isinstance of other metaclasses may not follow issubclass
+    if list_type and all(type(each_type) is type or isinstance(each_type, ABCMeta) for each_type in list_type):
+        return list_type
+    return None
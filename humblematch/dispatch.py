@@ -0,0 +1,119 @@
+'''
+What kind of object (string, list-ish, mapping or other) a value is, by its
+exact type, used by WrapObj.match to choose how to match.
+
+isinstance against ABCs like Iterable and Mapping runs Python code in
+ABCMeta.__instancecheck__ each time. The kind of every type seen is kept in
+a dict instead, so a value of a type seen before costs one dict lookup.
+
+>>> [kind_of(value) for value in (1, "a", [1], {"a": 1}, int)] == [OTHER, STRING, LIST, MAPPING, OTHER]
+True
+
+Types are held by weak references, so a class can still be freed, and at
+most MAX_CACHED_TYPES are kept. The cache is cleared when a class is
+registered with any ABC, as that can change the kind of a type.
+'''
+from abc import ABCMeta
+from collections import Mapping, Iterable
+import types
+import weakref
+
+__all__ = []
+
+# kinds, list-ish kinds being >= LIST
+OTHER = 0
+MAPPING = 1
+LIST = 2
+STRING = 3
+
+MAX_CACHED_TYPES = 1024
+
+
+class TypeKindCache(object):
+
+    '''
+    Internal class. Kind of each type seen, by id of the type.
+    kinds -> dict of id(type) to kind
+    refs -> dict of id(type) to weak reference to it, removing both
+            entries once the type is freed (before its id can be reused)
+    version -> ABCMeta._abc_invalidation_counter when kinds were found
+    '''
+
+    __slots__ = ("kinds", "refs", "version", "max_size")
+
+    def __init__(self, max_size=MAX_CACHED_TYPES):
+        self.kinds = {}
+        self.refs = {}
+        self.version = ABCMeta._abc_invalidation_counter
+        self.max_size = max_size
+
+    def clear(self):
+        self.kinds.clear()
+        self.refs.clear()
+        self.version = ABCMeta._abc_invalidation_counter
+
+    def add(self, value):
+        '''
+        Returns kind of value, caching it for type(value) if it depends
+        only on that
+        '''
+        if self.version != ABCMeta._abc_invalidation_counter:
+            self.clear()
+        kind = find_kind(value)
+        value_type = type(value)
+        if len(self.kinds) < self.max_size and kind_follows_type(value, value_type):
+            type_id = id(value_type)
+            try:
+                self.refs[type_id] = weakref.ref(value_type, lambda _: self.remove(type_id))
+            except TypeError:
+                return kind
+            self.kinds[type_id] = kind
+        return kind
+
+    def remove(self, type_id):
+        self.kinds.pop(type_id, None)
+        self.refs.pop(type_id, None)
+
+
+TYPE_KIND = TypeKindCache()
+
+
+def kind_of(value):
+    '''
+    Returns kind of value, one of OTHER, MAPPING, LIST and STRING
+    '''
+    kind = TYPE_KIND.kinds.get(id(type(value)))
+    if kind is None or TYPE_KIND.version != ABCMeta._abc_invalidation_counter:
+        return TYPE_KIND.add(value)
+    return kind
+
+
+def find_kind(value):
+    '''
+    Internal function. Returns kind of value, from isinstance checks
+    '''
+    if isinstance(value, types.StringTypes):
+        return STRING
+    elif isinstance(value, Mapping):
+        return MAPPING
+    elif isinstance(value, Iterable):
+        return LIST
+    return OTHER
+
+
+def kind_follows_type(value, value_type):
+    '''
+    Internal function. Returns whether isinstance checks of every instance
+    of value_type give the same as for value. ABCs check value.__class__,
+    which old style instances and classes overriding __class__ or
+    __getattribute__ may give differently for each instance.
+    '''
+    if value_type is types.InstanceType or value.__class__ is not value_type:
+        return False
+    for base in value_type.__mro__:
+        base_dict = vars(base)
+        if "__class__" in base_dict and base is not object:
+            return False
+        if isinstance(base_dict.get("__getattribute__"), types.FunctionType):
+            return False
+    return True
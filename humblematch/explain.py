@@ -0,0 +1,149 @@
+'''
+Finding out why a pattern didnt match, while matching it.
+
+Matchers compiled with diagnostics=True note the failure only when it
+happens: the node which didnt match keeps what it expected and what it got,
+and each node it is in adds its key or index to the path as the failure
+returns up through it. A match which succeeds doesnt do anything more.
+
+>>> from wrap_obj import w, inf
+>>> from matcher import compile
+>>> m = compile({"items": [w([{"price": float}]).times(0, inf)]}, diagnostics=True)
+>>> m({"items": [{"price": 1.5}, {"price": "2"}]})
+False
+>>> print(m.last_failure())
+root['items'][1]['price']: expected float, got '2' (doesnt match)
+>>> print(m.explain({"items": [{"cost": 1.5}]}))
+root['items'][0]['price']: expected float, got nothing (missing key)
+>>> m.explain({"items": []}) is None
+True
+'''
+from collections import namedtuple
+import threading
+
+import tracer
+
+__all__ = ["Failure"]
+
+DOESNT_MATCH = "doesnt match"
+MISSING_KEY = "missing key"
+MISSING_ATTRIBUTE = "missing attribute"
+WRONG_TYPE = "not the same type"
+WRONG_LENGTH = "length not allowed"
+NOT_LIST = "not list-ish"
+NO_SPLIT = "no split of the list matches"
+
+# failure being returned up, for each thread, as [expected, actual, reason,
+# path keys from the innermost]
+local = threading.local()
+
+
+class Missing(object):
+
+    '''
+    Internal class. Actual value of keys or attributes which are missing
+    '''
+
+    def __repr__(self):
+        return "nothing"
+
+MISSING = Missing()
+
+
+class Failure(namedtuple("Failure", ["path", "expected", "actual", "reason"])):
+
+    '''
+    Why a pattern didnt match.
+    path -> tuple of keys, indexes and attributes leading to the node which
+            didnt match, like TraceEvent.path
+    expected -> pattern of that node
+    actual -> value it was matched with, MISSING for missing keys
+    reason -> like "doesnt match", "missing key" or "length not allowed"
+    '''
+
+    __slots__ = ()
+
+    def format_path(self):
+        return tracer.format_path(self.path)
+
+    def __str__(self):
+        from profiler import short_repr
+        return "{path}: expected {expected}, got {actual!r} ({reason})".format(
+            path=self.format_path(), expected=short_repr(self.expected), actual=self.actual, reason=self.reason)
+
+
+def failed(expected, actual, reason):
+    '''
+    Internal function. Notes failure of a node for its own reason
+    '''
+    local.failure = [expected, actual, reason, []]
+
+
+def failed_at(path_key, expected, actual):
+    '''
+    Internal function. Notes that a node within, at path_key, didnt match.
+    If that node didnt note why, it is a leaf which didnt match.
+    '''
+    failure = getattr(local, "failure", None)
+    if failure is None:
+        local.failure = [expected, actual, DOESNT_MATCH, [path_key]]
+    else:
+        failure[3].append(path_key)
+
+
+def failed_key(path_key, expected, actual, missing_reason):
+    '''
+    Internal function. Like failed_at, for a key or attribute of a dict
+    pattern, actual being MISSING if other doesnt have it
+    '''
+    if actual is MISSING:
+        failed(expected, actual, missing_reason)
+    failed_at(path_key, expected, actual)
+
+
+def clear():
+    '''
+    Internal function. Forgets failures of nodes which didnt decide the
+    result, like elements which ended a repeat of a sequence
+    '''
+    local.failure = None
+
+
+def finish(pattern, other):
+    '''
+    Internal function. Returns Failure for a match of pattern with other
+    which returned False, and forgets it
+    '''
+    failure = getattr(local, "failure", None)
+    local.failure = None
+    if failure is None:
+        return Failure((), pattern, other, DOESNT_MATCH)
+    (expected, actual, reason, list_path_key) = failure
+
+    # a repeat within a list gets a slice of it, indexes within the slice
+    # are shown as indexes of the list
+    path = []
+    for path_key in reversed(list_path_key):
+        if path and isinstance(path[-1], slice) and type(path_key) in (int, long):
+            path[-1] = (path[-1].start or 0) + path_key
+        else:
+            path.append(path_key)
+    return Failure(tuple(path), expected, actual, reason)
+
+
+def diagnosed(match, pattern, matcher_local):
+    '''
+    Internal function. Returns match keeping the Failure of its last call
+    which returned False in matcher_local.failure
+    '''
+    def match_diagnosed(other):
+        try:
+            match_dict_or_True = match(other)
+        except BaseException:
+            clear()
+            raise
+        if not match_dict_or_True:
+            matcher_local.failure = finish(pattern, other)
+        return match_dict_or_True
+
+    return match_diagnosed
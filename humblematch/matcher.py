@@ -0,0 +1,739 @@
+from collections import Mapping, Iterable, namedtuple
+from warnings import warn
+import types
+
+from wrap_obj import WrapObj, WrapMultiObj, MetaMultiInstanceMatcher, HASHED_VALUE_TYPES, list_length_bounds, slice_list
+from sequence import Repeat, match_sequence
+from adaptive import AdaptiveOrder
+import threading
+import tracer
+import arrays
+import explain
+
+__all__ = ["Matcher", "compile"]
+
+# Options passed down to every compile_* function.
+# adaptive -> reorder dict keys and OR alternatives, see adaptive.py
+# diagnostics -> note why a match failed, see explain.py
+CompileOptions = namedtuple("CompileOptions", ["adaptive", "diagnostics"])
+DEFAULT_OPTIONS = CompileOptions(adaptive=False, diagnostics=False)
+
+
+class Matcher(object):
+
+    '''
+    Pattern compiled into a tree of specialized closures.
+    All the type dispatch of WrapObj.__eq__ is done once while compiling,
+    so calling the matcher only runs the checks which apply to the pattern.
+
+    Returns the same as w(pattern) == other, i.e. False, True or the
+    dict of values saved with save_as.
+
+    >>> m = compile([int, WrapObj(float).save_as("a")])
+    >>> m([2, 2.5])
+    {'a': 2.5}
+    >>> m([2, "2.5"])
+    False
+    >>> m == [5, 1.0]
+    {'a': 1.0}
+    '''
+
+    def __init__(self, pattern, backend="closure", adaptive=False, diagnostics=False):
+        super(Matcher, self).__init__()
+        self.pattern = pattern
+        self.backend = backend
+        self.adaptive = adaptive
+        self.diagnostics = diagnostics
+        # Failure of the last call which returned False, for each thread
+        self._local = threading.local()
+        # matcher with diagnostics, used by explain
+        self._explainer = None
+
+        if backend == "closure":
+            match = compile_node(pattern, CompileOptions(adaptive=adaptive, diagnostics=diagnostics))[0]
+            self._match = explain.diagnosed(match, pattern, self._local) if diagnostics else match
+            self.source = None
+        elif backend == "source":
+            if adaptive:
+                raise ValueError("adaptive=True needs backend=closure")
+            if diagnostics:
+                raise ValueError("diagnostics=True needs backend=closure")
+            from codegen import compile_source
+            (self._match, self.source) = compile_source(pattern)
+        else:
+            raise ValueError("backend={backend} should be closure or source".format(backend=backend))
+
+    def __call__(self, other):
+        if tracer.sink is not None:
+            # compiled code isnt traced, match the same pattern through WrapObj
+            return (WrapObj(self.pattern) == other) or False
+        return self._match(other)
+
+    match = __call__
+    __eq__ = __call__
+
+    def __ne__(self, other):
+        return not(self(other))
+
+    def __reduce__(self):
+        # compiled functions cant be pickled, pattern is compiled again
+        return (self.__class__, (self.pattern, self.backend, self.adaptive, self.diagnostics))
+
+    def last_failure(self):
+        '''
+        Returns Failure of the last call in this thread which returned
+        False, or None. Only kept with diagnostics=True.
+        '''
+        return getattr(self._local, "failure", None)
+
+    def explain(self, other):
+        '''
+        Returns Failure telling where and why other doesnt match, or None if
+        it matches. Without diagnostics=True, the pattern is compiled again
+        with it the first time.
+        '''
+        matcher = self
+        if not self.diagnostics:
+            if self._explainer is None:
+                self._explainer = Matcher(self.pattern, diagnostics=True)
+            matcher = self._explainer
+        if matcher._match(other):
+            return None
+        return matcher._local.failure
+
+    def profile_report(self, out=None, limit=None):
+        '''
+        Prints calls and time of each node of the pattern, matched within
+        humblematch.profiling(). See profiler.profile_report.
+        '''
+        from profiler import profile_report
+        profile_report(self, out, limit)
+
+    def match_many(self, iterable, workers=None, chunksize=256, executor="thread", failed_only=False):
+        '''
+        Returns list of self(other) for each other in iterable.
+        See humblematch.match_many.
+        '''
+        from batch import match_many
+        return match_many(self, iterable, workers, chunksize, executor, failed_only)
+
+
+def compile(pattern, backend="closure", adaptive=False, diagnostics=False):
+    '''
+    Compile pattern (anything which can be passed to w) into a Matcher.
+    Use it when the same pattern is matched against many objects.
+
+    backend="closure" builds the matcher out of nested functions.
+    backend="source" generates python source for the whole pattern and
+    executes it, which is faster to run but slower to compile. The generated
+    source is kept in Matcher.source for debugging.
+
+    adaptive=True (only with backend="closure") counts which dict keys fail
+    and which OR(...) alternatives match, and every few hundred calls
+    reorders them to check the keys most likely to fail and the alternatives
+    most likely to match first. Results are the same, only faster when some
+    keys or alternatives decide most of the matches.
+
+    diagnostics=True (only with backend="closure") notes why a match failed
+    while it returns, see Matcher.last_failure and explain.py. Matches which
+    succeed cost the same.
+
+    >>> compile([WrapObj([int]).times(2, 4)])([1, 2])
+    True
+    >>> compile({"a": [int, str]})({"a": (1, "b")})
+    True
+    >>> print(compile(str, backend="source").source)  # doctest: +NORMALIZE_WHITESPACE
+    def match(x0):
+        if not isinstance(x0, str):
+            return False
+        return True
+    <BLANKLINE>
+    '''
+    return Matcher(pattern, backend, adaptive, diagnostics)
+
+
+# Every compile_* function returns (match_function, can_save) where
+# match_function(other) gives the result of WrapObj.__eq__ and can_save tells
+# whether that result can ever be a dict of saved values.
+# Parents use can_save to skip merging for children which only return bools.
+
+def compile_node(data, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles like WrapObj(data) == other
+    '''
+    return compile_wrap(data, False, False, None, options)
+
+
+def compile_wrap(data, do_typecheck, treat_as_object, save_key, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles WrapObj.__eq__ of a WrapObj with given state
+    '''
+    if do_typecheck:
+        data_type = type(data)
+        diagnose = options.diagnostics
+        match_inner, can_save = compile_wrap(data, False, treat_as_object, save_key, options)
+
+        def match_typecheck(other):
+            if data_type != type(other):
+                if diagnose:
+                    explain.failed(data, other, explain.WRONG_TYPE)
+                return False
+            return match_inner(other)
+
+        return match_typecheck, can_save
+
+    elif isinstance(data, WrapObj):
+        return compile_wrap(data.data, data.DO_TYPECHECK, data.treat_as_object, data.save_key, options)
+
+    elif isinstance(data, WrapMultiObj):
+        match_multi, can_save = compile_multi(data, options)
+
+        def match_wrapped_multi(other):
+            return match_multi([other])
+
+        return match_wrapped_multi, can_save
+
+    elif isinstance(data, types.StringTypes):
+        def match_string(other):
+            return data == other
+
+        return match_string, False
+
+    elif treat_as_object:
+        if not isinstance(data, Mapping):
+            raise TypeError("data={data} should be of type Mapping "
+                            "(e.g. dict)".format(data=data))
+        return compile_dict_or_obj(data, object, options)
+
+    match_value, value_can_save = compile_value(data, save_key, options)
+
+    if isinstance(data, Iterable) and (not isinstance(data, Mapping)):
+        match_list, list_can_save = compile_list(data, options)
+
+        def match_list_or_value(other):
+            if isinstance(other, Iterable) and (not isinstance(other, Mapping)):
+                return match_list(other)
+            return match_value(other)
+
+        return match_list_or_value, (list_can_save or value_can_save)
+
+    elif isinstance(data, Mapping):
+        match_dict, dict_can_save = compile_dict_or_obj(data, dict, options)
+
+        def match_dict_or_value(other):
+            if isinstance(other, Mapping):
+                return match_dict(other)
+            return match_value(other)
+
+        return match_dict_or_value, (dict_can_save or value_can_save)
+
+    else:
+        return match_value, value_can_save
+
+
+def compile_value(value_or_type, save_key, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles check_as_value_and_type and save_as of a leaf
+    '''
+    if (options.adaptive and type(value_or_type) is MetaMultiInstanceMatcher and
+            len(value_or_type.list_match_type) > 1):
+        match_leaf = compile_adaptive_or(value_or_type)
+    elif isinstance(value_or_type, type):
+        def match_type(other):
+            return isinstance(other, value_or_type)
+        match_leaf = match_type
+    else:
+        def match_value(other):
+            return other == value_or_type
+        match_leaf = match_value
+
+    if save_key is None:
+        return match_leaf, False
+
+    def match_and_save(other):
+        if match_leaf(other):
+            return {save_key: other}
+        return False
+
+    return match_and_save, True
+
+
+def compile_adaptive_or(multi_instance_matcher):
+    '''
+    Internal function. Compiles isinstance(other, OR(...)) trying the
+    alternatives which matched most often first
+    '''
+    match_values_set = multi_instance_matcher.match_values_set
+    list_alternative = []
+    for each_value in multi_instance_matcher.list_match_type:
+        if isinstance(each_value, type):
+            list_alternative.append((True, False, each_value))
+        else:
+            in_set = (type(each_value) in HASHED_VALUE_TYPES and each_value in match_values_set)
+            list_alternative.append((False, in_set, each_value))
+    adaptive = AdaptiveOrder(list_alternative)
+
+    def match_adaptive_or(other):
+        adaptive.tick()
+        is_hashed = type(other) in HASHED_VALUE_TYPES
+        if is_hashed and other in match_values_set:
+            return True
+        # same checks as MetaMultiInstanceMatcher.__instancecheck__
+        for (alternative_index, (is_type, in_set, each_value)) in adaptive.order:
+            if is_type:
+                matched = isinstance(other, each_value) or (not is_hashed and each_value == other)
+            elif in_set and is_hashed:
+                # already looked up in match_values_set
+                continue
+            else:
+                matched = (each_value == other)
+            if matched:
+                adaptive.counts[alternative_index] += 1
+                return True
+        return False
+
+    return match_adaptive_or
+
+
+def compile_list(data, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles WrapObj.match_list for list-ish data.
+    Same as match_list, elements before the WrapMultiObj are checked from the
+    start of other, elements after it from the end of other and the
+    WrapMultiObj gets the rest. With more WrapMultiObj, uses match_sequence.
+    '''
+    data = [data[ele_index] for ele_index in range(len(data))]
+    multiobj_indexes = [ele_index for (ele_index, ele_data) in enumerate(data)
+                        if isinstance(ele_data, WrapMultiObj)]
+
+    if not multiobj_indexes:
+        return compile_fixed_list(data, options)
+    elif len(multiobj_indexes) > 1:
+        return compile_sequence(data, options)
+
+    multiobj_index = multiobj_indexes[0]
+    list_forwards = [compile_node(ele_data, options) for ele_data in data[:multiobj_index]]
+    # checked from -1 backwards, so that later elements are saved first
+    list_backwards = [compile_node(ele_data, options) for ele_data in reversed(data[multiobj_index + 1:])]
+    match_multi, multi_can_save = compile_multi(data[multiobj_index], options)
+
+    start_multi = multiobj_index
+    end_multi = -len(list_backwards) or None
+    allows_length = list_length_bounds(data).allows
+    can_save = multi_can_save or any(can_save for (_, can_save) in list_forwards + list_backwards)
+    diagnose = options.diagnostics
+
+    def failed_at(other, ele_index):
+        # ele_index from the start of data, or from the end if negative
+        other_index = ele_index if ele_index >= 0 else len(other) + ele_index
+        explain.failed_at(other_index, data[ele_index], other[ele_index])
+
+    def failed_multi(other):
+        explain.failed_at(slice(start_multi, end_multi), data[multiobj_index],
+                           slice_list(other, start_multi, end_multi))
+
+    if not can_save:
+        match_forwards = [match_ele for (match_ele, _) in list_forwards]
+        match_backwards = [match_ele for (match_ele, _) in list_backwards]
+
+        def match_list(other):
+            if not allows_length(len(other)):
+                if diagnose:
+                    explain.failed(data, other, explain.WRONG_LENGTH)
+                return False
+            for (ele_index, match_ele) in enumerate(match_forwards):
+                if not match_ele(other[ele_index]):
+                    if diagnose:
+                        failed_at(other, ele_index)
+                    return False
+            for (ele_index, match_ele) in enumerate(match_backwards):
+                if not match_ele(other[-1 - ele_index]):
+                    if diagnose:
+                        failed_at(other, -1 - ele_index)
+                    return False
+            match_dict_or_True = match_multi(other[start_multi:end_multi] if type(other) is not xrange
+                                            else slice_list(other, start_multi, end_multi))
+            if diagnose and not match_dict_or_True:
+                failed_multi(other)
+            return match_dict_or_True
+
+        return match_list, False
+
+    def match_list_and_save(other):
+        if not allows_length(len(other)):
+            if diagnose:
+                explain.failed(data, other, explain.WRONG_LENGTH)
+            return False
+        dict_saved_values = {}
+        for (ele_index, (match_ele, ele_can_save)) in enumerate(list_forwards):
+            match_dict_or_True = match_ele(other[ele_index])
+            if not match_dict_or_True:
+                if diagnose:
+                    failed_at(other, ele_index)
+                return False
+            if ele_can_save and isinstance(match_dict_or_True, dict):
+                dict_saved_values.update(match_dict_or_True)
+        for (ele_index, (match_ele, ele_can_save)) in enumerate(list_backwards):
+            match_dict_or_True = match_ele(other[-1 - ele_index])
+            if not match_dict_or_True:
+                if diagnose:
+                    failed_at(other, -1 - ele_index)
+                return False
+            if ele_can_save and isinstance(match_dict_or_True, dict):
+                dict_saved_values.update(match_dict_or_True)
+
+        match_dict_or_True = match_multi(other[start_multi:end_multi] if type(other) is not xrange
+                                         else slice_list(other, start_multi, end_multi))
+        if not match_dict_or_True:
+            if diagnose:
+                failed_multi(other)
+            return False
+        if isinstance(match_dict_or_True, dict):
+            dict_saved_values.update(match_dict_or_True)
+        return (dict_saved_values or True)
+
+    return match_list_and_save, True
+
+
+def compile_fixed_list(data, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles list-ish data without any WrapMultiObj,
+    which only matches other of exactly same length
+    '''
+    list_ele = [compile_node(ele_data, options) for ele_data in data]
+    data_len = len(list_ele)
+    diagnose = options.diagnostics
+
+    def failed_at(match_ele, ele_other):
+        # each element has its own match function
+        ele_index = [each_match_ele for (each_match_ele, _) in list_ele].index(match_ele)
+        explain.failed_at(ele_index, data[ele_index], ele_other)
+
+    if not any(can_save for (_, can_save) in list_ele):
+        match_elements = [match_ele for (match_ele, _) in list_ele]
+
+        def match_fixed_list(other):
+            if len(other) != data_len:
+                if diagnose:
+                    explain.failed(data, other, explain.WRONG_LENGTH)
+                return False
+            for (match_ele, ele_other) in zip(match_elements, other):
+                if not match_ele(ele_other):
+                    if diagnose:
+                        failed_at(match_ele, ele_other)
+                    return False
+            return True
+
+        return match_fixed_list, False
+
+    def match_fixed_list_and_save(other):
+        if len(other) != data_len:
+            if diagnose:
+                explain.failed(data, other, explain.WRONG_LENGTH)
+            return False
+        dict_saved_values = {}
+        for ((match_ele, ele_can_save), ele_other) in zip(list_ele, other):
+            match_dict_or_True = match_ele(ele_other)
+            if not match_dict_or_True:
+                if diagnose:
+                    failed_at(match_ele, ele_other)
+                return False
+            if ele_can_save and isinstance(match_dict_or_True, dict):
+                dict_saved_values.update(match_dict_or_True)
+        return (dict_saved_values or True)
+
+    return match_fixed_list_and_save, True
+
+
+def compile_sequence(data, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles list-ish data with more than one WrapMultiObj,
+    like WrapObj.match_sequence
+    '''
+    list_segment = []
+    can_save = False
+    for ele_data in data:
+        if isinstance(ele_data, WrapMultiObj):
+            list_unit = [compile_node(unit_data, options) for unit_data in ele_data.checked_data()]
+            (range_low, range_high) = ele_data.repeat_allowed_range
+            list_segment.append(Repeat([match_ele for (match_ele, _) in list_unit],
+                                       range_low, range_high, ele_data.save_key))
+            can_save = (can_save or (ele_data.save_key is not None) or
+                        any(ele_can_save for (_, ele_can_save) in list_unit))
+        else:
+            (match_ele, ele_can_save) = compile_node(ele_data, options)
+            list_segment.append(match_ele)
+            can_save = can_save or ele_can_save
+
+    allows_length = list_length_bounds(data).allows
+    diagnose = options.diagnostics
+
+    def match_list_sequence(other):
+        if not allows_length(len(other)):
+            if diagnose:
+                explain.failed(data, other, explain.WRONG_LENGTH)
+            return False
+        match_dict_or_True = match_sequence(list_segment, other)
+        if diagnose:
+            # elements which didnt match only end a repeat, or rule out a
+            # split, so their failures dont tell why
+            explain.clear()
+            if not match_dict_or_True:
+                explain.failed(data, other, explain.NO_SPLIT)
+        return match_dict_or_True
+
+    return match_list_sequence, can_save
+
+
+def compile_multi(multiobj, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles WrapMultiObj.__eq__
+    '''
+    match_repeat, can_save = compile_repeat(multiobj, options)
+    array_types = arrays.ARRAY_TYPES
+    match_array = arrays.match_array
+    diagnose = options.diagnostics
+
+    def match_repeat_or_array(other):
+        if isinstance(other, array_types):
+            match_dict_or_True = match_array(multiobj, other)
+            if match_dict_or_True is not None:
+                if diagnose and not match_dict_or_True:
+                    explain.failed(multiobj, other, explain.DOESNT_MATCH)
+                return match_dict_or_True
+        return match_repeat(other)
+
+    return match_repeat_or_array, can_save
+
+
+def compile_repeat(multiobj, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles WrapMultiObj.__eq__, for others which
+    arent checked by arrays.match_array
+    '''
+    data = list(multiobj.checked_data())
+    (range_low, range_high) = multiobj.repeat_allowed_range
+    save_key = multiobj.save_key
+    list_ele = [compile_node(ele_data, options) for ele_data in data]
+    data_len = len(list_ele)
+    allows_length = multiobj.length_bounds.allows
+    diagnose = options.diagnostics
+
+    def check_length(other):
+        # other must be list-ish, with whole number of repeats in allowed range
+        if not (isinstance(other, Iterable) and (not isinstance(other, Mapping))):
+            if diagnose:
+                explain.failed(multiobj, other, explain.NOT_LIST)
+            return False
+        if allows_length(len(other)):
+            return True
+        if diagnose:
+            explain.failed(multiobj, other, explain.WRONG_LENGTH)
+        return False
+
+    if not any(can_save for (_, can_save) in list_ele):
+        match_elements = [match_ele for (match_ele, _) in list_ele]
+
+        if data_len == 1 and diagnose:
+            match_only = match_elements[0]
+
+            def match_repeat(other):
+                if not check_length(other):
+                    return False
+                for (ele_index, ele_other) in enumerate(other):
+                    if not match_only(ele_other):
+                        explain.failed_at(ele_index, data[0], ele_other)
+                        return False
+                return True
+        elif data_len == 1:
+            match_only = match_elements[0]
+
+            def match_repeat(other):
+                if not check_length(other):
+                    return False
+                for ele_other in other:
+                    if not match_only(ele_other):
+                        return False
+                return True
+        else:
+            def match_repeat(other):
+                if not check_length(other):
+                    return False
+                for start_other_index in range(0, len(other), data_len):
+                    for (ele_index, match_ele) in enumerate(match_elements):
+                        if not match_ele(other[start_other_index + ele_index]):
+                            if diagnose:
+                                explain.failed_at(start_other_index + ele_index, data[ele_index],
+                                                  other[start_other_index + ele_index])
+                            return False
+                return True
+
+        if save_key is None:
+            return match_repeat, False
+
+        def match_repeat_and_save(other):
+            if match_repeat(other):
+                return {save_key: other}
+            return False
+
+        return match_repeat_and_save, True
+
+    def match_repeat_and_save_all(other):
+        if not check_length(other):
+            return False
+        dict_saved_values = {}
+        for start_other_index in range(0, len(other), data_len):
+            for (ele_index, (match_ele, ele_can_save)) in enumerate(list_ele):
+                match_dict_or_True = match_ele(other[start_other_index + ele_index])
+                if not match_dict_or_True:
+                    if diagnose:
+                        explain.failed_at(start_other_index + ele_index, data[ele_index],
+                                          other[start_other_index + ele_index])
+                    return False
+                if ele_can_save and isinstance(match_dict_or_True, dict):
+                    # saved values of each repeat are collected in a list
+                    for match_key in match_dict_or_True:
+                        match_val = match_dict_or_True[match_key]
+                        prev_match_val = dict_saved_values.get(match_key)
+                        if isinstance(prev_match_val, list):
+                            prev_match_val.append(match_val)
+                        else:
+                            dict_saved_values[match_key] = [match_val]
+        if save_key is not None:
+            dict_saved_values[save_key] = other
+        return (dict_saved_values or True)
+
+    return match_repeat_and_save_all, True
+
+
+def compile_dict_or_obj(data, dict_or_obj=dict, options=DEFAULT_OPTIONS):
+    '''
+    Internal function. Compiles WrapObj.match_dict_or_obj
+    '''
+    assert(dict_or_obj in (dict, object))
+    list_items = []
+    for (data_key, data_value) in data.iteritems():
+        if isinstance(data_key, type):
+            warn(("{data_key} is a class used as a key, but it "
+                  "wont match keys which are instances of this type"
+                  "").format(data_key=data_key))
+        list_items.append((data_key, compile_node(data_value, options)))
+
+    if dict_or_obj is dict:
+        def get_value(other, data_key):
+            return other[data_key]
+        missing_error = KeyError
+    else:
+        def get_value(other, data_key):
+            return other.__getattribute__(data_key)
+        missing_error = AttributeError
+
+    failed_key = None
+    if options.diagnostics:
+        def failed_key(data_key, other_value):
+            if dict_or_obj is dict:
+                explain.failed_key(data_key, data[data_key], other_value, explain.MISSING_KEY)
+            else:
+                explain.failed_key(tracer.Attribute(data_key), data[data_key], other_value,
+                                   explain.MISSING_ATTRIBUTE)
+
+    if options.adaptive and len(list_items) > 1:
+        return compile_adaptive_dict_or_obj(list_items, get_value, missing_error, failed_key)
+
+    if not any(can_save for (_, (_, can_save)) in list_items):
+        list_match = [(data_key, match_value) for (data_key, (match_value, _)) in list_items]
+
+        def match_dict_or_obj(other):
+            for (data_key, match_value) in list_match:
+                try:
+                    other_value = get_value(other, data_key)
+                except missing_error:
+                    if failed_key is not None:
+                        failed_key(data_key, explain.MISSING)
+                    return False
+                if not match_value(other_value):
+                    if failed_key is not None:
+                        failed_key(data_key, other_value)
+                    return False
+            return True
+
+        return match_dict_or_obj, False
+
+    def match_dict_or_obj_and_save(other):
+        dict_saved_values = {}
+        for (data_key, (match_value, value_can_save)) in list_items:
+            try:
+                other_value = get_value(other, data_key)
+            except missing_error:
+                if failed_key is not None:
+                    failed_key(data_key, explain.MISSING)
+                return False
+            match_dict_or_True = match_value(other_value)
+            if not match_dict_or_True:
+                if failed_key is not None:
+                    failed_key(data_key, other_value)
+                return False
+            if value_can_save and isinstance(match_dict_or_True, dict):
+                dict_saved_values.update(match_dict_or_True)
+        return (dict_saved_values or True)
+
+    return match_dict_or_obj_and_save, True
+
+
+def compile_adaptive_dict_or_obj(list_items, get_value, missing_error, failed_key=None):
+    '''
+    Internal function. Compiles WrapObj.match_dict_or_obj checking the keys
+    which failed most often first. Saved values are merged in the order of
+    list_items, as they would be without reordering. failed_key(data_key,
+    other_value) is called when a key doesnt match, if given.
+    '''
+    adaptive = AdaptiveOrder(list_items)
+
+    if not any(can_save for (_, (_, can_save)) in list_items):
+        def match_dict_or_obj_adaptive(other):
+            adaptive.tick()
+            for (key_index, (data_key, (match_value, _))) in adaptive.order:
+                try:
+                    other_value = get_value(other, data_key)
+                except missing_error:
+                    adaptive.counts[key_index] += 1
+                    if failed_key is not None:
+                        failed_key(data_key, explain.MISSING)
+                    return False
+                if not match_value(other_value):
+                    adaptive.counts[key_index] += 1
+                    if failed_key is not None:
+                        failed_key(data_key, other_value)
+                    return False
+            return True
+
+        return match_dict_or_obj_adaptive, False
+
+    key_count = len(list_items)
+
+    def match_dict_or_obj_adaptive_and_save(other):
+        adaptive.tick()
+        list_match_dict_or_True = [None] * key_count
+        for (key_index, (data_key, (match_value, value_can_save))) in adaptive.order:
+            try:
+                other_value = get_value(other, data_key)
+            except missing_error:
+                adaptive.counts[key_index] += 1
+                if failed_key is not None:
+                    failed_key(data_key, explain.MISSING)
+                return False
+            match_dict_or_True = match_value(other_value)
+            if not match_dict_or_True:
+                adaptive.counts[key_index] += 1
+                if failed_key is not None:
+                    failed_key(data_key, other_value)
+                return False
+            if value_can_save:
+                list_match_dict_or_True[key_index] = match_dict_or_True
+        dict_saved_values = {}
+        for match_dict_or_True in list_match_dict_or_True:
+            if isinstance(match_dict_or_True, dict):
+                dict_saved_values.update(match_dict_or_True)
+        return (dict_saved_values or True)
+
+    return match_dict_or_obj_adaptive_and_save, True
@@ -0,0 +1,317 @@
+'''
+Profiling of matching, for finding out which part of a large pattern costs
+the time.
+
+Within `with profiling():`, every WrapObj and WrapMultiObj compared is
+counted and timed, along with which alternatives of OR(...) allow the
+value. Counts are kept for each pattern matched at the top, by the path of
+the node in it, where elements matched by a .times are shown as [*].
+pattern.profile_report() prints them afterwards, most time first.
+
+>>> from wrap_obj import w, inf
+>>> pattern = w({"items": [w([{"price": float}]).times(0, inf)]})
+>>> with profiling():
+...     _ = pattern == {"items": [{"price": 1.5}, {"price": 2}]}
+>>> for node_stat in sorted(profile_stats(pattern)):
+...     print(node_stat.path, node_stat.label, node_stat.calls, node_stat.passed, node_stat.failed)
+root {'items': ...} 1 0 1
+root['items'] [[{'price': ...}].times(0, inf)] 1 0 1
+root['items'] [{'price': ...}].times(0, inf) 1 0 1
+root['items'][*] {'price': ...} 2 1 1
+root['items'][*]['price'] float 2 1 1
+
+Profiling uses the same hook as tracing (see tracer.py), so both cant be on
+at once, and it costs nothing while off. Compiled matchers are profiled by
+matching their pattern through WrapObj. Times include the cost of
+profiling itself, so are best compared with each other.
+'''
+from __future__ import print_function
+from collections import namedtuple
+from contextlib import contextmanager
+from timeit import default_timer
+import sys
+import threading
+
+import tracer
+
+__all__ = ["profiling", "profile_report", "profile_stats", "reset_profile", "NodeStat"]
+
+# labels longer than this are cut
+MAX_LABEL_LEN = 40
+
+
+class NodeStat(namedtuple("NodeStat", ["path", "label", "calls", "passed", "failed", "seconds", "own_seconds"])):
+
+    '''
+    Counts for one node of a pattern.
+    path -> path of the node, like root['items'][*]['price']
+    label -> short form of the node, like float or OR(1, 2)
+    calls -> number of times it was compared
+    passed, failed -> number of comparisons which matched or didnt
+    seconds -> total time of the comparisons, None for OR alternatives,
+               which arent timed
+    own_seconds -> seconds, apart from the time of nodes within it
+    '''
+
+    __slots__ = ()
+
+
+class Profiler(object):
+
+    '''
+    Internal class. Sink for tracer, which keeps counts for each top
+    pattern, by key of node (path and label).
+    dict_pattern_stat -> dict of id(top pattern) to (top pattern, dict of
+                         node key to [calls, passed, seconds, own seconds])
+    '''
+
+    def __init__(self):
+        super(Profiler, self).__init__()
+        self.dict_pattern_stat = {}
+        self.lock = threading.Lock()
+        # stack of frames of comparisons not done yet, for each thread
+        self.local = threading.local()
+
+    def get_stack(self):
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def enter(self):
+        # frame is [start time, seconds of nodes within it, finished events]
+        stack = self.get_stack()
+        stack.append([default_timer(), 0.0, []])
+
+    def cancel(self):
+        stack = self.get_stack()
+        stack.pop()
+
+    def __call__(self, event):
+        end = default_timer()
+        stack = self.get_stack()
+        (start, inner_seconds, list_record) = stack.pop()
+        seconds = end - start
+        list_record.append((event, seconds, seconds - inner_seconds))
+        if stack:
+            # the events of a comparison are counted with the top pattern
+            # it is in, which is only known once that is done
+            stack[-1][1] += seconds
+            stack[-1][2].extend(list_record)
+        else:
+            self.add(event.node, list_record)
+
+    def add(self, top_node, list_record):
+        top_pattern = pattern_key(top_node)
+        with self.lock:
+            (_, dict_stat) = self.dict_pattern_stat.setdefault(id(top_pattern), (top_pattern, {}))
+            for (event, seconds, own_seconds) in list_record:
+                path = format_profile_path(event.path)
+                add_stat(dict_stat, (path, node_label(event.node)), event.result, seconds, own_seconds)
+                data = node_data(event.node)
+                if is_or(data):
+                    for each_value in data.list_match_type:
+                        add_stat(dict_stat, (path, "| " + short_repr(each_value)),
+                                 value_allows(each_value, event.other), None, None)
+
+    def stats(self, pattern):
+        top_pattern = pattern_key(pattern)
+        with self.lock:
+            (saved_pattern, dict_stat) = self.dict_pattern_stat.get(id(top_pattern), (None, {}))
+            if saved_pattern is not top_pattern:
+                return []
+            return [NodeStat(path, label, calls, passed, calls - passed, seconds, own_seconds)
+                    for ((path, label), [calls, passed, seconds, own_seconds]) in dict_stat.iteritems()]
+
+    def reset(self):
+        with self.lock:
+            self.dict_pattern_stat.clear()
+
+
+def add_stat(dict_stat, node_key, result, seconds, own_seconds):
+    '''
+    Internal function. Adds a comparison to counts of node_key
+    '''
+    stat = dict_stat.get(node_key)
+    if stat is None:
+        stat = dict_stat[node_key] = [0, 0, (None if seconds is None else 0.0), (None if seconds is None else 0.0)]
+    stat[0] += 1
+    if result:
+        stat[1] += 1
+    if seconds is not None:
+        stat[2] += seconds
+        stat[3] += own_seconds
+
+
+PROFILER = Profiler()
+
+
+@contextmanager
+def profiling(reset=False):
+    '''
+    Profiles matching within the with block. Counts are added to those of
+    earlier blocks, unless reset is True.
+    '''
+    if reset:
+        reset_profile()
+    previous_sink = tracer.get_trace_sink()
+    tracer.set_trace_sink(PROFILER)
+    try:
+        yield PROFILER
+    finally:
+        tracer.set_trace_sink(previous_sink)
+
+
+def reset_profile():
+    '''
+    Forgets the counts of all patterns
+    '''
+    PROFILER.reset()
+
+
+def profile_stats(pattern):
+    '''
+    Returns list of NodeStat of pattern (WrapObj, WrapMultiObj, Matcher or
+    a plain pattern), matched at the top while profiling
+    '''
+    return PROFILER.stats(pattern)
+
+
+def profile_report(pattern, out=None, limit=None):
+    '''
+    Prints table of NodeStat of pattern to out (sys.stdout by default), most
+    time first, at most limit rows
+    '''
+    out = sys.stdout if out is None else out
+    list_stat = sorted(profile_stats(pattern), key=lambda node_stat: (-(node_stat.seconds or 0), node_stat.path))
+    list_stat = list_stat[:limit]
+    path_len = max([len("path")] + [len(node_stat.path) for node_stat in list_stat])
+    label_len = max([len("node")] + [len(node_stat.label) for node_stat in list_stat])
+    row_format = "{0:<{path_len}} {1:<{label_len}} {2:>8} {3:>8} {4:>8} {5:>11} {6:>11}"
+    print(row_format.format("path", "node", "calls", "passed", "failed", "total (ms)", "own (ms)",
+                            path_len=path_len, label_len=label_len), file=out)
+    for node_stat in list_stat:
+        print(row_format.format(node_stat.path, node_stat.label, node_stat.calls, node_stat.passed, node_stat.failed,
+                                format_ms(node_stat.seconds), format_ms(node_stat.own_seconds),
+                                path_len=path_len, label_len=label_len), file=out)
+
+
+def format_ms(seconds):
+    return "-" if seconds is None else "{0:.3f}".format(seconds * 1e3)
+
+
+def pattern_key(pattern):
+    '''
+    Internal function. Returns what a top pattern is counted by - its data
+    within any WrapObj or Matcher, or the WrapMultiObj
+    '''
+    from wrap_obj import WrapObj
+    from matcher import Matcher
+
+    if isinstance(pattern, Matcher):
+        pattern = pattern.pattern
+    while isinstance(pattern, WrapObj):
+        pattern = pattern.data
+    return pattern
+
+
+def node_data(node):
+    '''
+    Internal function. Returns data of node, within any WrapObj
+    '''
+    from wrap_obj import WrapObj
+
+    data = node.data
+    while isinstance(data, WrapObj):
+        data = data.data
+    return data
+
+
+def is_or(data):
+    from wrap_obj import MetaMultiInstanceMatcher
+    return isinstance(data, MetaMultiInstanceMatcher)
+
+
+def value_allows(value_or_type, other):
+    from wrap_obj import check_as_value_and_type
+    return check_as_value_and_type(other, value_or_type)
+
+
+def format_profile_path(path):
+    '''
+    Internal function. Formats path like tracer.format_path, but with
+    elements matched by a repeat as [*], and without the slice taken by
+    the repeat (which depends on the length of other)
+
+    >>> format_profile_path(("items", slice(1, 5), tracer.RepeatIndex(3), "price"))
+    "root['items'][*]['price']"
+    '''
+    list_path_key = []
+    for path_key in path:
+        if isinstance(path_key, slice):
+            continue
+        if isinstance(path_key, tracer.RepeatIndex):
+            list_path_key.append(ANY_INDEX)
+        else:
+            list_path_key.append(path_key)
+    return tracer.format_path(list_path_key)
+
+
+class AnyIndex(object):
+
+    '''
+    Internal class. Path key shown as [*]
+    '''
+
+    def __repr__(self):
+        return "*"
+
+ANY_INDEX = AnyIndex()
+
+
+def node_label(node):
+    '''
+    Internal function. Returns short form of node, like float, OR(1, 2),
+    {'a': ...} or [int, ...].times(0, inf)
+    '''
+    from wrap_obj import WrapMultiObj
+
+    if isinstance(node, WrapMultiObj):
+        return "{data}.times({low}, {high})".format(data=short_repr(node.data), low=node.repeat_allowed_range[0],
+                                                   high=node.repeat_allowed_range[1])
+    label = short_repr(node_data(node))
+    if getattr(node, "treat_as_object", False):
+        label += ".as_obj()"
+    return label
+
+
+def short_repr(data):
+    '''
+    Internal function. Returns data as a short string
+
+    >>> short_repr({"a": int}), short_repr([int, str]), short_repr(5)
+    ("{'a': ...}", '[int, ...]', '5')
+    '''
+    from collections import Mapping
+    from wrap_obj import WrapObj, WrapMultiObj
+
+    if isinstance(data, WrapObj):
+        return short_repr(node_data(data))
+    if isinstance(data, WrapMultiObj):
+        return node_label(data)
+    if is_or(data):
+        label = "OR({values})".format(values=", ".join(short_repr(each_value)
+                                                       for each_value in data.list_match_type))
+    elif isinstance(data, type):
+        label = data.__name__
+    elif isinstance(data, Mapping):
+        label = "{{{key!r}: ...}}".format(key=sorted(data)[0]) if data else "{}"
+    elif isinstance(data, list):
+        label = "[{first}, ...]".format(first=short_repr(data[0])) if len(data) > 1 else \
+            "[{first}]".format(first=short_repr(data[0]) if data else "")
+    else:
+        label = repr(data)
+    if len(label) > MAX_LABEL_LEN:
+        label = label[:MAX_LABEL_LEN - 3] + "..."
+    return label
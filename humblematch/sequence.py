@@ -0,0 +1,200 @@
+'''
+Matching of list patterns with more than one WrapMultiObj.
+
+With a single WrapMultiObj, everything before it is matched from the start
+of the list, everything after it from the end and it gets the rest. With
+more of them, where one repeat ends and the next part starts is not known
+upfront. Instead of trying every split (which can take exponential time),
+match_sequence works over (pattern position, list index) pairs -
+
+1. Going backwards over the pattern, find for each pattern position the list
+   indexes from which the rest of the pattern matches the rest of the list.
+2. Going forwards, pick the split. When there is more than one possible
+   split, earlier repeats take as many elements as they can.
+
+Each element of the pattern is matched at most once against each element of
+the list, so the worst case is O(len(other) * total elements in pattern)
+element matches, plus O(len(other) * number of pattern positions) memory.
+It never backtracks.
+'''
+
+from wrap_obj import slice_list
+
+__all__ = ["Repeat", "SequenceMatcher", "match_sequence"]
+
+
+class Repeat(object):
+
+    '''
+    One WrapMultiObj inside a list pattern, given to match_sequence.
+    list_match_ele -> functions matching each element of repeated unit,
+                      returning like WrapObj.__eq__
+    '''
+
+    def __init__(self, list_match_ele, range_low, range_high, save_key=None):
+        super(Repeat, self).__init__()
+        if not list_match_ele:
+            raise TypeError("Repeated part of a list should not be empty")
+        self.list_match_ele = list_match_ele
+        self.range_low = range_low
+        self.range_high = range_high
+        self.save_key = save_key
+
+
+class SequenceMatcher(object):
+
+    '''
+    list_segment -> list of functions matching single elements, like
+                    WrapObj(ele_data).__eq__, and Repeat objects
+
+    >>> match = SequenceMatcher([lambda x: x == 1,
+    ...                          Repeat([lambda x: x == 2], 0, float("inf")),
+    ...                          Repeat([lambda x: x in (2, 3)], 1, float("inf"))])
+    >>> match([1, 2, 2, 3])
+    True
+    >>> match([1, 2, 2])
+    True
+    >>> match([1, 3, 1])
+    False
+    '''
+
+    def __init__(self, list_segment):
+        super(SequenceMatcher, self).__init__()
+        self.list_segment = list_segment
+
+    def __call__(self, other):
+        return match_sequence(self.list_segment, other)
+
+
+def match_sequence(list_segment, other, indexed=False):
+    '''
+    Matches list-ish other against list_segment (see SequenceMatcher).
+    Returns False, True or dict of saved values like WrapObj.match_list.
+    With indexed, the functions are called with (index in other, element),
+    for tracing.
+
+    When more than one split works, earlier repeats are greedy.
+    >>> from wrap_obj import WrapObj
+    >>> saved = match_sequence([Repeat([WrapObj(int).save_as("a").__eq__], 0, 5),
+    ...                         Repeat([WrapObj(int).save_as("b").__eq__], 1, 5)],
+    ...                        [1, 2, 3])
+    >>> saved == {"a": [1, 2], "b": [3]}
+    True
+    '''
+    other_len = len(other)
+    segment_count = len(list_segment)
+
+    # results of matching each single element or repeated unit,
+    # by [segment_index][other_index]
+    list_results = [{} for _ in list_segment]
+    # number of consecutive matching units from each index, by segment
+    list_chain = [None] * segment_count
+
+    # list_can_finish[segment_index][other_index] is True if
+    # list_segment[segment_index:] matches other[other_index:]
+    list_can_finish = [None] * (segment_count + 1)
+    list_can_finish[segment_count] = [False] * other_len + [True]
+
+    for segment_index in range(segment_count - 1, -1, -1):
+        segment = list_segment[segment_index]
+        next_can_finish = list_can_finish[segment_index + 1]
+        can_finish = [False] * (other_len + 1)
+        results = list_results[segment_index]
+
+        if isinstance(segment, Repeat):
+            unit_len = len(segment.list_match_ele)
+            chain = list_chain[segment_index] = match_units(segment, other, results, indexed)
+            # count_after[index] is number of places a repeat can end at, in
+            # index, index + unit_len, index + 2*unit_len, ...
+            count_after = [0] * (other_len + 1 + unit_len)
+            for other_index in range(other_len, -1, -1):
+                count_after[other_index] = next_can_finish[other_index] + count_after[other_index + unit_len]
+
+            for other_index in range(other_len + 1):
+                max_count = min(chain[other_index], segment.range_high - 1)
+                if max_count < segment.range_low:
+                    continue
+                first_end = other_index + segment.range_low * unit_len
+                after_last_end = min(other_index + (max_count + 1) * unit_len, other_len + unit_len)
+                if count_after[first_end] > count_after[after_last_end]:
+                    can_finish[other_index] = True
+        else:
+            for other_index in range(other_len):
+                if next_can_finish[other_index + 1]:
+                    match_dict_or_True = (segment(other_index, other[other_index]) if indexed
+                                          else segment(other[other_index]))
+                    if match_dict_or_True:
+                        results[other_index] = match_dict_or_True
+                        can_finish[other_index] = True
+
+        if not any(can_finish):
+            # rest of the pattern doesnt match anywhere
+            return False
+        list_can_finish[segment_index] = can_finish
+
+    if not list_can_finish[0][0]:
+        return False
+
+    # walk forwards along one working split, collecting saved values
+    dict_saved_values = {}
+    other_index = 0
+    for (segment_index, segment) in enumerate(list_segment):
+        results = list_results[segment_index]
+        next_can_finish = list_can_finish[segment_index + 1]
+
+        if isinstance(segment, Repeat):
+            unit_len = len(segment.list_match_ele)
+            repeat_count = min(list_chain[segment_index][other_index], segment.range_high - 1)
+            while not next_can_finish[other_index + repeat_count * unit_len]:
+                repeat_count -= 1
+            end_index = other_index + repeat_count * unit_len
+
+            repeat_saved_values = {}
+            for unit_index in range(other_index, end_index, unit_len):
+                for match_dict_or_True in results[unit_index]:
+                    if isinstance(match_dict_or_True, dict):
+                        for match_key in match_dict_or_True:
+                            match_val = match_dict_or_True[match_key]
+                            prev_match_val = repeat_saved_values.get(match_key)
+                            if isinstance(prev_match_val, list):
+                                prev_match_val.append(match_val)
+                            else:
+                                repeat_saved_values[match_key] = [match_val]
+            if segment.save_key is not None:
+                repeat_saved_values[segment.save_key] = slice_list(other, other_index, end_index)
+            dict_saved_values.update(repeat_saved_values)
+            other_index = end_index
+        else:
+            match_dict_or_True = results[other_index]
+            if isinstance(match_dict_or_True, dict):
+                dict_saved_values.update(match_dict_or_True)
+            other_index += 1
+
+    return (dict_saved_values or True)
+
+
+def match_units(segment, other, results, indexed=False):
+    '''
+    Internal function. Matches the unit of a Repeat starting at every index
+    of other. Stores results of each unit in results and returns list of
+    number of consecutive matching units starting at each index.
+    '''
+    other_len = len(other)
+    list_match_ele = segment.list_match_ele
+    unit_len = len(list_match_ele)
+    chain = [0] * (other_len + 1 + unit_len)
+
+    for other_index in range(other_len - unit_len, -1, -1):
+        unit_results = []
+        for (ele_index, match_ele) in enumerate(list_match_ele):
+            match_dict_or_True = (match_ele(other_index + ele_index, other[other_index + ele_index]) if indexed
+                                  else match_ele(other[other_index + ele_index]))
+            if not match_dict_or_True:
+                break
+            unit_results.append(match_dict_or_True)
+        else:
+            results[other_index] = unit_results
+            chain[other_index] = chain[other_index + unit_len] + 1
+
+    return chain
+
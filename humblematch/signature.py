@@ -0,0 +1,478 @@
+'''
+Checking the arguments of a function against patterns.
+
+@accepts(x=int, y=OR(int, None)) checks like w([int, OR(int, None)]) == [x, y]
+at the start of every call, but the signature is read and the patterns are
+compiled once, when decorating. The wrapper is generated with the same
+arguments as the function, so python binds them as usual and nothing is
+built for a call. Patterns which are types (like int or OR(int, None)) are
+checked with isinstance in the wrapper itself, others with their compiled
+matcher, so checks arent traced.
+
+>>> from wrap_obj import OR
+>>> @accepts(x=int, y=OR(int, None))
+... def move(x, y=None):
+...     return (x, y)
+>>> move(1, y=2)
+(1, 2)
+>>> move(1, "2")
+Traceback (most recent call last):
+  ...
+TypeError: move() argument y: expected OR(int, None), got '2' (doesnt match)
+
+With set_checks(False), accepts returns the function itself, so it costs
+nothing. It only changes functions decorated afterwards, so it should be
+called before importing them.
+
+@overload(...) registers implementations of a function for different
+patterns of arguments, calling the first one which matches. Which one
+that is, is found by a tree switching on the number, exact types and
+values of the arguments (see Overload), so it costs about the same with
+many implementations.
+
+>>> @overload(x=int, y=int)
+... def point(x, y):
+...     return (x, y)
+>>> @point.register(x=[int, int])
+... def point(x):
+...     return tuple(x)
+>>> point(1, 2), point([1, 2])
+((1, 2), (1, 2))
+'''
+from collections import namedtuple
+from functools import update_wrapper
+import inspect
+import linecache
+import types
+
+from wrap_obj import Any, HASHED_VALUE_TYPES
+from dispatch import kind_follows_type, MAX_CACHED_TYPES
+
+__all__ = ["accepts", "set_checks", "get_checks", "overload", "Overload"]
+
+# whether accepts wraps functions at all
+checks = True
+
+
+def set_checks(enabled):
+    '''
+    Turns checks of functions decorated afterwards with accepts on or off
+    '''
+    global checks
+    checks = bool(enabled)
+
+
+def get_checks():
+    return checks
+
+
+def accepts(**dict_pattern):
+    '''
+    Decorator checking arguments of the function by name, raising TypeError
+    if one doesnt match its pattern. *args and **kwargs are matched as the
+    tuple and dict they are. Default values are checked too.
+    '''
+    def decorate(func):
+        if not checks:
+            return func
+        return make_checked(func, dict_pattern)
+
+    return decorate
+
+
+def read_arguments(func, dict_pattern):
+    '''
+    Internal function. Returns (args, varargs, keywords, defaults, names of
+    all arguments) of func, checking that dict_pattern only has those names
+    '''
+    (list_arg, varargs, keywords, defaults) = inspect.getargspec(func)
+    if not all(isinstance(arg, str) for arg in list_arg):
+        raise TypeError("{name}() has tuple arguments, which cant be checked".format(name=func.__name__))
+    list_name = list_arg + [name for name in (varargs, keywords) if name is not None]
+    for name in dict_pattern:
+        if name not in list_name:
+            raise TypeError("{func}() has no argument {name}".format(func=func.__name__, name=name))
+    return (list_arg, varargs, keywords, defaults or (), list_name)
+
+
+def make_checked(func, dict_pattern):
+    '''
+    Internal function. Returns wrapper of func checking dict_pattern
+    '''
+    from matcher import Matcher
+
+    (list_arg, varargs, keywords, defaults, list_name) = read_arguments(func, dict_pattern)
+
+    # names in the wrapper source are prefixed so that they dont hide
+    # arguments of the same name
+    prefix = "_"
+    while any(name.startswith(prefix) for name in list_name):
+        prefix += "_"
+    namespace = {prefix + "func": func}
+    list_matcher = []
+
+    def failed(check_index, other):
+        (name, matcher) = list_matcher[check_index]
+        failure = matcher.explain(other)
+        raise TypeError("{func}() argument {name}{path}: expected {failure}".format(
+            func=func.__name__, name=name, path=failure.format_path()[len("root"):],
+            failure=str(failure).partition(": expected ")[2]))
+
+    namespace[prefix + "failed"] = failed
+
+    list_param = []
+    first_default = len(list_arg) - len(defaults)
+    for (arg_index, arg) in enumerate(list_arg):
+        if arg_index >= first_default:
+            namespace["{prefix}d{index}".format(prefix=prefix, index=arg_index)] = defaults[arg_index - first_default]
+            list_param.append("{arg}={prefix}d{index}".format(arg=arg, prefix=prefix, index=arg_index))
+        else:
+            list_param.append(arg)
+    list_call_arg = list(list_arg)
+    if varargs is not None:
+        list_param.append("*" + varargs)
+        list_call_arg.append("*" + varargs)
+    if keywords is not None:
+        list_param.append("**" + keywords)
+        list_call_arg.append("**" + keywords)
+
+    lines = ["def checked({params}):".format(params=", ".join(list_param))]
+    for name in list_name:
+        if name not in dict_pattern:
+            continue
+        pattern = dict_pattern[name]
+        matcher = Matcher(pattern)
+        check_index = len(list_matcher)
+        list_matcher.append((name, matcher))
+        if isinstance(pattern, type):
+            namespace["{prefix}c{index}".format(prefix=prefix, index=check_index)] = pattern
+            check = "isinstance({name}, {prefix}c{index})"
+        else:
+            namespace["{prefix}m{index}".format(prefix=prefix, index=check_index)] = matcher._match
+            check = "{prefix}m{index}({name})"
+        lines.append("    if not {check}:".format(check=check.format(name=name, prefix=prefix, index=check_index)))
+        lines.append("        {prefix}failed({index}, {name})".format(prefix=prefix, index=check_index, name=name))
+    lines.append("    return {prefix}func({args})".format(prefix=prefix, args=", ".join(list_call_arg)))
+    source = "\n".join(lines) + "\n"
+
+    filename = "<humblematch accepts {name}>".format(name=func.__name__)
+    code = compile(source, filename, "exec")
+    # let tracebacks and debuggers show the generated lines
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec code in namespace
+    checked = update_wrapper(namespace["checked"], func)
+    checked.__wrapped__ = func
+    checked.source = source
+    return checked
+
+
+# kinds of checks of an argument in the dispatch tree of overload
+CLASS = 0  # plain class, decided by the exact type of the argument
+LITERAL = 1  # hashable value, looked up among values of other overloads
+OTHER = 2  # anything else, matched by its compiled matcher
+
+
+class Check(namedtuple("Check", ["position", "kind", "pattern", "match"])):
+
+    '''
+    Internal class. Check of one argument of a call by an overload.
+    position -> index of the argument, or slice of the arguments for *args
+    match -> compiled matcher of pattern
+    '''
+
+    __slots__ = ()
+
+
+class Candidate(namedtuple("Candidate", ["func", "list_check"])):
+
+    '''
+    Internal class. Overload which can still be called, with the checks it
+    has left
+    '''
+
+    __slots__ = ()
+
+
+class Implementation(object):
+
+    '''
+    Internal class. One function registered with an Overload
+    '''
+
+    def __init__(self, func, dict_pattern):
+        super(Implementation, self).__init__()
+        from matcher import Matcher
+
+        (self.list_arg, self.varargs, self.keywords, self.defaults, list_name) = read_arguments(func, dict_pattern)
+        self.func = func
+        # (name, matcher) in order of arguments, Any isnt checked
+        self.list_matcher = [(name, Matcher(dict_pattern[name])) for name in list_name
+                             if name in dict_pattern and dict_pattern[name] is not Any]
+
+    def candidate(self, arg_count):
+        '''
+        Returns Candidate for a call with arg_count positional arguments (and
+        no keyword arguments), or None if that cant match. Arguments left
+        with default values are checked now.
+        '''
+        list_arg = self.list_arg
+        if arg_count < len(list_arg) - len(self.defaults) or (arg_count > len(list_arg) and self.varargs is None):
+            return None
+        list_check = []
+        for (name, matcher) in self.list_matcher:
+            if name == self.varargs:
+                if arg_count > len(list_arg):
+                    list_check.append(Check(slice(len(list_arg), None), OTHER, matcher.pattern, matcher._match))
+                elif not matcher(()):
+                    return None
+            elif name == self.keywords:
+                if not matcher({}):
+                    return None
+            else:
+                position = list_arg.index(name)
+                if position >= arg_count:
+                    if not matcher(self.defaults[position - len(list_arg)]):
+                        return None
+                else:
+                    list_check.append(Check(position, pattern_kind(matcher.pattern), matcher.pattern, matcher._match))
+        return Candidate(self.func, list_check)
+
+    def call_bound(self, list_arg, dict_kwarg):
+        '''
+        Returns (True, result of func) if list_arg and dict_kwarg bind to
+        its arguments and match, else (False, None)
+        '''
+        try:
+            dict_bound = inspect.getcallargs(self.func, *list_arg, **dict_kwarg)
+        except TypeError:
+            return (False, None)
+        for (name, matcher) in self.list_matcher:
+            if not matcher(dict_bound[name]):
+                return (False, None)
+        return (True, self.func(*list_arg, **dict_kwarg))
+
+
+def pattern_kind(pattern):
+    '''
+    Internal function. Returns kind of check for pattern in the dispatch tree
+    '''
+    if type(pattern) is type:
+        # matched with isinstance, as no plain class is list-ish or a Mapping
+        return CLASS
+    if type(pattern) in HASHED_VALUE_TYPES and pattern == pattern:
+        # matched with ==, which dicts find by hash for these types (but nan
+        # isnt equal to itself)
+        return LITERAL
+    return OTHER
+
+
+def build_node(list_candidate):
+    '''
+    Internal function. Returns node switching on the first argument which
+    some candidate checks by class or literal, or LeafNode if there is none
+    '''
+    list_position = [check.position for candidate in list_candidate for check in candidate.list_check
+                     if check.kind != OTHER]
+    if not list_position:
+        return LeafNode(list_candidate)
+    return TypeNode(min(list_position), list_candidate)
+
+
+class LeafNode(object):
+
+    '''
+    Internal class. Candidates left, tried in the order they were registered
+    '''
+
+    position = None
+
+    def __init__(self, list_candidate):
+        super(LeafNode, self).__init__()
+        self.list_candidate = [(candidate.func, [(check.position, check.match) for check in candidate.list_check])
+                               for candidate in list_candidate]
+
+
+class TypeNode(object):
+
+    '''
+    Internal class. Switches on the exact type of the argument at position,
+    deciding the CLASS checks of it. Nodes for each type are built the
+    first time a value of it is seen. Types are held by the dict, at most
+    MAX_CACHED_TYPES of them, later ones use the node which leaves all
+    checks of the argument to the leaves.
+    '''
+
+    def __init__(self, position, list_candidate):
+        super(TypeNode, self).__init__()
+        self.position = position
+        self.list_candidate = list_candidate
+        self.by_type = {}
+        self.undecided = None
+
+    def child(self, other):
+        node = self.by_type.get(type(other))
+        if node is None:
+            node = self.add(other)
+        return node
+
+    def add(self, other):
+        other_type = type(other)
+        if not kind_follows_type(other, other_type) or len(self.by_type) >= MAX_CACHED_TYPES:
+            # isinstance may differ for other values of the type
+            if self.undecided is None:
+                self.undecided = self.build(other, False)
+            return self.undecided
+        node = self.by_type[other_type] = self.build(other, True)
+        return node
+
+    def build(self, other, by_type):
+        '''
+        Returns node after this one, for values of the type of other, or for
+        any value if by_type is False
+        '''
+        position = self.position
+        is_hashed = by_type and type(other) in HASHED_VALUE_TYPES
+        list_candidate = []
+        has_literal = False
+        for candidate in self.list_candidate:
+            list_check = []
+            for check in candidate.list_check:
+                if check.position != position:
+                    list_check.append(check)
+                elif check.kind == CLASS and by_type:
+                    if not isinstance(other, check.pattern):
+                        break
+                elif check.kind == LITERAL and is_hashed:
+                    has_literal = True
+                    list_check.append(check)
+                else:
+                    list_check.append(check._replace(kind=OTHER))
+            else:
+                list_candidate.append(Candidate(candidate.func, list_check))
+        if has_literal:
+            return LiteralNode(position, list_candidate)
+        return build_node(list_candidate)
+
+
+class LiteralNode(object):
+
+    '''
+    Internal class. Switches on the value of the argument at position,
+    deciding the LITERAL checks of it
+    '''
+
+    def __init__(self, position, list_candidate):
+        super(LiteralNode, self).__init__()
+        self.position = position
+        self.by_value = {}
+        for candidate in list_candidate:
+            for check in candidate.list_check:
+                if check.position == position and check.kind == LITERAL and check.pattern not in self.by_value:
+                    self.by_value[check.pattern] = self.build(list_candidate, True, check.pattern)
+        self.default = self.build(list_candidate, False, None)
+
+    def child(self, other):
+        return self.by_value.get(other, self.default)
+
+    def build(self, list_candidate, has_value, value):
+        '''
+        Returns node after this one, for the argument being value, or any
+        value other than the literals if has_value is False
+        '''
+        position = self.position
+        list_candidate_left = []
+        for candidate in list_candidate:
+            list_check = []
+            for check in candidate.list_check:
+                if check.position != position or check.kind != LITERAL:
+                    list_check.append(check)
+                elif not (has_value and check.pattern == value):
+                    break
+            else:
+                list_candidate_left.append(Candidate(candidate.func, list_check))
+        return build_node(list_candidate_left)
+
+
+class Overload(object):
+
+    '''
+    Function with implementations for different patterns of arguments,
+    made with overload. More are added with register.
+
+    Calls with only positional arguments go down a tree built from the
+    patterns: the number of arguments picks the implementations which take
+    that many, then the exact type of the arguments decides their checks
+    which are plain classes, and their value decides checks which are
+    literals. Only the implementations left are matched in turn.
+    '''
+
+    def __init__(self, func):
+        super(Overload, self).__init__()
+        update_wrapper(self, func)
+        self.list_implementation = []
+        # root node for each number of positional arguments
+        self.dict_root = {}
+
+    def register(self, **dict_pattern):
+        '''
+        Decorator adding the function as an implementation, for arguments
+        matching dict_pattern. Returns this Overload, so it can be used with
+        the same name. Implementations registered earlier are tried first.
+        '''
+        def decorate(func):
+            self.list_implementation.append(Implementation(func, dict_pattern))
+            self.dict_root = {}
+            return self
+
+        return decorate
+
+    def __call__(self, *list_arg, **dict_kwarg):
+        if dict_kwarg:
+            for implementation in self.list_implementation:
+                (matched, result) = implementation.call_bound(list_arg, dict_kwarg)
+                if matched:
+                    return result
+            raise self.no_match(list_arg, dict_kwarg)
+
+        node = self.dict_root.get(len(list_arg))
+        if node is None:
+            node = self.dict_root[len(list_arg)] = build_node(
+                [candidate for candidate in (implementation.candidate(len(list_arg))
+                                             for implementation in self.list_implementation)
+                 if candidate is not None])
+        while node.position is not None:
+            node = node.child(list_arg[node.position])
+        for (func, list_check) in node.list_candidate:
+            for (position, match) in list_check:
+                if not match(list_arg[position]):
+                    break
+            else:
+                return func(*list_arg)
+        raise self.no_match(list_arg, dict_kwarg)
+
+    def __get__(self, obj, obj_type=None):
+        # bind like a function, for overloaded methods
+        if obj is None:
+            return self
+        return types.MethodType(self, obj, obj_type)
+
+    def no_match(self, list_arg, dict_kwarg):
+        from profiler import short_repr
+        list_part = [short_repr(arg) for arg in list_arg]
+        list_part.extend("{key}={value}".format(key=key, value=short_repr(value))
+                         for (key, value) in sorted(dict_kwarg.items()))
+        return TypeError("{name}() has no overload matching ({args})".format(
+            name=self.__name__, args=", ".join(list_part)))
+
+
+def overload(**dict_pattern):
+    '''
+    Decorator making the function an Overload, called when the arguments
+    match dict_pattern (by name, like accepts). Other implementations are
+    added with .register, and the first one matching is called.
+    '''
+    def decorate(func):
+        overloaded = Overload(func)
+        return overloaded.register(**dict_pattern)(func)
+
+    return decorate
@@ -0,0 +1,190 @@
+'''
+Matching list patterns with iterables which are read only once, like
+generators or lines of a file, without making a list of them first.
+
+>>> from wrap_obj import w, inf
+>>> match_stream(w([int]).times(0, inf), (number * 2 for number in range(10 ** 6)))
+True
+
+Elements are matched as they are read, and reading stops at the first one
+which doesnt match, or once there are more repeats than allowed.
+>>> from itertools import count
+>>> match_stream(w([int]).times(0, 10), count())
+False
+
+Only the elements which cant be matched yet are kept. For a pattern like
+[header, w([...]).times(...), footer_1, footer_2], that is the last two
+elements read (which could be the footer) and the part of a repeat read so
+far. Values saved with save_as are kept, of course.
+
+A pattern can have at most one WrapMultiObj to be streamed, as with more of
+them, where one ends cant be known before reading all of the elements.
+'''
+from collections import Mapping, Iterable, deque
+from itertools import islice
+import types
+
+from wrap_obj import WrapObj, WrapMultiObj
+from matcher import compile_node, compile_list
+
+__all__ = ["StreamMatcher", "match_stream"]
+
+
+class StreamMatcher(object):
+
+    '''
+    Pattern compiled for matching iterables with match_stream.
+    pattern -> list-ish data (optionally wrapped in WrapObj) with at most
+               one WrapMultiObj, or a WrapMultiObj which repeats over the
+               whole iterable
+
+    Calling it returns the same as compile(pattern)(list(iterable)).
+    >>> from wrap_obj import w, inf
+    >>> m = StreamMatcher([str, w([w(int).save_as("n")]).times(1, inf), str])
+    >>> m(iter(["start", 1, 2, "end"]))
+    {'n': [1, 2]}
+    >>> m(iter(["start", 1, 2, 3]))
+    False
+    '''
+
+    def __init__(self, pattern):
+        super(StreamMatcher, self).__init__()
+        self.pattern = pattern
+
+        data = pattern
+        if isinstance(data, WrapMultiObj):
+            data = [data]
+        elif isinstance(data, WrapObj):
+            if data.DO_TYPECHECK or data.treat_as_object or (data.save_key is not None):
+                raise TypeError("{pattern} cant be streamed, as it needs whole of other".format(pattern=pattern))
+            data = data.data
+        if isinstance(data, (WrapObj, types.StringTypes, Mapping)) or not isinstance(data, Iterable):
+            raise TypeError("pattern={pattern} should be list-ish to be streamed".format(pattern=pattern))
+        data = list(data)
+
+        multiobj_indexes = [ele_index for (ele_index, ele_data) in enumerate(data)
+                            if isinstance(ele_data, WrapMultiObj)]
+        if len(multiobj_indexes) > 1:
+            raise TypeError("pattern={pattern} has more than one {multi_class}, cant be streamed"
+                            "".format(pattern=pattern, multi_class=WrapMultiObj))
+
+        # for other which isnt list-ish
+        self.match_node = compile_node(data)[0]
+        # for iterables shorter than the pattern
+        self.match_list = compile_list(data)[0]
+        if not multiobj_indexes:
+            self.multiobj = None
+            self.list_forwards = []
+            self.list_backwards = []
+            self.head_len = len(data)
+            return
+
+        multiobj_index = multiobj_indexes[0]
+        self.multiobj = data[multiobj_index]
+        self.list_forwards = [compile_node(ele_data)[0] for ele_data in data[:multiobj_index]]
+        # checked from -1 backwards, like match_list
+        self.list_backwards = [compile_node(ele_data)[0] for ele_data in reversed(data[multiobj_index + 1:])]
+        self.list_unit = [compile_node(ele_data)[0] for ele_data in self.multiobj.checked_data()]
+        if not self.list_unit:
+            raise TypeError("Repeated part of a list should not be empty")
+        self.head_len = len(self.list_forwards) + len(self.list_backwards)
+
+    def __call__(self, iterable):
+        if isinstance(iterable, Mapping) or not isinstance(iterable, Iterable):
+            return self.match_node(iterable)
+        iterator = iter(iterable)
+        if self.multiobj is None:
+            # one more than the pattern is enough to know its too long
+            return self.match_list(list(islice(iterator, self.head_len + 1)))
+
+        head = list(islice(iterator, self.head_len))
+        if len(head) < self.head_len:
+            return self.match_list(head)
+
+        # after the forwards elements are matched, window has the last
+        # elements read, which are matched with list_backwards at the end
+        window = deque(head)
+        del head
+        dict_saved_values = {}
+        for match_ele in self.list_forwards:
+            if not save_result(match_ele(window.popleft()), dict_saved_values):
+                return False
+        backwards_len = len(self.list_backwards)
+
+        match_dict_or_True = self.match_repeats(iterator, window, backwards_len)
+        if not match_dict_or_True:
+            return False
+
+        for (ele_index, match_ele) in enumerate(self.list_backwards):
+            if not save_result(match_ele(window[-1 - ele_index]), dict_saved_values):
+                return False
+
+        save_result(match_dict_or_True, dict_saved_values)
+        return (dict_saved_values or True)
+
+    def match_repeats(self, iterator, window, backwards_len):
+        '''
+        Internal method. Matches elements of iterator (except the last
+        backwards_len, which are left in window) with the WrapMultiObj
+        '''
+        list_unit = self.list_unit
+        unit_len = len(list_unit)
+        (range_low, range_high) = self.multiobj.repeat_allowed_range
+        save_key = self.multiobj.save_key
+
+        dict_saved_values = {}
+        list_saved_other = [] if save_key is not None else None
+        repeat_count = 0
+        ele_index = 0
+        for ele_other in iterator:
+            window.append(ele_other)
+            if len(window) <= backwards_len:
+                continue
+            ele_other = window.popleft()
+
+            if ele_index == 0 and repeat_count + 1 >= range_high:
+                # one more repeat is starting, which is not allowed
+                return False
+            match_dict_or_True = list_unit[ele_index](ele_other)
+            if not match_dict_or_True:
+                return False
+            if isinstance(match_dict_or_True, dict):
+                # saved values of each repeat are collected in a list
+                for match_key in match_dict_or_True:
+                    match_val = match_dict_or_True[match_key]
+                    prev_match_val = dict_saved_values.get(match_key)
+                    if isinstance(prev_match_val, list):
+                        prev_match_val.append(match_val)
+                    else:
+                        dict_saved_values[match_key] = [match_val]
+            if list_saved_other is not None:
+                list_saved_other.append(ele_other)
+
+            ele_index += 1
+            if ele_index == unit_len:
+                ele_index = 0
+                repeat_count += 1
+
+        if ele_index != 0 or not (range_low <= repeat_count < range_high):
+            return False
+        if save_key is not None:
+            dict_saved_values[save_key] = list_saved_other
+        return (dict_saved_values or True)
+
+
+def save_result(match_dict_or_True, dict_saved_values):
+    '''
+    Internal function. Adds saved values of match_dict_or_True to
+    dict_saved_values, returns whether it matched
+    '''
+    if match_dict_or_True and isinstance(match_dict_or_True, dict):
+        dict_saved_values.update(match_dict_or_True)
+    return bool(match_dict_or_True)
+
+
+def match_stream(pattern, iterable):
+    '''
+    Matches pattern with iterable, reading it only once and lazily.
+    See StreamMatcher.
+    '''
+    return StreamMatcher(pattern)(iterable)
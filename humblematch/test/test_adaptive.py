@@ -0,0 +1,114 @@
+from humblematch import w, Any, OR, inf, compile
+from humblematch.adaptive import AdaptiveOrder, ADAPT_PERIOD
+import cPickle
+import pytest
+
+from test_matcher import list_pattern_other
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_pattern_other)
+def test_same_as_not_adaptive(pattern, other):
+    m = compile(pattern, adaptive=True)
+    for _ in range(3):
+        assert(m(other) == compile(pattern)(other))
+
+
+def test_order():
+    order = AdaptiveOrder(["a", "b", "c", "d"], period=10)
+    order.counts[3] += 5
+    order.counts[1] += 5
+    order.counts[2] += 1
+    for _ in range(9):
+        order.tick()
+    assert([item for (_, item) in order.order] == ["a", "b", "c", "d"])
+    order.tick()
+    # stable for ties
+    assert([item for (_, item) in order.order] == ["b", "d", "c", "a"])
+    assert(order.counts == [0, 2, 0, 2])
+    assert(order.calls == 0)
+
+
+class Record(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def skewed_records():
+    for index in range(ADAPT_PERIOD * 4):
+        if index % 10 == 0:
+            yield {"id": index, "name": "n", "kind": "a", "value": 2.5}
+        elif index % 10 == 1:
+            yield {"id": index, "name": "n", "kind": "b"}
+        elif index % 10 == 2:
+            yield {"id": str(index), "name": "n", "kind": "b", "value": 2.5}
+        else:
+            yield {"id": index, "name": "n", "kind": "c", "value": 2.5}
+
+
+def test_dict_reordered():
+    for pattern in ({"id": int, "name": str, "kind": OR("a", "b"), "value": float},
+                    {"id": w(int).save_as("id"), "name": w(str).save_as("name"),
+                     "kind": w(OR("a", "b")).save_as("kind"), "value": float}):
+        m = compile(pattern, adaptive=True)
+        list_record = list(skewed_records())
+        assert(map(m, list_record) == map(compile(pattern), list_record))
+
+
+def test_saved_values_in_declaration_order():
+    pattern = {"a": w(int).save_as("x"), "b": w(int).save_as("x"), "c": int}
+    m = compile(pattern, adaptive=True)
+    for _ in range(ADAPT_PERIOD * 2):
+        assert(m({"a": 1, "b": 2, "c": "fail"}) is False)
+    assert(m({"a": 1, "b": 2, "c": 3}) == compile(pattern)({"a": 1, "b": 2, "c": 3}))
+
+
+def test_obj_reordered():
+    m = compile(w({"a": int, "b": int}).as_obj(), adaptive=True)
+    for _ in range(ADAPT_PERIOD * 2):
+        assert(m(Record(a=1)) is False)
+    assert(m(Record(a=1, b=2)) is True)
+    assert(m(Record(a=1, b="2")) is False)
+
+
+class Number(object):
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Number) and self.value == other.value
+
+
+def test_or_reordered():
+    pattern = [OR(None, "get", float("nan"), [1], Number(3), str, float, int, Any)]
+    list_other = [5, 2.5, "post", "get", None, [1], [2], Number(3), Number(4), float("nan"), int, Any, str]
+    m = compile(OR(None, "get", [1], Number(3), str, float, int), adaptive=True)
+    expected = compile(OR(None, "get", [1], Number(3), str, float, int))
+    for _ in range(3):
+        for other in list_other:
+            for _ in range(ADAPT_PERIOD // 2):
+                assert(m(other) == expected(other))
+    m = compile(pattern, adaptive=True)
+    for other in list_other:
+        assert(m([other]) == compile(pattern)([other]))
+
+
+def test_or_saved():
+    m = compile(w(OR(int, str)).save_as("a"), adaptive=True)
+    for _ in range(ADAPT_PERIOD * 2):
+        assert(m("s") == {"a": "s"})
+    assert(m(5) == {"a": 5})
+    assert(m(2.5) is False)
+
+
+def test_pickle():
+    m = cPickle.loads(cPickle.dumps(compile({"a": int, "b": str}, adaptive=True)))
+    assert(m.adaptive)
+    assert(m({"a": 1, "b": "c"}) is True)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        compile(int, backend="source", adaptive=True)
+    assert(w([w([int]).times(0, inf)]).compile(adaptive=True)([1, 2]) is True)
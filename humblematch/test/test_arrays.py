@@ -0,0 +1,126 @@
+from humblematch import w, Any, OR, inf, compile, arrays
+from numbers import Real, Integral
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+
+list_pattern = [
+    w([float]).times(0, inf),
+    w([int]).times(0, inf),
+    w([int]).times(3),
+    w([int]).times(4),
+    w([Real]).times(1, inf),
+    w([Integral]).times(0, 5),
+    w([Any]).times(0, inf),
+    w([bool]).times(0, inf),
+    w([OR(int, float)]).times(0, inf),
+    w([OR(0, 1)]).times(0, inf),
+    w([OR(0, 1, "a", None)]).times(0, inf),
+    w([OR(True, "b")]).times(0, inf),
+    w([OR(str, 2.5)]).times(0, inf),
+    w([0]).times(0, inf),
+    w([1.0]).times(1, inf),
+    w(["a"]).times(0, inf),
+    w([u"a"]).times(0, inf),
+    w([OR("a", u"b")]).times(0, inf),
+    w([OR(int, "a")]).times(0, inf),
+    w([int, float]).times(0, inf),
+    w([float, float, float]).times(1, inf),
+    w([str]).times(0, inf),
+    w([[float, float]]).times(0, inf),
+    w([[float, int]]).times(0, inf),
+    w([[float, w([float]).times(0, inf)]]).times(0, inf),
+    w([[w([int]).times(1, inf), 0]]).times(0, inf),
+    w([[float, float, float]]).times(0, inf),
+    w([[[float]]]).times(0, inf),
+    w([w(int).save_as("a")]).times(0, inf),
+    w([{"a": int}]).times(0, inf),
+]
+
+list_array = [
+    numpy.arange(6.0),
+    numpy.zeros(6),
+    numpy.arange(3),
+    numpy.zeros(3, dtype=numpy.int32),
+    numpy.array([0, 1, 1, 0]),
+    numpy.array([0.0, float("nan")]),
+    numpy.array([True, False]),
+    numpy.array([2.5, 2.5]),
+    numpy.array(["a", "b"]),
+    numpy.array(["a", "a"]),
+    numpy.array([u"a", u"a"]),
+    numpy.array([u"a", u"b"]),
+    numpy.array([], dtype=float),
+    numpy.zeros((3, 2)),
+    numpy.zeros((3, 3)),
+    numpy.zeros((2, 1, 1)),
+    numpy.zeros((0, 2)),
+    numpy.array([[1, 0], [2, 0]]),
+    numpy.array([1, "a", None], dtype=object),
+]
+
+
+def assert_same(matched, expected):
+    assert(bool(matched) == bool(expected))
+    if isinstance(expected, dict):
+        assert(set(matched) == set(expected))
+        for key in expected:
+            assert(list(matched[key]) == list(expected[key]))
+
+
+def match_elements(pattern, array, monkeypatch):
+    '''
+    Returns w(pattern) == array, matching each element
+    '''
+    monkeypatch.setattr(arrays, "numpy", None)
+    try:
+        return w(pattern) == array
+    finally:
+        monkeypatch.undo()
+
+
+@pytest.mark.parametrize("multiobj", list_pattern)
+def test_same_as_elements(multiobj, monkeypatch):
+    for array in list_array:
+        # as part of a list, where it gets a slice of the array
+        for pattern in (multiobj, [multiobj], [Any, multiobj, Any]):
+            try:
+                expected = match_elements(pattern, array, monkeypatch)
+            except ValueError:
+                # like comparing values with rows of a 2d array
+                continue
+            assert_same(w(pattern) == array, expected)
+            if pattern is not multiobj:
+                assert_same(compile(pattern)(array), expected)
+                assert_same(compile(pattern, backend="source")(array), expected)
+
+
+def test_saved_views():
+    array = numpy.arange(6.0)
+    pattern = w([w(float).save_as("x"), w(float).save_as("y")]).times(0, inf).save_as("all")
+    for matched in (pattern == array, compile([pattern])(array), compile([pattern], backend="source")(array)):
+        assert(matched["all"] is array or matched["all"].base is array)
+        assert(matched["y"].base is array)
+        assert(list(matched["x"]) == [0.0, 2.0, 4.0])
+        assert(list(matched["y"]) == [1.0, 3.0, 5.0])
+    # same key twice is saved as a list, like without NumPy
+    pattern = w([w(float).save_as("x"), w(float).save_as("x")]).times(0, inf)
+    assert((pattern == array)["x"] == range(6))
+
+
+def test_elements_not_matched():
+    class CountingFloat(object):
+        count = 0
+
+        class __metaclass__(type):
+            def __instancecheck__(self, instance):
+                CountingFloat.count += 1
+                return isinstance(instance, float)
+
+    pattern = w([OR(float, int)]).times(0, inf)
+    assert(pattern == numpy.zeros(10 ** 5))
+    assert(compile([pattern])(numpy.zeros(10 ** 5)))
+    # classes with their own isinstance are asked for each element
+    assert(w([CountingFloat]).times(0, inf) == numpy.zeros(10))
+    assert(CountingFloat.count == 10)
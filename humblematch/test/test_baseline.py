@@ -0,0 +1,23 @@
+from humblematch.bench.baseline import LIST_PAIR, overhead_ratio
+import os
+import pytest
+
+# ceilings of time of patterns over time of hand-written checks, about
+# 2.5 times what they are now, so that only real regressions fail
+MAX_OVERHEAD = {
+    "w": float(os.environ.get("HUMBLEMATCH_MAX_OVERHEAD_W", 100)),
+    "compiled": float(os.environ.get("HUMBLEMATCH_MAX_OVERHEAD_COMPILED", 35)),
+}
+
+
+@pytest.mark.parametrize("mode", sorted(MAX_OVERHEAD))
+@pytest.mark.parametrize("pair", LIST_PAIR, ids=[pair.name for pair in LIST_PAIR])
+def test_overhead(pair, mode):
+    ratio = overhead_ratio(pair, mode, number=300)
+    assert ratio <= MAX_OVERHEAD[mode], "{0} {1} takes {2:.1f}x the hand-written check, more than {3}x".format(
+        pair.name, mode, ratio, MAX_OVERHEAD[mode])
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        overhead_ratio(LIST_PAIR[0], "source")
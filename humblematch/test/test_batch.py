@@ -0,0 +1,81 @@
+from humblematch import w, inf, OR, Any, StringTypes, compile, match_many
+import cPickle
+import pickle
+import pytest
+
+from test_matcher import list_pattern_other
+
+
+pattern = w({"id": w(int).save_as("id"), "tags": [w([str]).times(0, inf)]})
+list_record = [{"id": index, "tags": ["a"] * (index % 3)} if index % 5 else {"id": str(index), "tags": []}
+               for index in range(1000)]
+
+
+@pytest.mark.parametrize("workers", [None, 1, 4])
+@pytest.mark.parametrize("chunksize", [1, 7, 256, 5000])
+def test_same_as_per_item(workers, chunksize):
+    list_expected = [(pattern == record) or False for record in list_record]
+    assert(pattern.match_many(list_record, workers=workers, chunksize=chunksize) == list_expected)
+
+
+def test_generator():
+    # iterable is read lazily, chunk by chunk
+    assert(match_many(pattern, iter(list_record), workers=3, chunksize=10) == match_many(pattern, list_record))
+    assert(match_many(pattern, (record for record in []), workers=3) == [])
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_pattern_other)
+def test_patterns(pattern, other):
+    assert(match_many(pattern, [other, other], chunksize=1) == [compile(pattern)(other)] * 2)
+
+
+def test_matcher():
+    m = compile([int, str], backend="source")
+    assert(m.match_many([[1, "a"], [1, 2]]) == [True, False])
+    assert(match_many(m, [[1, "a"]], workers=2) == [True])
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        match_many(int, [1], chunksize=0)
+    with pytest.raises(ValueError):
+        match_many(int, [1], workers=0)
+
+    def bad_records():
+        yield 1
+        raise KeyError("read failed")
+    with pytest.raises(KeyError):
+        match_many(int, bad_records(), workers=2, chunksize=1)
+
+
+def test_failed_only():
+    list_failed = [index for (index, record) in enumerate(list_record) if not (pattern == record)]
+    assert(pattern.match_many(list_record, chunksize=7, failed_only=True) == list_failed)
+    assert(pattern.match_many(list_record, workers=3, chunksize=7, failed_only=True) == list_failed)
+
+
+def test_process():
+    list_expected = [(pattern == record) or False for record in list_record]
+    assert(pattern.match_many(iter(list_record), workers=2, chunksize=50, executor="process") == list_expected)
+
+    or_pattern = w([OR(int, None), StringTypes, Any, OR("get", "post").save_as("method")])
+    list_other = [[1, "a", 2, "get"], [None, u"b", [], "post"], [2.5, "a", 2, "get"], [1, "a", 2, "put"]]
+    m = compile(or_pattern, backend="source")
+    assert(m.match_many(list_other, workers=2, chunksize=1, executor="process") ==
+           [{"method": "get"}, {"method": "post"}, False, False])
+    assert(m.match_many(list_other, workers=2, executor="process", failed_only=True) == [2, 3])
+
+    with pytest.raises(ValueError):
+        match_many(int, [1], executor="fiber")
+
+
+def test_pickle_or():
+    for protocol in range(cPickle.HIGHEST_PROTOCOL + 1):
+        for matcher in (OR(int, 5), OR([str, None]), StringTypes, Any):
+            assert(cPickle.loads(cPickle.dumps(matcher, protocol)) is matcher)
+            assert(pickle.loads(pickle.dumps(matcher, protocol)) is matcher)
+
+    # unhashable values arent cached, so a new class is made
+    matcher = cPickle.loads(cPickle.dumps(OR([1, 2], int)))
+    assert(isinstance([1, 2], matcher) and isinstance(3, matcher))
+    assert(not isinstance([1], matcher))
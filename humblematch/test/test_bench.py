@@ -0,0 +1,63 @@
+from humblematch.bench.suite import main, run_suite, compare_results, list_case, time_func
+from StringIO import StringIO
+import json
+import pytest
+
+
+def test_cases():
+    list_name = [bench_case.name for bench_case in list_case()]
+    assert(len(set(list_name)) == len(list_name))
+    assert("times_10000000/compiled" in list_name)
+    assert("times_10000000/w" not in list_name)
+    for bench_case in list_case():
+        if "10000000" not in bench_case.name:
+            # checks that pattern matches
+            func = bench_case.make()
+            assert(func())
+
+
+def test_time_func():
+    (seconds, number) = time_func(lambda: None, min_run_seconds=0.001, repeat=2)
+    assert(seconds > 0)
+    assert(number >= 1)
+
+
+def test_run(tmpdir):
+    out = StringIO()
+    result = run_suite("scalar_type", min_run_seconds=0.001, repeat=1, out=out)
+    assert(sorted(result["results"]) == ["scalar_type/compiled", "scalar_type/w"])
+    assert(len(out.getvalue().splitlines()) == 3)
+
+    path = str(tmpdir.join("result.json"))
+    assert(main(["-k", "tutorial", "--min-time", "0.001", "--repeat", "1", "-o", path], StringIO()) == 0)
+    with open(path) as result_file:
+        result = json.load(result_file)
+    assert(sorted(result["results"]) == ["tutorial_diff_list/w", "tutorial_point/w"])
+    assert(set(result["results"]["tutorial_point/w"]) == set(["seconds", "number", "repeat"]))
+
+
+def result_of(**dict_seconds):
+    return {"results": dict((name, {"seconds": seconds}) for (name, seconds) in dict_seconds.items())}
+
+
+def test_compare(tmpdir):
+    old_result = result_of(a=1.0, b=1.0, c=1.0, d=1.0)
+    new_result = result_of(a=1.05, b=1.2, c=0.5, e=1.0)
+    list_row = compare_results(old_result, new_result, threshold=0.1)
+    assert([(row.name, row.status) for row in list_row] ==
+           [("a", "same"), ("b", "slower"), ("c", "faster"), ("d", "missing"), ("e", "missing")])
+    assert(list_row[1].ratio == 1.2)
+    assert([row.status for row in compare_results(old_result, new_result, threshold=0.5)][:3] ==
+           ["same", "same", "faster"])
+    with pytest.raises(ValueError):
+        compare_results(old_result, new_result, threshold=-1)
+
+    (old_path, new_path) = (str(tmpdir.join("old.json")), str(tmpdir.join("new.json")))
+    for (path, result) in ((old_path, old_result), (new_path, new_result)):
+        with open(path, "w") as result_file:
+            json.dump(result, result_file)
+    out = StringIO()
+    assert(main(["compare", old_path, new_path], out) == 1)
+    assert("slower" in out.getvalue())
+    assert(main(["compare", old_path, new_path, "--threshold", "0.5"], StringIO()) == 0)
+    assert(main(["compare", old_path, str(tmpdir.join("none.json"))], StringIO()) == 2)
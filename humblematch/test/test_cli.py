@@ -0,0 +1,84 @@
+from humblematch.cli import main, load_pattern, iter_tasks
+from humblematch import Matcher
+from StringIO import StringIO
+import json
+import pytest
+
+PATTERN_MODULE = '''
+from humblematch import w, OR, inf, compile
+PATTERN = w({"id": int, "tags": [w([OR(str, unicode)]).times(0, inf)]})
+MATCHER = compile({"id": int})
+'''
+
+
+@pytest.fixture
+def data_dir(tmpdir, monkeypatch):
+    tmpdir.join("cli_patterns.py").write(PATTERN_MODULE)
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    list_line = []
+    for index in range(1000):
+        record = {"id": index, "tags": ["a"]} if index % 100 != 7 else {"id": str(index), "tags": []}
+        list_line.append(json.dumps(record))
+    list_line[500] = "{not json"
+    list_line[600] = ""
+    tmpdir.join("a.ndjson").write("\n".join(list_line) + "\n")
+    tmpdir.join("b.json").write(json.dumps([{"id": 1, "tags": []}, {"id": 2, "tags": [3]}]))
+    return tmpdir
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_validate(data_dir, workers):
+    out = StringIO()
+    status = main(["validate", "--pattern", "cli_patterns:PATTERN", "-j", workers, "-k", "3", "--block-size", "100",
+                   str(data_dir.join("a.ndjson")), str(data_dir.join("b.json"))], out)
+    assert(status == 1)
+    list_out_line = out.getvalue().splitlines()
+    # one line is empty
+    assert(list_out_line[0].startswith("1001 records, 12 failed, "))
+    assert(list_out_line[1:] == ["{0} line 8: doesnt match".format(data_dir.join("a.ndjson")),
+                                 "{0} line 108: doesnt match".format(data_dir.join("a.ndjson")),
+                                 "{0} line 208: doesnt match".format(data_dir.join("a.ndjson"))])
+
+    out = StringIO()
+    main(["validate", "--pattern", "cli_patterns:PATTERN", "-j", workers, "-k", "20",
+          str(data_dir.join("a.ndjson")), str(data_dir.join("b.json"))], out)
+    list_out_line = out.getvalue().splitlines()
+    assert(len(list_out_line) == 13)
+    assert(list_out_line[6].endswith("line 501: invalid JSON: Expecting property name: line 1 column 2 (char 1)"))
+    # records of a JSON array are numbered from 1, like lines
+    assert(list_out_line[-1] == "{0} record 2: doesnt match".format(data_dir.join("b.json")))
+
+
+def test_passes(data_dir):
+    out = StringIO()
+    status = main(["validate", "--pattern", "cli_patterns:MATCHER", "-j", "1", str(data_dir.join("b.json"))], out)
+    assert(status == 0)
+    assert(out.getvalue().startswith("2 records, 0 failed, "))
+
+
+def test_errors(data_dir):
+    assert(main(["validate", "--pattern", "cli_patterns:MISSING", str(data_dir.join("b.json"))]) == 2)
+    assert(main(["validate", "--pattern", "cli_patterns", str(data_dir.join("b.json"))]) == 2)
+    assert(main(["validate", "--pattern", "cli_patterns:PATTERN", "-j", "1", str(data_dir.join("c.json"))]) == 2)
+    with pytest.raises(SystemExit):
+        main(["validate", str(data_dir.join("b.json"))])
+
+
+def test_load_pattern(data_dir):
+    assert(isinstance(load_pattern("cli_patterns:PATTERN"), Matcher))
+    matcher = load_pattern("cli_patterns:MATCHER")
+    assert(matcher is load_pattern("cli_patterns:MATCHER"))
+
+
+def test_blocks(data_dir):
+    # blocks end at line breaks, and know the line they start at
+    list_task = list(iter_tasks([str(data_dir.join("a.ndjson"))], "auto", 1000))
+    assert(len(list_task) > 10)
+    line_number = 1
+    for (_, format_name, task_line_number, block) in list_task:
+        assert(format_name == "ndjson")
+        assert(task_line_number == line_number)
+        assert(block.endswith("\n"))
+        line_number += block.count("\n")
+    assert(line_number == 1001)
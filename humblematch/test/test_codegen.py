@@ -0,0 +1,80 @@
+from humblematch import w, inf, compile, WrapObj, WrapMultiObj, Matcher
+import humblematch.wrap_obj
+import doctest
+import pytest
+
+import test_wrap_obj
+from test_matcher import list_pattern_other
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_pattern_other)
+def test_same_as_closure(pattern, other):
+    assert(compile(pattern, backend="source")(other) == compile(pattern)(other))
+
+
+@pytest.mark.parametrize(("pattern", "other"), [
+    ({}, {}), ({}, {"a": 1}), ({}, [1]), ([{}], [{"a": 1}]), ([{}], [5]), ({"a": {}}, {"a": {}}), ({"a": {}}, {"a": 1}),
+    (w({}).as_obj(), object()),
+])
+def test_empty_dict(pattern, other):
+    assert(compile(pattern, backend="source")(other) == compile(pattern)(other))
+
+
+@pytest.fixture
+def source_backend(monkeypatch):
+    # make every == and != go through the generated source
+    def eq_source(self, other):
+        return Matcher(self, backend="source")(other)
+
+    def eq_multi_source(self, other):
+        return Matcher([self], backend="source")(other)
+
+    monkeypatch.setattr(WrapObj, "__eq__", eq_source)
+    monkeypatch.setattr(WrapMultiObj, "__eq__", eq_multi_source)
+
+
+list_wrap_obj_tests = sorted(name for name in dir(test_wrap_obj) if name.startswith("test_"))
+
+
+@pytest.mark.parametrize("test_name", list_wrap_obj_tests)
+def test_wrap_obj_suite(source_backend, test_name):
+    getattr(test_wrap_obj, test_name)()
+
+
+class ModuleNameChecker(doctest.OutputChecker):
+    # doctests in wrap_obj are written for running it as a script
+    def check_output(self, want, got, optionflags):
+        got = got.replace("humblematch.wrap_obj.", "wrap_obj.")
+        return doctest.OutputChecker.check_output(self, want, got, optionflags)
+
+
+def test_wrap_obj_doctests(source_backend):
+    runner = doctest.DocTestRunner(checker=ModuleNameChecker(), verbose=False)
+    for test in doctest.DocTestFinder().find(humblematch.wrap_obj):
+        runner.run(test)
+    (failed, attempted) = runner.summarize(verbose=False)
+    assert(attempted > 0)
+    assert(failed == 0)
+
+
+def test_source():
+    m = w([int, w(float).save_as("a")]).compile(backend="source")
+    assert(m.backend == "source")
+    assert("def match(" in m.source)
+    assert("isinstance(x1, int)" in m.source)
+    assert(compile([int]).source is None)
+
+    with pytest.raises(ValueError):
+        compile([int], backend="bytecode")
+
+
+def test_deep_nesting():
+    pattern = 5
+    other = 5
+    for _ in range(60):
+        pattern = {"a": [w([pattern]).times(1, inf)]}
+        other = {"a": [other]}
+    m = compile(pattern, backend="source")
+    assert(m(other) is True)
+    assert(m({"a": [[{"a": 5}]]}) is False)
+    assert("def match0(" in m.source)
@@ -0,0 +1,125 @@
+from humblematch import w, Any, OR, inf, match_columns, ColumnsResult, match_rows, match_many, StringTypes
+from collections import defaultdict
+from numbers import Number
+import pytest
+
+
+def rows_of(columns):
+    if isinstance(columns, dict):
+        keys = list(columns)
+        row_count = len(columns[keys[0]]) if keys else 0
+        return [dict((key, columns[key][row_index]) for key in keys) for row_index in range(row_count)]
+    return [dict((key, record[key]) for key in columns.dtype.names) for record in columns]
+
+
+def assert_same_as_rows(pattern, columns):
+    '''
+    match_columns should fail the same rows as matching each row as a dict
+    '''
+    row_pattern = pattern.data[0] if hasattr(pattern, "repeat_allowed_range") else pattern
+    list_row = rows_of(columns)
+    result = match_columns(pattern, columns)
+    assert(result.row_count == len(list_row))
+    assert(result.failed_rows == [row_index for (row_index, row) in enumerate(list_row)
+                                  if not (w(row_pattern) == row)])
+    if hasattr(pattern, "repeat_allowed_range"):
+        assert(bool(result) == bool(pattern == list_row))
+    return result
+
+
+list_pattern = [
+    {"id": int, "tag": str},
+    {"id": int, "tag": OR(str, None)},
+    {"id": OR(1, 3), "tag": Any},
+    {"id": 2},
+    {"id": int, "tag": u"a"},
+    {"id": int, "tag": OR("a", u"b")},
+    {"id": int, "missing": int},
+    {"tag": [str]},
+    w([{"id": int}]).times(0, inf),
+    w([{"id": int}]).times(0, 2),
+]
+
+
+@pytest.mark.parametrize("pattern", list_pattern)
+def test_lists(pattern):
+    for columns in ({"id": [1, 2, 3], "tag": ["a", None, "c"]},
+                    {"id": [1, "2", 3.0], "tag": [["a"], [1], "b"]},
+                    {"id": [], "tag": []}):
+        assert_same_as_rows(pattern, columns)
+
+
+@pytest.mark.parametrize("pattern", list_pattern)
+def test_numpy(pattern):
+    numpy = pytest.importorskip("numpy")
+    for columns in (numpy.array([(1, "a"), (2, "b"), (3, "c")], dtype=[("id", int), ("tag", "S1")]),
+                    numpy.array([(1.0, 0), (2.0, 1)], dtype=[("id", float), ("tag", int)]),
+                    {"id": numpy.arange(5), "tag": numpy.array(["a", "b", "c", "d", "e"])},
+                    {"id": numpy.arange(3), "tag": numpy.array([u"a", u"b", u"c"])},
+                    {"id": numpy.arange(5), "tag": numpy.array([1, "b", None, "d", 2.5], dtype=object)}):
+        assert_same_as_rows(pattern, columns)
+
+
+def test_saved():
+    result = match_columns(w([{"id": w(int).save_as("id"), "tag": {"t": w(str).save_as("t")}}]).times(0, inf),
+                           {"id": [1, 2], "tag": [{"t": "a"}, {"t": "b"}]})
+    assert(isinstance(result, ColumnsResult))
+    assert(result.saved == {"id": [1, 2], "t": ["a", "b"]})
+    assert(match_columns({"id": w(int).save_as("id")}, {"id": [1, "2"]}).saved is None)
+
+    numpy = pytest.importorskip("numpy")
+    columns = numpy.array([(1, 2.5), (2, 3.5)], dtype=[("id", int), ("x", float)])
+    result = w([{"id": w(int).save_as("id")}]).times(1, inf).save_as("rows").match_columns(columns)
+    assert(result.saved["rows"] is columns)
+    assert(list(result.saved["id"]) == [1, 2])
+    assert(result.saved["id"].base is columns)
+
+
+def test_errors():
+    with pytest.raises(TypeError):
+        match_columns([int], {"a": []})
+    with pytest.raises(TypeError):
+        match_columns(w([{"a": int}, {"b": int}]).times(0, inf), {"a": []})
+    with pytest.raises(TypeError):
+        match_columns({"a": int}, [{"a": 1}])
+    with pytest.raises(ValueError):
+        match_columns({"a": int}, {"a": [1], "b": []})
+
+
+class Proxy(object):
+
+    '''
+    isinstance of it follows __class__ of the wrapped value
+    '''
+
+    def __init__(self, value):
+        self.value = value
+
+    @property
+    def __class__(self):
+        return self.value.__class__
+
+
+list_row_pattern = [
+    {"a": int, "b": OR(str, None)},
+    {"a": Number, "b": Any},
+    {"a": w(int).save_as("a"), "b": {"c": w(StringTypes).save_as("c")}},
+    {"a": OR(1, 2.0, "x")},
+    {"b": [w([int]).times(0, inf)]},
+    w({"a": int}),
+    w({"a": int}).save_as("row"),
+    w([{"a": int}]).times(0, inf),
+    [int],
+]
+
+list_row = [{"a": 1, "b": "x"}, {"a": 2, "b": None}, {"a": "3", "b": 5}, {"b": "y"},
+            {"a": True, "b": {"c": u"z"}}, {"a": 2.0, "b": {"c": 1}}, {"a": Proxy(5), "b": [1, 2]},
+            defaultdict(int, b={"c": "q"})]
+
+
+@pytest.mark.parametrize("pattern", list_row_pattern)
+def test_rows_same_as_match_many(pattern):
+    for rows in (list_row, list_row[:4], [], list_row + [[1]]):
+        assert(match_rows(pattern, rows) == match_many(pattern, rows))
+        assert(match_rows(pattern, iter(rows), failed_only=True) == match_many(pattern, rows, failed_only=True))
+        assert(match_many(pattern, rows, executor="columns") == match_many(pattern, rows))
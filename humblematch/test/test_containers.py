@@ -0,0 +1,106 @@
+from humblematch import w, Any, OR, inf, compile, arrays
+from array import array
+from numbers import Real
+import pytest
+
+
+list_pattern = [
+    w([int]).times(0, inf),
+    w([int]).times(3),
+    w([long]).times(0, inf),
+    w([float]).times(0, inf),
+    w([Real]).times(1, inf),
+    w([str]).times(0, inf),
+    w([unicode]).times(0, inf),
+    w([Any]).times(0, 3),
+    w([OR(int, str)]).times(0, inf),
+    w([OR(0, 1)]).times(0, inf),
+    w([OR(0, 1.0, 2, 256, "a", None)]).times(0, inf),
+    w([OR("a", u"b", u"\xe9", "bc")]).times(0, inf),
+    w([OR(0.5, 1.5, True)]).times(0, inf),
+    w([0]).times(0, inf),
+    w(["a"]).times(0, inf),
+    w([int, 1]).times(0, inf),
+    w([int, OR(1, 3)]).times(0, inf),
+    w([OR(0, 2), int]).times(1, inf),
+    w([w(int).save_as("a"), w(int).save_as("b")]).times(0, inf).save_as("c"),
+    w([w(str).save_as("a")]).times(0, inf),
+    w([w("a").save_as("a")]).times(0, inf),
+    w([w(OR("a", "b")).save_as("a")]).times(0, inf),
+    w([w(OR(0, 2)).save_as("a"), int]).times(0, inf),
+    w([[str]]).times(0, inf),
+    w([{"a": int}]).times(0, inf),
+]
+
+list_other = [
+    xrange(0),
+    xrange(3),
+    xrange(0, 8, 2),
+    xrange(5, 0, -1),
+    bytearray(b"\x00\x01\x00\x01"),
+    bytearray(b"ab"),
+    "aaa",
+    "abc",
+    u"ab\xe9",
+    array("b", [0, 1, 1]),
+    array("L", [0, 1]),
+    array("d", [0.5, 1.5, 1.0, 3.0]),
+    array("f", [0.5, 1.0]),
+    array("c", "ab"),
+    array("u", u"b\xe9"),
+]
+
+
+def match_elements(pattern, other, monkeypatch):
+    '''
+    Returns w(pattern) == other, matching each element
+    '''
+    monkeypatch.setattr(arrays, "ARRAY_TYPES", ())
+    try:
+        return w(pattern) == other
+    finally:
+        monkeypatch.undo()
+
+
+def comparable(result):
+    '''
+    Returns result with saved xranges (which are equal only to themselves)
+    as lists
+    '''
+    if isinstance(result, dict):
+        return dict((key, list(value) if isinstance(value, xrange) else value) for (key, value) in result.items())
+    return result
+
+
+@pytest.mark.parametrize("multiobj", list_pattern)
+def test_same_as_elements(multiobj, monkeypatch):
+    for other in list_other:
+        # as part of a list, where it gets a slice of other
+        for pattern in (multiobj, [multiobj], [Any, multiobj], [multiobj, Any, Any],
+                        [multiobj, w([Any]).times(0, inf).save_as("rest")]):
+            expected = comparable(match_elements(pattern, other, monkeypatch))
+            assert(comparable(w(pattern) == other) == expected)
+            if pattern is not multiobj:
+                assert(comparable(compile(pattern)(other)) == (expected or False))
+                assert(comparable(compile(pattern, backend="source")(other)) == (expected or False))
+
+
+def test_elements_not_matched():
+    class CountingInt(object):
+        count = 0
+
+        class __metaclass__(type):
+            def __instancecheck__(self, instance):
+                CountingInt.count += 1
+                return isinstance(instance, int)
+
+    assert(w([int]).times(0, inf) == xrange(10 ** 9))
+    assert(w([OR(int, float)]).times(0, 10 ** 9 + 1) == xrange(10 ** 9))
+    assert(not (w([0]).times(0, inf) == xrange(10 ** 9)))
+    # list patterns get an xrange of the part of it
+    for backend in ("closure", "source"):
+        assert(compile([w([int]).times(0, inf)], backend=backend)(xrange(10 ** 9)))
+        assert(compile([0, w([int]).times(0, inf), 10 ** 9 - 1], backend=backend)(xrange(10 ** 9)))
+    # classes with their own isinstance are asked for each element
+    assert(w([CountingInt]).times(0, inf) == bytearray(10))
+    assert(CountingInt.count == 10)
@@ -0,0 +1,91 @@
+from humblematch import w, dispatch
+from humblematch.dispatch import kind_of, find_kind, TypeKindCache, OTHER, MAPPING, LIST, STRING
+from collections import Iterable, Mapping, OrderedDict
+import gc
+
+
+class Proxy(object):
+
+    '''
+    isinstance of it follows __class__ of the wrapped value
+    '''
+
+    def __init__(self, value):
+        self.value = value
+
+    @property
+    def __class__(self):
+        return self.value.__class__
+
+
+class OldStyle:
+    pass
+
+
+class OldStyleList:
+    def __iter__(self):
+        return iter([1])
+
+
+def test_kind_of():
+    for (value, kind) in ((1, OTHER), (None, OTHER), (int, OTHER), ("a", STRING), (u"a", STRING),
+                          ([1], LIST), ((1,), LIST), (set(), LIST), (xrange(2), LIST), (iter([]), LIST),
+                          ({}, MAPPING), (OrderedDict(), MAPPING),
+                          (Proxy([1]), LIST), (Proxy(1), OTHER), (Proxy({}), MAPPING),
+                          (OldStyle(), OTHER), (OldStyleList(), LIST), (OldStyle(), OTHER)):
+        # second time from the cache
+        assert(kind_of(value) == kind)
+        assert(kind_of(value) == kind)
+        assert(find_kind(value) == kind)
+    assert(id(dict) in dispatch.TYPE_KIND.kinds)
+    assert(id(Proxy) not in dispatch.TYPE_KIND.kinds)
+
+
+def test_register():
+    class Later(object):
+        pass
+
+    assert(kind_of(Later()) == OTHER)
+    Iterable.register(Later)
+    assert(kind_of(Later()) == LIST)
+    Mapping.register(Later)
+    assert(kind_of(Later()) == MAPPING)
+
+
+def test_weak_and_bounded():
+    cache = TypeKindCache(max_size=2)
+
+    class Temporary(object):
+        pass
+
+    cache.add(Temporary())
+    assert(len(cache.kinds) == len(cache.refs) == 1)
+    del Temporary
+    gc.collect()
+    assert(len(cache.kinds) == len(cache.refs) == 0)
+
+    for value in (1, "a", [1], {}):
+        cache.add(value)
+    assert(len(cache.kinds) == 2)
+
+
+def test_match():
+    class Later(object):
+        def __init__(self, value):
+            self.value = value
+
+        def __iter__(self):
+            return iter(self.value)
+
+        def __len__(self):
+            return len(self.value)
+
+        def __getitem__(self, index):
+            return self.value[index]
+
+    assert(w([int]) == [1])
+    assert(not (w([int]) == Proxy(1)))
+    assert(not (w({"a": int}) == Proxy(1)))
+    assert(not (w([str]).times(1, 2) == 1))
+    assert(w([str]).times(1, 2) == "a")
+    assert(w([int]) == Later([1]))
@@ -0,0 +1,121 @@
+from humblematch import w, inf, compile, Failure
+from humblematch.explain import MISSING
+from humblematch.profiler import short_repr
+from test_matcher import list_pattern_other, test_obj
+from array import array
+import pickle
+import threading
+import pytest
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_pattern_other)
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_same_results(pattern, other, adaptive):
+    matcher = compile(pattern, adaptive=adaptive, diagnostics=True)
+    expected = compile(pattern)(other)
+    assert(matcher(other) == expected)
+    failure = matcher.explain(other)
+    assert((failure is None) == bool(expected))
+    if failure is not None:
+        assert(isinstance(failure, Failure))
+        assert(matcher.last_failure() == failure)
+        assert(compile(pattern).explain(other) == failure)
+        assert(str(failure).startswith(failure.format_path() + ": expected "))
+
+
+class Small(object):
+
+    class __metaclass__(type):
+        # own isinstance, so arrays are matched element by element
+        def __instancecheck__(self, instance):
+            return instance < 1000
+
+
+list_pattern_other_failure = [
+    (int, "5", "root", int, "5", "doesnt match"),
+    ([int, str], [1, 2], "root[1]", str, 2, "doesnt match"),
+    ([int, str], [1], "root", [int, str], [1], "length not allowed"),
+    ({"a": {"b": [int, float]}}, {"a": {"b": [1, 2]}}, "root['a']['b'][1]", float, 2, "doesnt match"),
+    ({"a": int, "b": int}, {"a": 1}, "root['b']", int, MISSING, "missing key"),
+    (w({"a": int}).as_obj(), object(), "root.a", int, MISSING, "missing attribute"),
+    (w({"a": str}).as_obj(), test_obj, "root.a", str, 20, "doesnt match"),
+    ([int, w([str]).times(0, inf), float, int], [1, "a", "b", 2.5, "c"], "root[4]", int, "c", "doesnt match"),
+    ([int, w([str]).times(0, inf), float], [1, "a", 3, 2.5], "root[2]", str, 3, "doesnt match"),
+    ([w([int, str]).times(0, inf)], [1, "a", 2, 3], "root[3]", str, 3, "doesnt match"),
+    ([w([{"a": int}]).times(0, inf)], [{"a": 1}, {"a": "2"}], "root[1]['a']", int, "2", "doesnt match"),
+    ({"a": [w([int]).times(2, 3)]}, {"a": [1]}, "root['a']", [w([int]).times(2, 3)], [1], "length not allowed"),
+    ({"a": [w([int]).times(0, inf)]}, {"a": 5}, "root['a']", [w([int]).times(0, inf)], 5, "doesnt match"),
+    ([int, w([str]).times(0, inf), w([int]).times(1, inf)], [1, "a", "b"], "root",
+     None, [1, "a", "b"], "no split of the list matches"),
+    (w(5, True), 5.0, "root", 5, 5.0, "not the same type"),
+    ({"a": [w([int]).times(0, inf)]}, {"a": array("d", [1.5])}, "root['a'][0:]", None, array("d", [1.5]),
+     "doesnt match"),
+    # elements made again each time they are read
+    ([w([Small]).times(0, inf)], xrange(998, 1003), "root[2]", Small, 1000, "doesnt match"),
+    ({"a": [int, w([Small]).times(0, inf)]}, {"a": array("l", [5, 6, 2000])}, "root['a'][2]", Small, 2000,
+     "doesnt match"),
+]
+
+
+@pytest.mark.parametrize(("pattern", "other", "path", "expected", "actual", "reason"), list_pattern_other_failure)
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_failure(pattern, other, path, expected, actual, reason, adaptive):
+    failure = compile(pattern, adaptive=adaptive, diagnostics=True).explain(other)
+    assert(failure.format_path() == path)
+    if expected is not None:
+        assert(short_repr(failure.expected) == short_repr(expected))
+    assert(failure.actual is actual or failure.actual == actual)
+    assert(failure.reason == reason)
+    assert(w(pattern).explain(other) == failure or w(pattern).explain(other).format_path() == path)
+
+
+def test_wrap_explain():
+    assert(w([int]).explain([1]) is None)
+    assert(str(w({"a": [int]}).explain({"a": ["x"]})) == "root['a'][0]: expected int, got 'x' (doesnt match)")
+    multiobj = w([int]).times(1, 3)
+    assert(multiobj.explain([1, 2]) is None)
+    assert(multiobj.explain([1, "2"]).format_path() == "root[1]")
+    assert(multiobj.explain([]).expected is multiobj)
+    assert(multiobj.explain([]).reason == "length not allowed")
+    assert(multiobj.explain(5).expected is multiobj)
+
+
+def test_state():
+    matcher = compile({"a": int, "b": [w([int]).times(0, 2), w([str]).times(0, 2), 1]}, diagnostics=True)
+    assert(matcher.last_failure() is None)
+    # repeats ending at elements which dont match leave nothing behind
+    assert(matcher({"a": 1, "b": [1, "a", 1]}))
+    assert(matcher.last_failure() is None)
+    assert(not matcher({"a": "1", "b": []}))
+    assert(matcher.last_failure().format_path() == "root['a']")
+
+    class Bad(object):
+        def __eq__(self, other):
+            raise RuntimeError("bad")
+
+    bad_matcher = compile({"a": [int, Bad()]}, diagnostics=True)
+    with pytest.raises(RuntimeError):
+        bad_matcher({"a": [1, 2]})
+    assert(str(bad_matcher.explain({"a": [1]})) == "root['a']: expected [int, ...], got [1] (length not allowed)")
+
+    list_failure = []
+
+    def other_thread():
+        list_failure.append(matcher.last_failure())
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+    assert(list_failure == [None])
+
+
+def test_options():
+    with pytest.raises(ValueError):
+        compile(int, backend="source", diagnostics=True)
+    matcher = pickle.loads(pickle.dumps(compile([int], diagnostics=True)))
+    assert(matcher.diagnostics)
+    assert(w([int]).compile(diagnostics=True).diagnostics)
+    assert(not matcher(["a"]))
+    assert(matcher.last_failure().format_path() == "root[0]")
+    source_matcher = compile([int], backend="source")
+    assert(source_matcher.explain(["a"]).format_path() == "root[0]")
@@ -0,0 +1,100 @@
+from humblematch import w, Any, OR, inf, compile, Matcher
+import pytest
+
+
+class object2(object):
+    pass
+
+test_obj = object2()
+test_obj.a = 20
+
+
+list_pattern_other = [
+    (5, 5),
+    (5.0, 5),
+    ("hello", "hello"),
+    ("5", 5),
+    (10, [10]),
+    (int, 5),
+    (int, int),
+    (int, 2.33),
+    (float, float("inf")),
+    (Any, [[1]]),
+    (Any, Any),
+    ([1, 2], (1, 2)),
+    ([1, 2], [1]),
+    ([1, 2], [1, 2, 3]),
+    ([5], 5),
+    ([1], "a"),
+    ([int, 50, int], [200, 50, 201]),
+    ([list, 50], [200, 50]),
+    ({"a": int}, {"a": 20, "b": 25.25}),
+    ({"a": int, "q": list}, {"a": 20, "b": [2]}),
+    ({"a": int, "b": [w([int]).times(3)]}, {"a": 20, "b": [25, 3, 67]}),
+    ({"a": int, "b": [w([int]).times(3)]}, {"a": 20, "b": [25, 67]}),
+    ({"a": int, "b": {"f": float}}, {"a": 20, "b": {"f": 25.25}}),
+    ({"a": int}, [1]),
+    (w({"a": int}).as_obj(), test_obj),
+    (w({"a": int}).as_obj(), {"a": 20}),
+    (w({"a": int, "b": Any}).as_obj(), test_obj),
+    (w(5, True), 5.0),
+    (w([OR(int, 2.35).times(2, 5)]), [9, 2.35, 9, 9]),
+    (w([OR(int, 2.35).times(2, 5)]), [9, 2.35, 9, 9, 9]),
+    (w([OR(int, 2.35).times(2, 5)]), [9]),
+    (w([Any.times(2, 5)]), [9, 2.35, 6, "io", "asd"]),
+    (w([1, w([int, str]).times(0, inf), 2]), [1, 5, "a", 6, "b", 2]),
+    (w([1, w([int, str]).times(0, inf), 2]), [1, 5, "a", 6, 2]),
+    (w([int, Any.times(0, inf), int]), [5]),
+    (w([int]).times(2, 4), [[2, 56, 7]]),
+    (w(int).save_as("a"), 5),
+    (w("a").save_as("k"), "a"),
+    ([int, w(float).save_as("a")], [5, 10.23]),
+    ([{"what": w(int).save_as("a")}, w(float).save_as("a")], [{"what": 5}, 10.23]),
+    ([[int, w(int).save_as("b")], float], [[5, 99], 10.23]),
+    ([w(float).save_as("a"), w([int]).times(0, inf), w(int).save_as("a")], [1.5, 2, 3]),
+    (w([w(int).save_as("a")]).times(2), [[2, 3]]),
+    ([w([int]).times(2).save_as("b")], [5, 12]),
+    ([w([int, w(str).save_as("s")]).times(1, inf).save_as("all")], [1, "a", 2, "b"]),
+    ([1, OR(int).times(0, inf), OR(int).times(0, inf), 5], [1, 6, 6, 6, 6, 5]),
+    ([w(int).save_as("first"), w([str]).times(0, inf).save_as("s"), float,
+      w([w(int).save_as("i")]).times(1, inf)], [1, "a", "b", 2.5, 3, 4]),
+    ([w(int).save_as("first"), w([str]).times(0, inf).save_as("s"), float,
+      w([w(int).save_as("i")]).times(1, inf)], [1, "a", "b", 2.5]),
+    ([w([Any]).times(0, inf), w([w(int).save_as("a"), str]).times(1, 3), w([Any]).times(0, inf)],
+     [1, "x", 2, "y", 3, "z"]),
+]
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_pattern_other)
+def test_same_as_eq(pattern, other):
+    # == of w may give None instead of False
+    assert(compile(pattern)(other) == ((w(pattern) == other) or False))
+    assert(bool(compile(pattern) != other) == bool(w(pattern) != other))
+
+
+def test_returns_False_not_None():
+    # w([1]) == [1, 2] gives None, compiled version is always a bool or dict
+    assert(compile([1])([1, 2]) is False)
+    assert(compile([1, 2])([1]) is False)
+
+
+def test_compile_method():
+    pattern = w([int, w(float).save_as("a")])
+    m = pattern.compile()
+    assert(isinstance(m, Matcher))
+    assert(m.pattern is pattern)
+    assert(m([5, 10.23]) == {"a": 10.23})
+    assert((m == [5, 10.23]) == {"a": 10.23})
+    assert(m != [5, 10])
+
+
+def test_reuse():
+    m = compile({"a": int, "b": [w(str).save_as("s")]})
+    assert(m({"a": 1, "b": ["x"]}) == {"s": "x"})
+    assert(m({"a": 1, "b": ["y"]}) == {"s": "y"})
+    assert(m({"a": 1, "b": [2]}) is False)
+
+
+def test_compile_errors():
+    with pytest.raises(TypeError):
+        compile(w([w([int]).times(2)]).times(2))
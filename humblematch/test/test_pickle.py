@@ -0,0 +1,67 @@
+from humblematch import w, inf, OR, Any, StringTypes, WrapObj, WrapMultiObj, compile
+import cPickle
+import copy
+import pickle
+import pytest
+
+from test_matcher import list_pattern_other
+
+
+def round_trips(pattern):
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        yield pickle.loads(pickle.dumps(pattern, protocol))
+        yield cPickle.loads(cPickle.dumps(pattern, protocol))
+    yield copy.deepcopy(pattern)
+    yield copy.copy(pattern)
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_pattern_other)
+def test_round_trip(pattern, other):
+    expected = compile(pattern)(other)
+    for loaded in round_trips(pattern):
+        assert(compile(loaded)(other) == expected)
+        assert(((w(loaded) == other) or False) == expected)
+
+
+def test_nested():
+    pattern = w({"id": w(int).save_as("id"),
+                 "point": w({"x": OR(int, float), "y": Any}).as_obj(),
+                 "tags": [w([w(StringTypes).save_as("tag")]).times(0, inf).save_as("tags"),
+                          w([OR(None, 0)]).times(1, 3)]})
+
+    class Point(object):
+        x = 1
+        y = 2
+    point = Point()
+    other = {"id": 5, "point": point, "tags": ["a", u"b", None, 0]}
+    expected = {"id": 5, "tag": ["a", u"b"], "tags": ["a", u"b"]}
+    assert((pattern == other) == expected)
+
+    for loaded in round_trips(pattern):
+        assert(isinstance(loaded, WrapObj))
+        assert((loaded == other) == expected)
+        assert(loaded.data["point"].treat_as_object)
+        assert(loaded.data["point"].data["y"] is Any)
+        multi = loaded.data["tags"][0]
+        assert(isinstance(multi, WrapMultiObj))
+        assert(multi.repeat_allowed_range == [0, inf])
+        assert(multi.save_key == "tags")
+        # OR classes come back as the cached ones
+        assert(loaded.data["point"].data["x"] is OR(int, float))
+        assert(loaded.data["tags"][1].data[0] is OR(None, 0))
+
+
+def test_matcher():
+    m = compile([int, w(str).save_as("s")], backend="source")
+    loaded = cPickle.loads(cPickle.dumps(m, cPickle.HIGHEST_PROTOCOL))
+    assert(loaded.backend == "source")
+    assert(loaded.source == m.source)
+    assert(loaded([1, "a"]) == {"s": "a"})
+    assert(copy.deepcopy(m)([1, 2]) is False)
+
+
+def test_compact():
+    # only the data and the options which are set are pickled
+    pickled = cPickle.dumps(w([int, w(str).save_as("s")]), cPickle.HIGHEST_PROTOCOL)
+    assert("DO_TYPECHECK" not in pickled)
+    assert("treat_as_object" not in pickled)
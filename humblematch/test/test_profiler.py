@@ -0,0 +1,104 @@
+from humblematch import w, OR, inf, compile, profiling, profile_stats, reset_profile, get_trace_sink
+from humblematch.profiler import PROFILER
+from StringIO import StringIO
+import pytest
+
+PATTERN = {"id": int, "tag": OR(str, None), "items": [w([{"price": OR(int, float)}]).times(0, inf)]}
+
+LIST_OTHER = [{"id": 1, "tag": "a", "items": [{"price": 1}, {"price": 2.5}]},
+              {"id": 2, "tag": None, "items": []},
+              {"id": "3", "tag": None, "items": []}]
+
+
+def counts_of(pattern):
+    return dict(((node_stat.path, node_stat.label), (node_stat.calls, node_stat.passed, node_stat.failed))
+                for node_stat in profile_stats(pattern))
+
+
+@pytest.mark.parametrize("make", [w, compile, lambda pattern: compile(pattern, backend="source")])
+def test_counts(make):
+    pattern = make(PATTERN)
+    with profiling(reset=True):
+        for other in LIST_OTHER:
+            pattern == other
+    dict_count = counts_of(pattern)
+    assert(dict_count[("root['items'][*]['price']", "OR(int, float)")] == (2, 2, 0))
+    assert(dict_count[("root['items'][*]['price']", "| float")] == (2, 1, 1))
+    assert(dict_count[("root['tag']", "| None")][:2] == (dict_count[("root['tag']", "OR(str, None)")][0], 2))
+    assert(dict_count[("root['items'][*]", "{'price': ...}")] == (2, 2, 0))
+    assert(dict_count[("root", "{'id': ...}")] == (3, 2, 1))
+    # same counts for w(pattern), compiled or the plain pattern
+    assert(counts_of(PATTERN) == counts_of(w(PATTERN)) == counts_of(compile(PATTERN)) == dict_count)
+
+    for node_stat in profile_stats(pattern):
+        if node_stat.label.startswith("|"):
+            assert(node_stat.seconds is None)
+        else:
+            assert(0 <= node_stat.own_seconds <= node_stat.seconds)
+
+
+def test_sequence_counts():
+    pattern = w([int, w([int]).times(0, inf), w([str]).times(1, inf)])
+    with profiling(reset=True):
+        assert(pattern == [1, 2, 3, "x", "y"])
+    dict_count = counts_of(pattern)
+    assert(dict_count[("root[0]", "int")][0] >= 1)
+    assert(dict_count[("root[*]", "str")][1] == 2)
+    assert(not any(path == "root" and label in ("int", "str") for (path, label) in dict_count))
+
+
+def test_patterns_kept_apart():
+    (pattern_1, pattern_2) = (w([int]), w([int]))
+    with profiling(reset=True):
+        pattern_1 == [1]
+        pattern_1 == [2]
+        pattern_2 == ["a"]
+    assert(counts_of(pattern_1) == {("root", "[int]"): (2, 2, 0), ("root[0]", "int"): (2, 2, 0)})
+    assert(counts_of(pattern_2) == {("root", "[int]"): (1, 0, 1), ("root[0]", "int"): (1, 0, 1)})
+    assert(profile_stats(w([str])) == [])
+
+    with profiling():
+        pattern_1 == [3]
+    assert(counts_of(pattern_1)[("root", "[int]")] == (3, 3, 0))
+    reset_profile()
+    assert(profile_stats(pattern_1) == [])
+
+
+def test_off():
+    assert(get_trace_sink() is None)
+    pattern = w([int])
+    with profiling(reset=True) as profiler:
+        assert(get_trace_sink() is profiler is PROFILER)
+    assert(get_trace_sink() is None)
+    pattern == [1]
+    assert(profile_stats(pattern) == [])
+
+
+def test_raises():
+    class Bad(object):
+        def __eq__(self, other):
+            raise RuntimeError("bad")
+
+    pattern = w([int, Bad()])
+    with profiling(reset=True):
+        with pytest.raises(RuntimeError):
+            pattern == [1, 2]
+        pattern == [1]
+    assert(PROFILER.get_stack() == [])
+    assert(counts_of(pattern) == {("root", "[int, ...]"): (1, 0, 1)})
+
+
+def test_report():
+    pattern = w({"a": [w([int]).times(0, inf)]})
+    with profiling(reset=True):
+        pattern == {"a": range(100)}
+    out = StringIO()
+    pattern.profile_report(out)
+    list_line = out.getvalue().splitlines()
+    assert(list_line[0].split() == ["path", "node", "calls", "passed", "failed", "total", "(ms)", "own", "(ms)"])
+    assert(list_line[1].startswith("root "))
+    assert(list_line[-1].split()[:5] == ["root['a'][*]", "int", "100", "100", "0"])
+
+    out = StringIO()
+    pattern.profile_report(out, limit=2)
+    assert(len(out.getvalue().splitlines()) == 3)
@@ -0,0 +1,56 @@
+from humblematch import w, Any, inf, compile
+from humblematch.sequence import Repeat, SequenceMatcher, match_sequence
+
+
+def test_split_is_greedy():
+    pattern = w([w([w(Any).save_as("a")]).times(0, inf), w([w(Any).save_as("b")]).times(0, inf)])
+    assert((pattern == [1, 2, 3]) == {"a": [1, 2, 3]})
+
+    pattern = w([w([w(Any).save_as("a")]).times(0, 3), w([w(Any).save_as("b")]).times(0, inf)])
+    assert((pattern == [1, 2, 3]) == {"a": [1, 2], "b": [3]})
+
+    pattern = w([w([Any]).times(0, inf).save_as("a"), int, w([int]).times(1, inf).save_as("b")])
+    assert((pattern == [1, 2, 3, 4]) == {"a": [1, 2], "b": [4]})
+
+
+def test_unit_of_many_elements():
+    pattern = w([w([int, str]).times(1, inf), w([str, int]).times(1, inf)])
+    assert(pattern == [1, "a", "b", 2])
+    assert(pattern == [1, "a", 2, "b", "c", 3])
+    assert(pattern != [1, "a", 2, "b", "c"])
+    assert(pattern != [1, "a"])
+
+
+def test_repeat_range():
+    pattern = w([w([int]).times(2, 3), w([Any]).times(0, inf)])
+    assert((pattern == [1, 2, "a"]) is True)
+    assert((pattern == [1, "a"]) is False)
+    assert((pattern == [1, 2, 3]) is True)
+
+    pattern = w([w([int]).times(0, 2), w([int]).times(0, 2)])
+    assert((pattern == [1, 2]) is True)
+    assert((pattern == [1, 2, 3]) is False)
+
+
+def test_empty():
+    assert(match_sequence([], []) is True)
+    assert(match_sequence([], [1]) is False)
+    assert(SequenceMatcher([Repeat([lambda x: True], 0, inf)])([]) is True)
+
+
+def test_no_backtracking():
+    # would take exponential time if every split was tried
+    pattern = w([w([Any]).times(0, inf)] * 12 + [1])
+    assert(pattern != [0] * 200)
+    assert(compile(pattern)([0] * 200 + [1]) is True)
+
+
+def test_each_element_matched_once_per_index():
+    count = [0]
+
+    def match_ele(other):
+        count[0] += 1
+        return True
+
+    match_sequence([Repeat([match_ele], 0, inf), Repeat([match_ele], 0, inf)], range(100))
+    assert(count[0] <= 2 * 100)
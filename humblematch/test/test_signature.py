@@ -0,0 +1,228 @@
+from humblematch import w, OR, Any, inf, accepts, set_checks, get_checks, overload, Overload
+import inspect
+import pytest
+
+
+@accepts(x=int, y=OR(int, None))
+def move(x, y=None):
+    return (x, y)
+
+
+@accepts(a=[int, str], rest=[w([float]).times(0, inf)], kw={"k": str})
+def gather(a, b=2, *rest, **kw):
+    return (a, b, rest, kw)
+
+
+class Point(object):
+
+    @accepts(x=OR(int, list), y=OR(int, None))
+    def __init__(self, x, y=None):
+        if y is None:
+            (x, y) = x
+        self.x = x
+        self.y = y
+
+
+def test_accepts():
+    assert(move(1) == (1, None))
+    assert(move(1, 2) == (1, 2))
+    assert(move(y=2, x=1) == (1, 2))
+    assert(gather([1, "a"], 3, 0.5, 1.5, k="b") == ([1, "a"], 3, (0.5, 1.5), {"k": "b"}))
+    assert(gather([1, "a"], k="b") == ([1, "a"], 2, (), {"k": "b"}))
+    point = Point([1, 2])
+    assert((point.x, point.y) == (1, 2))
+    point = Point(3, y=4)
+    assert((point.x, point.y) == (3, 4))
+
+
+@pytest.mark.parametrize(("func", "list_arg", "dict_arg", "message"), [
+    (move, ["1"], {}, "move() argument x: expected int, got '1' (doesnt match)"),
+    (move, [1, 2.5], {}, "move() argument y: expected OR(int, None), got 2.5 (doesnt match)"),
+    (move, [1], {"y": "2"}, "move() argument y: expected OR(int, None), got '2' (doesnt match)"),
+    (gather, [[1, 2]], {"k": "b"}, "gather() argument a[1]: expected str, got 2 (doesnt match)"),
+    (gather, [[1, "a"], 2, 0.5, 1], {"k": "b"}, "gather() argument rest[1]: expected float, got 1 (doesnt match)"),
+    (gather, [[1, "a"]], {}, "gather() argument kw['k']: expected str, got nothing (missing key)"),
+    (Point, ["1"], {}, "__init__() argument x: expected OR(int, list), got '1' (doesnt match)"),
+])
+def test_failed(func, list_arg, dict_arg, message):
+    with pytest.raises(TypeError) as exc_info:
+        func(*list_arg, **dict_arg)
+    assert(str(exc_info.value) == message)
+
+
+def test_same_as_w():
+    list_pattern = [int, OR(int, None)]
+    for (x, y) in [(1, 2), (1, None), (None, 1), (1, "2"), (True, 2.5)]:
+        try:
+            move(x, y)
+            passed = True
+        except TypeError:
+            passed = False
+        assert(passed == bool(w(list_pattern) == [x, y]))
+
+
+def test_signature():
+    assert(move.__name__ == "move")
+    assert(move.__wrapped__.__name__ == "move")
+    assert(inspect.getargspec(gather) == inspect.getargspec(gather.__wrapped__))
+    # still a TypeError from python for wrong arguments
+    with pytest.raises(TypeError):
+        move()
+    with pytest.raises(TypeError):
+        move(1, 2, 3)
+
+    @accepts(_func=int)
+    def same_names(_func, _d0=1, __func=2):
+        return (_func, _d0, __func)
+
+    assert(same_names(5) == (5, 1, 2))
+
+
+def test_bad_pattern_names():
+    with pytest.raises(TypeError):
+        accepts(z=int)(move.__wrapped__)
+
+
+def test_set_checks():
+    assert(get_checks())
+    set_checks(False)
+    try:
+        def move(x):
+            return x
+        assert(accepts(x=int)(move) is move)
+    finally:
+        set_checks(True)
+    assert(accepts(x=int)(move) is not move)
+
+
+def make_dispatcher():
+    @overload(x=int, y=int)
+    def area(x, y):
+        return "ints"
+
+    @area.register(x=[int, int])
+    def area(x):
+        return "list"
+
+    @area.register(x="square", y=int)
+    def area(x, y):
+        return "square"
+
+    @area.register(x=1, y=str)
+    def area(x, y):
+        return "one"
+
+    @area.register(x=None)
+    def area(x, y=None):
+        return "none"
+
+    @area.register(x=OR(float, int), y=Any)
+    def area(x, y=3):
+        return "number"
+
+    @area.register(x=str, rest=[w([float]).times(1, inf)])
+    def area(x, *rest):
+        return "floats"
+
+    @area.register(x=object, kw={})
+    def area(x, **kw):
+        return "object"
+
+    return area
+
+
+class Str(str):
+    pass
+
+
+list_args = [(2, 3), (True, 3), (2.5, 3), ([1, 2],), ([1, "2"],), ("square", 2), (Str("square"), 2),
+             (u"square", 2), ("square", 2.5), (1, "a"), (1.0, "a"), (True, "a"), (None,), (None, None), (2,),
+             (2.5,), ("a",), ("a", 0.5, 1.5), ("a", 0.5, 1), (Str("a"), 0.5), (object(),), (), (1, 2, 3),
+             (float("nan"), 1)]
+
+
+@pytest.mark.parametrize("list_arg", list_args)
+def test_overload_same_as_in_turn(list_arg):
+    area = make_dispatcher()
+    expected = None
+    for implementation in area.list_implementation:
+        (matched, result) = implementation.call_bound(list_arg, {})
+        if matched:
+            expected = result
+            break
+    if expected is None:
+        with pytest.raises(TypeError):
+            area(*list_arg)
+    else:
+        # twice, once building the tree
+        assert(area(*list_arg) == expected)
+        assert(area(*list_arg) == expected)
+
+
+def test_overload():
+    area = make_dispatcher()
+    assert([area(2, 3), area([1, 2]), area("square", 2), area(1, "a"), area(None), area(2.5)] ==
+           ["ints", "list", "square", "one", "none", "number"])
+    assert(area(x=2, y=3) == "ints")
+    assert(area(x=None) == "none")
+    assert(area(2.5, y="b") == "number")
+    assert(area(object(), k=1) == "object")
+    assert(area.__name__ == "area")
+    with pytest.raises(TypeError) as exc_info:
+        area()
+    assert(str(exc_info.value) == "area() has no overload matching ()")
+    with pytest.raises(TypeError) as exc_info:
+        area([1], 2, z=[1, 2])
+    assert(str(exc_info.value) == "area() has no overload matching ([1], 2, z=[1, ...])")
+
+
+def test_overload_method():
+    class Point(object):
+
+        @overload(x=int, y=int)
+        def __init__(self, x, y):
+            (self.x, self.y) = (x, y)
+
+        @__init__.register(x=[int, int])
+        def __init__(self, x):
+            (self.x, self.y) = x
+
+    for point in (Point(1, 2), Point([1, 2]), Point(x=1, y=2)):
+        assert((point.x, point.y) == (1, 2))
+    with pytest.raises(TypeError):
+        Point(1)
+    assert(isinstance(Point.__dict__["__init__"], Overload))
+
+
+def test_overload_register():
+    @overload(x=int)
+    def describe(x):
+        return "int"
+
+    assert(describe(1) == "int")
+    with pytest.raises(TypeError):
+        describe(True and "a")
+
+    @describe.register(x=str)
+    def describe(x):
+        return "str"
+
+    # tree is built again
+    assert(describe("a") == "str")
+    assert(describe(1) == "int")
+
+
+def test_overload_proxy_types():
+    class Proxy(object):
+        def __init__(self, target):
+            self.target = target
+
+        @property
+        def __class__(self):
+            return self.target.__class__
+
+    area = make_dispatcher()
+    # isinstance follows __class__, so the exact type cant decide
+    assert(area(Proxy(2), 3) == "ints")
+    assert(area(Proxy(2.5)) == "number")
+    assert(area(Proxy(2), 3) == "ints")
@@ -0,0 +1,103 @@
+from humblematch import w, inf, Any, OR, compile, match_stream, StreamMatcher, WrapMultiObj
+from itertools import count
+import weakref
+import pytest
+
+from test_matcher import list_pattern_other
+
+
+def can_stream(pattern):
+    data = pattern
+    if isinstance(data, WrapMultiObj):
+        return True
+    if isinstance(data, type(w(1))):
+        if data.DO_TYPECHECK or data.treat_as_object or data.save_key is not None:
+            return False
+        data = data.data
+    return (isinstance(data, (list, tuple)) and
+            sum(isinstance(ele_data, WrapMultiObj) for ele_data in data) <= 1)
+
+
+list_stream_pattern_other = [(pattern, other) for (pattern, other) in list_pattern_other
+                             if can_stream(pattern) and isinstance(other, (list, tuple))]
+list_stream_pattern_other += [
+    ([str, w([w(int).save_as("n")]).times(1, inf).save_as("all"), w(str).save_as("end")], ["a", 1, 2, "b"]),
+    ([str, w([w(int).save_as("n")]).times(1, inf), str], ["a", "b"]),
+    ([str, w([int, str]).times(0, 3), str, str], ["a", 1, "x", 2, "y", "b", "c"]),
+    ([str, w([int, str]).times(0, 3), str, str], ["a", 1, "x", 2, "y", 3, "z", "b", "c"]),
+    ([str, w([int, str]).times(0, 3), str, str], ["a", 1, "x", 2, "b", "c"]),
+    ([str, w([int, str]).times(0, 3), str, str], ["a", "b"]),
+    ([1, 2, 3], [1, 2, 3, 4]),
+    ([1, 2, 3], [1, 2]),
+    ([w([int]).times(2)], []),
+    (w([OR(int, None)]).times(2, 5), [1, None, 3]),
+]
+
+
+@pytest.mark.parametrize(("pattern", "other"), list_stream_pattern_other)
+def test_same_as_list(pattern, other):
+    if isinstance(pattern, WrapMultiObj):
+        expected = (pattern == list(other)) or False
+    else:
+        expected = compile(pattern)(list(other))
+    assert(match_stream(pattern, iter(other)) == expected)
+    assert(match_stream(pattern, other) == expected)
+
+
+def test_not_list():
+    assert(match_stream([int], 5) is False)
+    assert(match_stream([int], {"a": 1}) is False)
+    assert(match_stream([w([str]).times(0, inf)], "ab") == compile([w([str]).times(0, inf)])("ab"))
+
+
+def test_stops_early():
+    list_read = []
+
+    def numbers():
+        for number in count():
+            list_read.append(number)
+            yield number if number != 5 else "5"
+
+    assert(match_stream([w([int]).times(0, inf)], numbers()) is False)
+    assert(len(list_read) == 6)
+
+    del list_read[:]
+    # stops at the 4th element, which would start a 4th repeat
+    assert(w([int]).times(0, 4).match_stream(numbers()) is False)
+    assert(len(list_read) == 4)
+
+    del list_read[:]
+    assert(match_stream([1, 2], numbers()) is False)
+    assert(len(list_read) == 3)
+
+
+class Record(object):
+    pass
+
+
+def test_constant_memory():
+    live_records = weakref.WeakSet()
+    list_live_count = []
+
+    def records():
+        for index in range(2001):
+            record = Record()
+            live_records.add(record)
+            list_live_count.append(len(live_records))
+            yield record
+            del record
+
+    pattern = w([Record, w([Record, Any]).times(0, inf), Record, Record])
+    assert(pattern.match_stream(records()) is True)
+    # header is dropped after being matched, two elements are kept for
+    # the footer, one is being matched and one is just made
+    assert(max(list_live_count) <= 4)
+
+
+def test_errors():
+    for pattern in ([w([int]).times(0, inf), w([str]).times(0, inf)], w([int], True), "abc", {"a": int},
+                    int, w({"a": int}).as_obj()):
+        with pytest.raises(TypeError):
+            StreamMatcher(pattern)
+    with pytest.raises(TypeError):
+        StreamMatcher([w([]).times(0, inf)])
@@ -0,0 +1,78 @@
+from humblematch import w, inf, OR, compile
+import sys
+import threading
+
+# patterns shared between all the threads, like module level patterns
+# used by request handlers
+shared_pattern = w({"id": w(int).save_as("id"),
+                    "tags": [w([w(str).save_as("tag")]).times(0, inf)],
+                    "point": [w(int).save_as("x"), OR(int, float)],
+                    "rest": [w([int]).times(0, inf).save_as("ints"), w([str]).times(0, inf).save_as("strs")]})
+shared_matcher = compile(shared_pattern)
+
+
+def make_record(thread_index, iteration):
+    tag = "t{0}".format(thread_index)
+    return {"id": thread_index * 100000 + iteration,
+            "tags": [tag] * (iteration % 4),
+            "point": [thread_index, 1.5],
+            "rest": [iteration] * (thread_index % 3) + [tag]}
+
+
+def expected_result(record):
+    result = {"id": record["id"],
+              "x": record["point"][0],
+              "ints": record["rest"][:-1],
+              "strs": record["rest"][-1:]}
+    if record["tags"]:
+        result["tag"] = record["tags"]
+    return result
+
+
+def run_threads(match, thread_count=8, iterations=300):
+    list_error = []
+
+    def worker(thread_index):
+        try:
+            for iteration in range(iterations):
+                record = make_record(thread_index, iteration)
+                result = match(record)
+                if result != expected_result(record):
+                    list_error.append((record, result))
+                if match(dict(record, id="x")) is not False:
+                    list_error.append((record, "matched bad id"))
+        except Exception as e:
+            list_error.append(e)
+
+    old_interval = sys.getcheckinterval()
+    # switch threads as often as possible
+    sys.setcheckinterval(1)
+    try:
+        list_thread = [threading.Thread(target=worker, args=(thread_index,)) for thread_index in range(thread_count)]
+        for thread in list_thread:
+            thread.start()
+        for thread in list_thread:
+            thread.join()
+    finally:
+        sys.setcheckinterval(old_interval)
+    return list_error
+
+
+def test_shared_pattern():
+    assert(run_threads(lambda record: (shared_pattern == record) or False) == [])
+
+
+def test_shared_matcher():
+    assert(run_threads(shared_matcher) == [])
+
+
+def test_pattern_not_changed():
+    pattern = w([w(int).save_as("a")])
+    # first match fills in the cached shape of the list
+    assert(pattern == [4])
+    state = dict(vars(pattern))
+    assert(pattern == [5])
+    assert(vars(pattern) == state)
+    saved = (pattern == [1])
+    saved["a"] = 2
+    assert((pattern == [1]) == {"a": 1})
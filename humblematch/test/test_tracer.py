@@ -0,0 +1,107 @@
+from humblematch import w, inf, compile, tracing, set_trace_sink, get_trace_sink, LoggingSink, TraceEvent
+import logging
+import pytest
+
+
+class object2(object):
+    pass
+
+
+def traced(pattern, other):
+    list_event = []
+    with tracing(list_event.append):
+        result = (w(pattern) == other)
+    return (result, list_event)
+
+
+def test_events():
+    (result, list_event) = traced([int, 5], [1, 6])
+    assert(not result)
+    assert([(event.format_path(), event.result) for event in list_event] ==
+           [("root[0]", True), ("root[1]", False), ("root", False)])
+    assert(all(isinstance(event, TraceEvent) for event in list_event))
+    assert(list_event[1].other == 6)
+
+
+def test_paths():
+    test_obj = object2()
+    test_obj.price = 2.5
+    pattern = {"items": [int, w([w({"price": float}).as_obj()]).times(1, inf)]}
+    (result, list_event) = traced(pattern, {"items": [1, test_obj]})
+    assert(result)
+    list_path = [event.format_path() for event in list_event]
+    assert("root['items'][1:][0].price" in list_path)
+    assert("root['items'][1:]" in list_path)
+    assert(list_path[-1] == "root")
+
+
+def test_sequence_paths():
+    # more than one repeat, matched by sequence.match_sequence
+    pattern = {"a": [int, w([int]).times(0, inf), w([str]).times(1, inf)]}
+    (result, list_event) = traced(pattern, {"a": [1, 2, "x", 3]})
+    assert(not result)
+    list_path = [(event.format_path(), event.other) for event in list_event]
+    assert(("root['a'][0]", 1) in list_path)
+    assert(("root['a'][2]", "x") in list_path)
+    assert(("root['a'][3]", 3) in list_path)
+    assert(all(path != "root['a']" for (path, other) in list_path if other in (1, 2, "x", 3)))
+
+
+def test_saved_values():
+    (result, list_event) = traced([w(int).save_as("a"), w(int).save_as("b")], [1, 2])
+    assert(result == {"a": 1, "b": 2})
+    # each event keeps the values saved at that point
+    assert(list_event[0].result == {"a": 1})
+
+
+def test_off_by_default():
+    assert(get_trace_sink() is None)
+    list_event = []
+    with tracing(list_event.append):
+        with tracing(LoggingSink()):
+            pass
+        assert(get_trace_sink() == list_event.append)
+    assert(get_trace_sink() is None)
+    assert(w([int]) == [1])
+    assert(list_event == [])
+
+
+def test_sink_exception_resets():
+    def sink(event):
+        raise ValueError
+    with pytest.raises(ValueError):
+        with tracing(sink):
+            w(int) == 5
+    assert(get_trace_sink() is None)
+
+
+def test_logging_sink():
+    list_record = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            list_record.append(record.getMessage())
+
+    logger = logging.getLogger("humblematch.test_tracer")
+    logger.addHandler(ListHandler())
+    logger.setLevel(logging.DEBUG)
+    try:
+        with tracing(LoggingSink(logger)):
+            w({"a": int}) == {"a": "x"}
+    finally:
+        logger.handlers = []
+    assert(list_record == ["root['a']: int == 'x' -> False",
+                           "root: {'a': <type 'int'>} == {'a': 'x'} -> False"])
+
+
+@pytest.mark.parametrize("backend", ["closure", "source"])
+def test_compiled(backend):
+    m = compile([int, w(str).save_as("s")], backend=backend)
+    list_event = []
+    with tracing(list_event.append):
+        assert(m([1, "a"]) == {"s": "a"})
+        assert(m([1, 2]) is False)
+    assert([event.format_path() for event in list_event] ==
+           ["root[0]", "root[1]", "root", "root[0]", "root[1]", "root"])
+    set_trace_sink(None)
+    assert(m([1, 2]) is False)
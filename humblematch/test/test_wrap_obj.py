@@ -1,4 +1,5 @@
-from humblematch import WrapObj, Any, OR, w
+from humblematch import WrapObj, Any, OR, w, inf, compile
+from humblematch import wrap_obj
 import collections
 import pytest
 
@@ -105,11 +106,52 @@ def test_OR():
     assert(isinstance((2, 3), tuple) is True)
 
 
+def test_OR_values():
+    list_method = ["GET", "POST", "PUT", "DELETE", "HEAD"]
+    assert(isinstance("PUT", OR(list_method + [int])) is True)
+    assert(isinstance(u"PUT", OR(list_method + [int])) is True)
+    assert(isinstance(5, OR(list_method + [int])) is True)
+    assert(isinstance("PATCH", OR(list_method + [int])) is False)
+    assert(isinstance(["PUT"], OR(list_method + [int])) is False)
+
+    assert(isinstance(True, OR(1, "a")) is True)
+    assert(isinstance(1.0, OR(True)) is True)
+    assert(isinstance(None, OR(None, [1])) is True)
+    assert(isinstance([1], OR(None, [1])) is True)
+    assert(isinstance(float("nan"), OR(float("nan"))) is False)
+    assert(isinstance(int, OR(int, 5)) is True)
+
+    class AlwaysEqual(object):
+        def __eq__(self, other):
+            return True
+    assert(isinstance(AlwaysEqual(), OR("a")) is True)
+    assert(isinstance("a", OR(AlwaysEqual())) is True)
+
+
 def test_OR_internal():
     assert(OR(int).list_match_type == OR([int]).list_match_type)
     assert(OR(int, str).list_match_type == (int, str))
 
 
+def test_OR_cached():
+    assert(OR(int, None) is OR(int, None))
+    assert(OR(int, float) is OR([int, float]))
+    assert(OR(int, float) is not OR(float, int))
+    assert(OR(1) is not OR(True))
+    assert(OR(1) is not OR(1.0))
+
+    # unhashable values are not cached, but still work
+    assert(OR([1], None) is not OR([1], None))
+    assert(isinstance([1], OR([1], None)) is True)
+
+    # oldest ones are removed from cache
+    list_value = [object() for _ in range(wrap_obj.OR_CACHE_SIZE + 1)]
+    list_matcher = [OR(int, each_value) for each_value in list_value]
+    assert(len(wrap_obj.or_cache) <= wrap_obj.OR_CACHE_SIZE)
+    assert(OR(int, list_value[0]) is not list_matcher[0])
+    assert(OR(int, list_value[-1]) is list_matcher[-1])
+
+
 def test_OR_times():
     assert((w([OR(int, 2.35).times(2, 5)]) == [9, 2]) is True)
     assert((w([OR(int, 2.35).times(2, 5)]) == [9, 2.35]) is True)
@@ -129,12 +171,16 @@ def test_ANY_times():
 
 
 def test_repeat_twice():
-    with pytest.raises(TypeError):
-        assert(w([1, OR(int).times(0, float("inf")), OR(int).times(0, float("inf")), 5]) == [1, 6, 6, 6, 6, 5])
+    assert(w([1, OR(int).times(0, float("inf")), OR(int).times(0, float("inf")), 5]) == [1, 6, 6, 6, 6, 5])
+    assert(w([1, OR(int).times(3), OR(int).times(1), 5]) == [1, 6, 6, 6, 6, 5])
+
+    assert(w([1, OR(int).times(3), OR(int).times(1), 5]) != [1, 6, 6, 6, 5])
+    assert(w([int, w([str]).times(0, float("inf")), float, w([int]).times(1, float("inf"))]) == [1, "a", "b", 2.5, 3, 4])
+    assert(w([int, w([str]).times(0, float("inf")), float, w([int]).times(1, float("inf"))]) == [1, 2.5, 3])
+    assert(w([int, w([str]).times(0, float("inf")), float, w([int]).times(1, float("inf"))]) != [1, "a", 2.5])
 
-    # should pass later
     with pytest.raises(TypeError):
-        assert(w([1, OR(int).times(3), OR(int).times(1), 5]) == [1, 6, 6, 6, 6, 5])
+        assert(w([w([w([int]).times(2)]).times(2)]) == [1, 2, 3, 4])
 
 
 def test_w_extra_wrap():
@@ -217,3 +263,46 @@ def test_save_as():
     dict_match_2 = (w([w([int]).save_as("b").times(2)]) == [5, 12])
     assert(dict_match_1["b"] == [5, 12])
     assert(dict_match_1 == dict_match_2)
+
+
+class CountingValue(object):
+    # value which counts how many times it is compared
+    count = 0
+
+    def __eq__(self, other):
+        CountingValue.count += 1
+        return True
+
+
+def test_length_bounds():
+    list_length_bounds = wrap_obj.list_length_bounds
+    LengthBounds = wrap_obj.LengthBounds
+    assert(list_length_bounds([int, str]) == LengthBounds(2, 2, 1, 0))
+    assert(list_length_bounds([int, w([int, str]).times(0, inf)]) == LengthBounds(1, inf, 2, 1))
+    assert(list_length_bounds([w([int, str]).times(1, 3), w([int, int, int, int]).times(2)]) ==
+           LengthBounds(10, 12, 2, 0))
+    assert(w([int]).times(2, 4).length_bounds == LengthBounds(2, 3, 1, 0))
+
+    value = CountingValue()
+    # wrong lengths are rejected before any element is compared
+    for pattern in ([value, value], [value, w([value, value]).times(1, 3)],
+                    [w([value]).times(0, inf), value, w([value, value]).times(2)]):
+        for length in range(8):
+            other = [1] * length
+            if not list_length_bounds(pattern).allows(length):
+                CountingValue.count = 0
+                assert(w(pattern) != other)
+                assert(compile(pattern) != other)
+                assert(compile(pattern, backend="source") != other)
+                assert(CountingValue.count == 0)
+            else:
+                assert(w(pattern) == other)
+
+
+def test_length_edge_cases():
+    assert(w([]) == [])
+    assert(w([1]) != [])
+    assert(w([1]) != [1, 2])
+    # elements before and after a repeat dont overlap
+    assert(w([int, Any.times(0, inf), int]) != [5])
+    assert(w([int, Any.times(0, inf), int]) == [5, 6])
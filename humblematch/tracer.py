@@ -0,0 +1,174 @@
+'''
+Tracing of matching, for finding out why a pattern does or doesnt match.
+
+Tracing is off until a sink is set. A sink is any function taking a
+TraceEvent, which is called once for every WrapObj or WrapMultiObj compared,
+after the comparison is done.
+
+>>> from wrap_obj import w
+>>> list_event = []
+>>> with tracing(list_event.append):
+...     _ = w({"a": [int, str]}) == {"a": [1, 2]}
+>>> for event in list_event:
+...     print(event)
+root['a'][0]: int == 1 -> True
+root['a'][1]: str == 2 -> False
+root['a']: [<type 'int'>, <type 'str'>] == [1, 2] -> False
+root: {'a': [<type 'int'>, <type 'str'>]} == {'a': [1, 2]} -> False
+
+Compiled matchers (humblematch.compile) dont have any tracing code in them.
+While a sink is set, they match through WrapObj.__eq__ instead, so that the
+same events are traced.
+'''
+from collections import namedtuple
+from contextlib import contextmanager
+import logging
+import threading
+
+__all__ = ["TraceEvent", "LoggingSink", "set_trace_sink", "get_trace_sink", "tracing"]
+
+# function called with each TraceEvent, None if tracing is off
+sink = None
+
+# path of the part of other being matched, kept separately for each thread
+local = threading.local()
+
+
+class Attribute(str):
+
+    '''
+    Internal class. Path key for attribute, when dict is matched as_obj
+    '''
+
+
+class RepeatIndex(int):
+
+    '''
+    Internal class. Path key for index of an element matched by a repeat
+    (.times), shown like any index
+    '''
+
+
+class TraceEvent(namedtuple("TraceEvent", ["node", "path", "other", "result"])):
+
+    '''
+    node -> WrapObj or WrapMultiObj compared
+    path -> tuple of keys, indexes, slices and attributes leading to other
+    other -> object compared with node
+    result -> what == returned
+    '''
+
+    def format_path(self):
+        return format_path(self.path)
+
+    def __str__(self):
+        data = getattr(self.node, "data", self.node)
+        data = data.__name__ if isinstance(data, type) else repr(data)
+        return "{path}: {data} == {other!r} -> {result!r}".format(
+            path=self.format_path(), data=data, other=self.other, result=self.result)
+
+
+class LoggingSink(object):
+
+    '''
+    Sink which logs each event to logger (humblematch by default) at level.
+    Events are only formatted if the logger would output them.
+    '''
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        super(LoggingSink, self).__init__()
+        self.logger = logger or logging.getLogger("humblematch")
+        self.level = level
+
+    def __call__(self, event):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "%s", event)
+
+
+def set_trace_sink(new_sink):
+    '''
+    Turns on tracing to new_sink, or turns it off if new_sink is None
+    '''
+    global sink
+    sink = new_sink
+
+
+def get_trace_sink():
+    return sink
+
+
+@contextmanager
+def tracing(new_sink=None):
+    '''
+    Traces to new_sink (or a LoggingSink) within the with block
+    '''
+    previous_sink = sink
+    set_trace_sink(new_sink if new_sink is not None else LoggingSink())
+    try:
+        yield
+    finally:
+        set_trace_sink(previous_sink)
+
+
+def format_path(path):
+    '''
+    >>> format_path(("items", 3, slice(1, None), Attribute("price")))
+    "root['items'][3][1:].price"
+    '''
+    list_part = ["root"]
+    for path_key in path:
+        if isinstance(path_key, Attribute):
+            list_part.append(".{key}".format(key=path_key))
+        elif isinstance(path_key, slice):
+            list_part.append("[{start}:{stop}]".format(start=("" if path_key.start is None else path_key.start),
+                                                       stop=("" if path_key.stop is None else path_key.stop)))
+        else:
+            list_part.append("[{key!r}]".format(key=path_key))
+    return "".join(list_part)
+
+
+def get_path():
+    try:
+        return local.path
+    except AttributeError:
+        local.path = []
+        return local.path
+
+
+def call_at(path_key, match_function, other):
+    '''
+    Calls match_function(other), with path_key added to the path meanwhile
+    '''
+    path = get_path()
+    path.append(path_key)
+    try:
+        return match_function(other)
+    finally:
+        path.pop()
+
+
+def traced_match(node, other):
+    '''
+    Returns node.match(other), emitting its event. A sink can also have
+    enter(), called before the comparison, and cancel(), called instead of
+    the sink if the comparison raised.
+    '''
+    current_sink = sink
+    enter = getattr(current_sink, "enter", None)
+    if enter is None:
+        result = node.match(other)
+    else:
+        enter()
+        try:
+            result = node.match(other)
+        except BaseException:
+            current_sink.cancel()
+            raise
+    emit(node, other, result)
+    return result
+
+
+def emit(node, other, result):
+    current_sink = sink
+    if current_sink is not None:
+        current_sink(TraceEvent(node, tuple(get_path()), other, result))
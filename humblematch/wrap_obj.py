@@ -1,12 +1,16 @@
 from __future__ import print_function
 from enum import Enum
-from collections import Mapping, Iterable
+from collections import Mapping, Iterable, deque, namedtuple
+from fractions import gcd
 from warnings import warn
-import logging
+import copy_reg
+import threading
 import types
 import numbers
 
-# logging.debug = print
+from dispatch import kind_of, MAPPING, LIST, STRING
+import tracer
+import arrays
 
 __all__ = ["Any", "OR", "WrapObj", "w", "WrapMultiObj", "inf", "StringTypes", "NumberType", "FunctionType", "ClassType"]
 
@@ -40,6 +44,27 @@ class Any(object):
     __metaclass__ = MetaAny
 
 
+def reduce_any(any_class):
+    '''
+    Internal function. Pickles and copies Any by name, so it stays the
+    same class
+    '''
+    return any_class.__name__
+
+copy_reg.pickle(MetaAny, reduce_any)
+
+
+# builtin types whose equal values (like 5 and 5.0) always have same hash
+HASHED_VALUE_TYPES = frozenset([int, long, float, complex, bool, str, unicode, types.NoneType])
+
+# classes made by makeMultiInstanceMatcher, by their types or values.
+# Only last OR_CACHE_SIZE of them are kept.
+OR_CACHE_SIZE = 256
+or_cache = {}
+or_cache_order = deque()
+or_cache_lock = threading.Lock()
+
+
 def makeMultiInstanceMatcher(*list_type):
     '''
     Create checker class which allows some types or values.
@@ -49,45 +74,192 @@ def makeMultiInstanceMatcher(*list_type):
     True
     >>> w(OR([int,float])) == 2.25 and w(OR([int,float])) == 2
     True
+
+    Same types or values give back the same class, so it is cheap
+    to call OR(...) again and again.
+    >>> OR(int, None) is OR([int, None])
+    True
     '''
 
     if len(list_type) == 1 and isinstance(list_type[0], Iterable):
         list_type = tuple(list_type[0])
 
-    class MetaMultiInstanceMatcher(type):
-        # Use (both are same)
-        # a = MetaMultiInstanceMatcher([int,float])
-        # b = MetaMultiInstanceMatcher(int,float)
-        list_match_type = list_type
-
-        def __instancecheck__(self, instance):
-
-            for each_type in self.list_match_type:
-                if isinstance(each_type, type) and isinstance(instance, each_type):
-                    # if type, use isinstance
-                    return True
-                elif each_type == instance:
-                    # if value, check equality
-                    return True
-            else:
-                return False
+    # type is part of key, so that OR(1) and OR(True) dont share a class
+    cache_key = tuple((type(each_type), each_type) for each_type in list_type)
+    try:
+        matcher = or_cache.get(cache_key)
+    except TypeError:
+        # some value is unhashable, so cant be cached
+        return createMultiInstanceMatcher(list_type)
+
+    if matcher is None:
+        with or_cache_lock:
+            matcher = or_cache.get(cache_key)
+            if matcher is None:
+                matcher = createMultiInstanceMatcher(list_type)
+                or_cache[cache_key] = matcher
+                or_cache_order.append(cache_key)
+                if len(or_cache_order) > OR_CACHE_SIZE:
+                    del or_cache[or_cache_order.popleft()]
+    return matcher
+
+
+def createMultiInstanceMatcher(list_type):
+    '''
+    Internal function. Creates a new checker class for makeMultiInstanceMatcher
+    '''
+
+    # types are checked with one isinstance, values with builtin types by
+    # looking up in a set and only the rest by checking equality one by one
+    match_types = tuple(each_type for each_type in list_type if isinstance(each_type, type))
+    list_value = [each_type for each_type in list_type if not isinstance(each_type, type)]
+    match_values_set = frozenset(each_value for each_value in list_value
+                                 if type(each_value) in HASHED_VALUE_TYPES and each_value == each_value)
+    match_values_rest = tuple(each_value for each_value in list_value
+                              if not (type(each_value) in HASHED_VALUE_TYPES and each_value == each_value))
+    # a class is also equal to itself, so OR(int) allows int as a value
+    match_values_all = tuple(list_value) + match_types
 
-        def times(self, range_low, range_high=None):
-            return WrapObj([self]).times(range_low, range_high)
+    return MetaMultiInstanceMatcher("MultiInstanceMatcher", (type,), {
+        "list_match_type": list_type,
+        "match_types": match_types,
+        "match_values_set": match_values_set,
+        "match_values_rest": match_values_rest,
+        "match_values_all": match_values_all,
+    })
 
-        def save_as(self, save_key):
-            return WrapObj(self).save_as(save_key)
 
-    class MultiInstanceMatcher(type):
-        __metaclass__ = MetaMultiInstanceMatcher
+class MetaMultiInstanceMatcher(type):
+
+    '''
+    Internal class. Metaclass of classes made by makeMultiInstanceMatcher,
+    which keep what they allow in list_match_type.
+    Shared by all of them, so that they can be pickled (see
+    reduce_multi_instance_matcher).
+    '''
+
+    def __instancecheck__(self, instance):
+        # if type, use isinstance
+        if isinstance(instance, self.match_types):
+            return True
+
+        # if value, check equality
+        if type(instance) in HASHED_VALUE_TYPES:
+            if instance in self.match_values_set:
+                return True
+            list_value_to_check = self.match_values_rest
+        else:
+            list_value_to_check = self.match_values_all
+
+        for each_value in list_value_to_check:
+            if each_value == instance:
+                return True
+        else:
+            return False
+
+    def times(self, range_low, range_high=None):
+        return WrapObj([self]).times(range_low, range_high)
+
+    def save_as(self, save_key):
+        return WrapObj(self).save_as(save_key)
+
+
+def reduce_multi_instance_matcher(matcher):
+    '''
+    Internal function. Pickles OR(...) class as the call making it, so that
+    it is made again (or taken from cache) when unpickled
+
+    >>> import pickle
+    >>> pickle.loads(pickle.dumps(OR(int, "a"))) is OR(int, "a")
+    True
+    '''
+    return (makeMultiInstanceMatcher, (matcher.list_match_type,))
 
-    return MultiInstanceMatcher
+copy_reg.pickle(MetaMultiInstanceMatcher, reduce_multi_instance_matcher)
 
 OR = makeMultiInstanceMatcher
 
 CHECK_DIR = Enum("Iterable check direction", ["FORWARDS", "BACKWARDS"])
 
 
+class MatchContext(object):
+
+    '''
+    Internal class. State of matching one WrapObj or WrapMultiObj with
+    one object, created for each == and thrown away after it.
+    Patterns themselves are not changed by matching, so the same pattern
+    can be matched from many threads at once.
+    dict_saved_values -> values saved with save_as so far
+    '''
+
+    __slots__ = ["dict_saved_values"]
+
+    def __init__(self):
+        self.dict_saved_values = {}
+
+    def result(self):
+        return (self.dict_saved_values or True)
+
+
+class LengthBounds(namedtuple("LengthBounds", ["min_len", "max_len", "modulus", "remainder"])):
+
+    '''
+    Lengths of list-ish other which a list pattern can match, i.e.
+    min_len <= len(other) <= max_len and len(other) % modulus == remainder
+
+    >>> bounds = list_length_bounds([int, w([int, str]).times(1, 3), int])
+    >>> bounds
+    LengthBounds(min_len=4, max_len=6, modulus=2, remainder=0)
+    >>> [length for length in range(10) if bounds.allows(length)]
+    [4, 6]
+    '''
+
+    __slots__ = ()
+
+    def allows(self, length):
+        return (self.min_len <= length <= self.max_len) and (length % self.modulus == self.remainder)
+
+
+def list_length_bounds(data):
+    '''
+    Internal function. Returns LengthBounds of list-ish data, from its fixed
+    elements and the range and length of each WrapMultiObj in it
+    '''
+    min_len = 0
+    max_len = 0
+    modulus = 0
+    for ele_data in data:
+        if isinstance(ele_data, WrapMultiObj):
+            (unit_min_len, unit_max_len, unit_len, _) = ele_data.length_bounds
+            min_len += unit_min_len
+            max_len += unit_max_len
+            modulus = gcd(modulus, unit_len)
+        else:
+            min_len += 1
+            max_len += 1
+    # lengths with fixed elements only, or empty repeats, are not limited
+    # by modulus
+    modulus = modulus or 1
+    return LengthBounds(min_len, max_len, modulus, min_len % modulus)
+
+
+def slice_list(other, start, end):
+    '''
+    Internal function. Returns other[start:end], or the same range of an
+    xrange as an xrange, as xrange cant be sliced
+
+    >>> slice_list(xrange(10, 20, 2), 1, -1)
+    xrange(12, 18, 2)
+    '''
+    if type(other) is not xrange:
+        return other[start:end]
+    (start, end, _) = slice(start, end).indices(len(other))
+    if start >= end:
+        return xrange(0)
+    step = (other[1] - other[0]) if len(other) > 1 else 1
+    return xrange(other[start], other[start] + (end - start) * step, step)
+
+
 class WrapObj(object):
 
     '''
@@ -110,8 +282,10 @@ class WrapObj(object):
 
         self.DO_TYPECHECK = DO_TYPECHECK
         self.treat_as_object = False
-        self.dict_saved_values = {}
         self.save_key = None
+        # (LengthBounds, number of WrapMultiObj) of list-ish data, found by
+        # the first match_list
+        self.list_shape = None
 
     def as_obj(self):
         '''
@@ -174,6 +348,75 @@ class WrapObj(object):
         '''
         return self.times(range_tuple, None)
 
+    def compile(self, backend="closure", adaptive=False, diagnostics=False):
+        '''
+        Compiles this pattern into a Matcher, which gives the same result
+        as == but is faster when matched many times.
+        See humblematch.compile for backend, adaptive and diagnostics.
+
+        >>> m = w([int, w(str).save_as("a")]).compile()
+        >>> m([1, "b"]) == {"a": "b"}
+        True
+        '''
+        from matcher import Matcher
+        return Matcher(self, backend, adaptive, diagnostics)
+
+    def match_many(self, iterable, workers=None, chunksize=256, executor="thread", failed_only=False):
+        '''
+        Returns list with the result of matching each object of iterable,
+        compiling this pattern once. See humblematch.match_many.
+
+        >>> w([int, str]).match_many([[1, "a"], [1, 2]])
+        [True, False]
+        '''
+        from batch import match_many
+        return match_many(self, iterable, workers, chunksize, executor, failed_only)
+
+    def match_stream(self, iterable):
+        '''
+        Matches list-ish pattern with iterable, reading it once and lazily.
+        See humblematch.match_stream.
+
+        >>> w([str, w([int]).times(0, inf)]).match_stream(iter(["a", 1, 2]))
+        True
+        '''
+        from stream import match_stream
+        return match_stream(self, iterable)
+
+    def explain(self, other):
+        '''
+        Returns Failure telling where and why other doesnt match, or None
+        if it matches. See explain.py.
+
+        >>> print(w({"a": [int, str]}).explain({"a": [1, 2]}))
+        root['a'][1]: expected str, got 2 (doesnt match)
+        '''
+        from matcher import Matcher
+        return Matcher(self, diagnostics=True).explain(other)
+
+    def profile_report(self, out=None, limit=None):
+        '''
+        Prints calls and time of each node of this pattern, matched within
+        humblematch.profiling(). See profiler.profile_report.
+        '''
+        from profiler import profile_report
+        profile_report(self, out, limit)
+
+    def __reduce__(self):
+        '''
+        Pickles and copies as data and the options which are set
+
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(w([int, w(str).save_as("s")]))) == [1, "a"]
+        {'s': 'a'}
+        '''
+        state = {}
+        if self.treat_as_object:
+            state["treat_as_object"] = True
+        if self.save_key is not None:
+            state["save_key"] = self.save_key
+        return (self.__class__, (self.data, self.DO_TYPECHECK), state or None)
+
     # def __pos__(self):
     #     if (isinstance(self.data, Iterable) and (not isinstance(self.data, Mapping))):
     #         return WrapMultiObj(self.data, [1, 2])
@@ -198,7 +441,21 @@ class WrapObj(object):
         multiobj_index_forwards = None
         multiobj_index_backwards = None
 
-        self.dict_saved_values = {}
+        list_shape = self.list_shape
+        if list_shape is None:
+            list_shape = self.list_shape = (list_length_bounds(self.data),
+                                            sum(isinstance(ele_data, WrapMultiObj) for ele_data in self.data))
+        (length_bounds, multiobj_count) = list_shape
+
+        # lengths which can never match are rejected before any element
+        if not length_bounds.allows(len(other)):
+            return False
+
+        if multiobj_count > 1:
+            # split between the objects of arbitary range is not known
+            return self.match_sequence(other)
+
+        context = MatchContext()
 
         if (check_dir == CHECK_DIR.FORWARDS):
 
@@ -210,17 +467,12 @@ class WrapObj(object):
                     check_dir = CHECK_DIR.BACKWARDS
                     break
                 else:
-                    try:
-                        ele_other = other[ele_index]
-                    except IndexError:
-                        # To_be_checked list has length less than matching list
+                    # length bounds make sure other is long enough
+                    match_dict_or_True = match_at(ele_index, WrapObj(ele_data), other[ele_index])
+                    if match_dict_or_True and isinstance(match_dict_or_True, dict):
+                        context.dict_saved_values.update(match_dict_or_True)
+                    if not match_dict_or_True:
                         return False
-                    finally:
-                        match_dict_or_True = (WrapObj(ele_data) == ele_other)
-                        if match_dict_or_True and isinstance(match_dict_or_True, dict):
-                            self.dict_saved_values.update(match_dict_or_True)
-                        if not match_dict_or_True:
-                            return False
 
         if (check_dir == CHECK_DIR.BACKWARDS):
             for ele_index in range(0 - 1, -(len(self.data) + 1), -1):
@@ -232,26 +484,17 @@ class WrapObj(object):
                     check_dir = CHECK_DIR.FORWARDS
                     break
                 else:
-                    try:
-                        ele_other = other[ele_index]
-                    except IndexError:
-                        # To_be_checked list has length less than matching list
+                    # length bounds make sure other is long enough
+                    match_dict_or_True = match_at(ele_index, WrapObj(ele_data), other[ele_index])
+                    if match_dict_or_True and isinstance(match_dict_or_True, dict):
+                        context.dict_saved_values.update(match_dict_or_True)
+                    if not match_dict_or_True:
                         return False
-                    finally:
-                        match_dict_or_True = (WrapObj(ele_data) == ele_other)
-                        if match_dict_or_True and isinstance(match_dict_or_True, dict):
-                            self.dict_saved_values.update(match_dict_or_True)
-                        if not match_dict_or_True:
-                            return False
-
-        if (match_dict_or_True and (multiobj_index_forwards is None) and (multiobj_index_forwards == multiobj_index_backwards)):
-            # all of data is in other
-            # so, if they have same length, everything is perfect
-            if len(self.data) == len(other):
-                return (self.dict_saved_values or True)
-        elif (multiobj_index_forwards + (-multiobj_index_backwards)) != len(self.data):
-            # there is more than one length_ANY object
-            raise TypeError("There must be only one object of arbitary range")
+
+        if multiobj_index_forwards is None:
+            # all of data is in other, and length bounds make sure they have
+            # same length, so everything is perfect
+            return context.result()
         else:
             # there is only one length ANY object
 
@@ -260,15 +503,42 @@ class WrapObj(object):
             multiobj_index_backwards += 1
             multiobj_index_backwards = multiobj_index_backwards or None
             ele_wrapmultiobj = self.data[multiobj_index_forwards]
-            logging.debug("Comparing WrapMultiObj with part of list")
-            match_dict_or_True = (ele_wrapmultiobj == other[multiobj_index_forwards:multiobj_index_backwards])
+            match_dict_or_True = match_at(slice(multiobj_index_forwards, multiobj_index_backwards), ele_wrapmultiobj,
+                                          slice_list(other, multiobj_index_forwards, multiobj_index_backwards))
             if match_dict_or_True:
                 if isinstance(match_dict_or_True, dict):
-                    self.dict_saved_values.update(match_dict_or_True)
-                return (self.dict_saved_values or True)
+                    context.dict_saved_values.update(match_dict_or_True)
+                return context.result()
             else:
                 return False
 
+    def match_sequence(self, other):
+        '''
+        Internal method. Handles self == other, when other is list and
+        there are more than one WrapMultiObj in self.data
+
+        >>> w([w([int]).times(1, inf), w([str]).times(1, inf)]) == [1, 2, "a"]
+        True
+        '''
+        from sequence import Repeat, match_sequence
+
+        # while tracing, elements are matched with their index in other, as
+        # [*] for elements of repeats
+        indexed = tracer.sink is not None
+        list_segment = []
+        for ele_data in self.data:
+            if isinstance(ele_data, WrapMultiObj):
+                list_segment.append(Repeat([indexed_match(match_repeat_at, WrapObj(unit_data)) if indexed
+                                            else WrapObj(unit_data).__eq__
+                                            for unit_data in ele_data.checked_data()],
+                                           ele_data.repeat_allowed_range[0],
+                                           ele_data.repeat_allowed_range[1],
+                                           ele_data.save_key))
+            else:
+                list_segment.append(indexed_match(match_at, WrapObj(ele_data)) if indexed
+                                    else WrapObj(ele_data).__eq__)
+        return match_sequence(list_segment, other, indexed)
+
     def match_dict_or_obj(self, other, dict_or_obj=dict):
         '''
         Internal method. Handles self == other, when other is dict or obj
@@ -276,7 +546,7 @@ class WrapObj(object):
         assert(dict_or_obj in (dict, object))
         match_dict_or_True = None  # as in not known yet
 
-        self.dict_saved_values = {}
+        context = MatchContext()
 
         for (data_key, data_value) in self.data.iteritems():
             if isinstance(data_key, type):
@@ -299,17 +569,18 @@ class WrapObj(object):
                 match_dict_or_True = False
                 return False
             else:
-                match_dict_or_True = (WrapObj(data_value) == other_value)
+                path_key = data_key if dict_or_obj is dict else tracer.Attribute(data_key)
+                match_dict_or_True = match_at(path_key, WrapObj(data_value), other_value)
 
                 if match_dict_or_True and isinstance(match_dict_or_True, dict):
-                    self.dict_saved_values.update(match_dict_or_True)
+                    context.dict_saved_values.update(match_dict_or_True)
 
                 if match_dict_or_True is False:
                     return match_dict_or_True
         else:
             # should be True
             assert(bool(match_dict_or_True) is True)
-            return (self.dict_saved_values or True)
+            return context.result()
 
     def __eq__(self, other):
         '''
@@ -320,6 +591,15 @@ class WrapObj(object):
         >>> w(str) == "2.23"
         True
         '''
+        # w(w(obj)) is traced once, by the inner WrapObj
+        if (tracer.sink is not None) and not isinstance(self.data, WrapObj):
+            return tracer.traced_match(self, other)
+        return self.match(other)
+
+    def match(self, other):
+        '''
+        Internal method. Handles self == other, apart from tracing
+        '''
         if self.DO_TYPECHECK and (type(self.data) != type(other)):
             return False
 
@@ -329,15 +609,17 @@ class WrapObj(object):
         elif isinstance(self.data, WrapMultiObj):
             return (self.data == [other])
 
-        elif isinstance(self.data, types.StringTypes):
+        # kinds are looked up by exact type, instead of isinstance checks
+        # against Iterable and Mapping
+        data_kind = kind_of(self.data)
+        if data_kind == STRING:
             # take care of strings in normal way unlike lists
             return self.data == other
 
-        elif (isinstance(self.data, Iterable) and (not isinstance(self.data, Mapping))) and\
-                (isinstance(other, Iterable) and (not isinstance(other, Mapping))):
+        elif data_kind == LIST and kind_of(other) >= LIST:
             return self.match_list(other)
 
-        elif not(self.treat_as_object) and (isinstance(self.data, Mapping) and isinstance(other, Mapping)):
+        elif not(self.treat_as_object) and data_kind == MAPPING and kind_of(other) == MAPPING:
             return self.match_dict_or_obj(other, dict)
 
         elif self.treat_as_object:
@@ -352,8 +634,7 @@ class WrapObj(object):
         elif check_as_value_and_type(other, self.data):
 
             if self.save_key is not None:
-                self.dict_saved_values[self.save_key] = other
-                return self.dict_saved_values
+                return {self.save_key: other}
             else:
                 return True
             # return True
@@ -369,13 +650,11 @@ class WrapMultiObj(object):
     def __init__(self, data, range_low, range_high):
         super(WrapMultiObj, self).__init__()
 
-        logging.debug("Creating WrapMultiObj with data={data}".format(data=data))
         if (isinstance(data, Iterable) and (not isinstance(data, Mapping))):
             self.data = data
         else:
             raise TypeError("data={data} should be iterable".format(data=data))
 
-        logging.debug("Checking {range_low}, {range_high} is of correct range..  ".format(range_low=range_low, range_high=range_high))
         INT_OR_INF = OR(int, float("inf"))
         if WrapObj([INT_OR_INF, INT_OR_INF]) == [range_low, range_high]:
             pass
@@ -387,22 +666,85 @@ class WrapMultiObj(object):
             raise TypeError("range_low={range_low} and range_high={range_high} must be of appropiate type"
                             "".format(range_low=range_low, range_high=range_high))
 
-        logging.debug("OK")
-
         self.repeat_allowed_range = [range_low, range_high]
+        unit_len = len(self.checked_data())
+        # lengths of other this can match, for rejecting others early
+        self.length_bounds = LengthBounds(unit_len * range_low, (unit_len * (range_high - 1) if unit_len else 0),
+                                          unit_len or 1, 0)
 
-        logging.debug("DO_TYPECHECK is off")
         self.DO_TYPECHECK = False
 
-        self.dict_saved_values = {}
         self.save_key = None
 
-        logging.debug("Create OK, returned")
-
     def save_as(self, arg_name):
         self.save_key = arg_name
         return self
 
+    def match_stream(self, iterable):
+        '''
+        Matches repeats of data with iterable, reading it once and lazily.
+        See humblematch.match_stream.
+
+        >>> w([int, str]).times(1, inf).match_stream(iter([1, "a", 2, "b"]))
+        True
+        '''
+        from stream import match_stream
+        return match_stream(self, iterable)
+
+    def match_columns(self, columns):
+        '''
+        Matches repeats of a dict pattern with rows of a NumPy structured
+        array or dict of columns. See humblematch.match_columns.
+
+        >>> bool(w([{"a": int}]).times(1, inf).match_columns({"a": [1, 2]}))
+        True
+        '''
+        from columns import match_columns
+        return match_columns(self, columns)
+
+    def explain(self, other):
+        '''
+        Returns Failure telling where and why other doesnt match, or None
+        if it matches. See explain.py.
+
+        >>> print(w([int]).times(1, inf).explain([1, "2"]))
+        root[1]: expected int, got '2' (doesnt match)
+        '''
+        from matcher import Matcher
+        # matched as the only part of a list, like self == other
+        failure = Matcher([self], diagnostics=True).explain(other)
+        if failure is not None and failure.path[:1] == (slice(0, None),):
+            failure = failure._replace(path=failure.path[1:])
+        elif failure is not None and failure.path == ():
+            failure = failure._replace(expected=self)
+        return failure
+
+    def profile_report(self, out=None, limit=None):
+        '''
+        Prints calls and time of each node of this pattern, matched within
+        humblematch.profiling(). See profiler.profile_report.
+        '''
+        from profiler import profile_report
+        profile_report(self, out, limit)
+
+    def __reduce__(self):
+        '''
+        Pickles and copies as data, range and save_key only
+        '''
+        state = {"save_key": self.save_key} if self.save_key is not None else None
+        return (self.__class__, (self.data,) + tuple(self.repeat_allowed_range), state)
+
+    def checked_data(self):
+        '''
+        Internal method. Returns self.data, after checking that it
+        doesnt have WrapMultiObj within it
+        '''
+        for ele_data in self.data:
+            if isinstance(ele_data, WrapMultiObj):
+                raise TypeError("{self_class} not allowed within {self_class}, causes ambiguous condition"
+                                "".format(self_class=self.__class__))
+        return self.data
+
     def __ne__(self, other):
         return not(self.__eq__(other))
 
@@ -411,37 +753,39 @@ class WrapMultiObj(object):
         Similar to WrapObj.__eq__
         But expects other is iterable
         '''
-        logging.debug("Checking equality of {self_data} and {other}".format(self_data=self.data, other=other))
+        if tracer.sink is not None:
+            return tracer.traced_match(self, other)
+        return self.match(other)
+
+    def match(self, other):
+        '''
+        Internal method. Handles self == other, apart from tracing
+        '''
         if self.DO_TYPECHECK and (type(self.data) != type(other)):
-            logging.debug("DO_TYPECHECK is on and yet types dont match. So returned False")
             return False
 
-        logging.debug("Asserting matcher and matchee are both of list-ish type..  ")
-        assert (isinstance(self.data, Iterable) and (not isinstance(self.data, Mapping)))
-        try:
-            # the one to be matched with should also be list, if its not, no chance of matching
-            assert(isinstance(other, Iterable) and (not isinstance(other, Mapping)))
-        except AssertionError:
+        assert (kind_of(self.data) >= LIST)
+        # the one to be matched with should also be list, if its not, no chance of matching
+        if kind_of(other) < LIST:
             return False
-        logging.debug("OK")
 
-        # if len(other) is not integer multiple len(self.data), they will never match as a whole
-        logging.debug("Checking length of matchee is multiple of length of matcher.. ")
-        if (len(other) % len(self.data) != 0):
-            logging.debug("NOT OK.. returned False")
+        # if len(other) is not integer multiple len(self.data) in allowed
+        # range, they will never match as a whole
+        if not self.length_bounds.allows(len(other)):
             return False
-        else:
-            logging.debug("OK")
 
-        self.dict_saved_values = {}
+        if arrays.is_array(other):
+            # checked from dtype and shape, when the pattern allows it
+            match_dict_or_True = arrays.match_array(self, other)
+            if match_dict_or_True is not None:
+                return match_dict_or_True
+
+        context = MatchContext()
 
         repeat_count = 0
         while True:
-            logging.debug("Running iteration {repeat_count}".format(repeat_count=repeat_count + 1))
 
             if (repeat_count > self.repeat_allowed_range[1]):
-                logging.debug("Checking not yet complete, but max_allowed_repeated={max_repeat} crossed. "
-                              "So, returning False.".format(max_repeat=self.repeat_allowed_range[1]))
                 return False
             start_other_index = repeat_count * len(self.data)
 
@@ -461,43 +805,67 @@ class WrapMultiObj(object):
                 except IndexError:
                     # To_be_checked list has length less than matching list in this iteration
                     # Return False as the whole data is not matchable this iteration
-                    logging.debug("Checking for repeat matching at iteration = {repeat_count} failed".format(repeat_count=repeat_count))
                     return False
                 finally:
                     # match_dict_or_True = check_as_value_and_type(ele_other, ele_data)
-                    match_dict_or_True = (WrapObj(ele_data) == ele_other)
+                    match_dict_or_True = match_repeat_at(start_other_index + ele_index, WrapObj(ele_data),
+                                                         ele_other)
                     # take care of save_as of child elements
                     if match_dict_or_True and isinstance(match_dict_or_True, dict):
-                        # update self.dict_saved_values with each value in its list form,
+                        # update context.dict_saved_values with each value in its list form,
                         # so as to allow muliple matches
                         for match_key in match_dict_or_True:
                             match_val = match_dict_or_True[match_key]
-                            prev_match_val = self.dict_saved_values.get(match_key)
+                            prev_match_val = context.dict_saved_values.get(match_key)
                             if isinstance(prev_match_val, list):
-                                self.dict_saved_values[match_key].append(match_val)
+                                context.dict_saved_values[match_key].append(match_val)
                             else:
-                                self.dict_saved_values[match_key] = [match_val]
+                                context.dict_saved_values[match_key] = [match_val]
 
                     if not match_dict_or_True:
                         # Return False as the match doesnt work out
-                        logging.debug("{ele_other} with {ele_data} Match retuned False")
                         return False
 
             repeat_count += 1
 
-        logging.debug("Match works with {repeat_count} iterations".format(repeat_count=repeat_count))
         if self.repeat_allowed_range[0] <= repeat_count < self.repeat_allowed_range[1]:
-            logging.debug("And it is in valid range")
             # take care of save_as of self
             if self.save_key is not None:
-                self.dict_saved_values[self.save_key] = other
+                context.dict_saved_values[self.save_key] = other
 
-            return (self.dict_saved_values or True)
+            return context.result()
         else:
-            logging.debug("And it is NOT in valid range")
             return False
 
 
+def match_at(path_key, node, other):
+    '''
+    Internal function. Returns node == other, with path_key added to the
+    traced path when tracing is on
+    '''
+    if tracer.sink is None:
+        return (node == other)
+    return tracer.call_at(path_key, node.__eq__, other)
+
+
+def match_repeat_at(index, node, other):
+    '''
+    Internal function. Like match_at, for element at index matched by a
+    repeat
+    '''
+    if tracer.sink is None:
+        return (node == other)
+    return tracer.call_at(tracer.RepeatIndex(index), node.__eq__, other)
+
+
+def indexed_match(match_at_function, node):
+    '''
+    Internal function. Returns function matching node with an element of
+    other, given its index, using match_at_function
+    '''
+    return lambda index, other: match_at_function(index, node, other)
+
+
 def check_as_value_and_type(to_check, value_or_type):
     '''
     Checks whether to_check is either
@@ -511,7 +879,6 @@ def check_as_value_and_type(to_check, value_or_type):
     >>> check_as_value_and_type( int, int)
     False
     '''
-    logging.debug("Checking {1} with {0}".format(value_or_type, to_check))
 
     # if its class, then check if instance of that
     if isinstance(value_or_type, type):